@@ -1,8 +1,11 @@
 import streamlit as st
-import requests
-import io
-from pypdf import PdfReader
-from datetime import datetime
+from doe.baixador import url_caderno, ErroDownload
+from doe.busca import ocorrencias_em_linhas, pagina_de_resultados, realcar_termo
+from doe.consultas import chave_consulta, obter_cache_consultas
+from doe.extracao import EXTRATOR_PYPDF, versao_extrator
+from doe.leitura import ler_dia
+from doe.prefiltro import FiltroTermos
+from doe.progresso import RelatorProgresso
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
@@ -11,28 +14,6 @@ st.set_page_config(
     layout="wide" # Usa a tela inteira, melhor para ler textos longos
 )
 
-# --- FUNÇÕES AUXILIARES ---
-
-def realcar_termo(linha, termo):
-    """
-    Substitui o termo encontrado por uma versão colorida e negrito em Markdown.
-    Ex: "lei municipal" vira ":orange[**lei municipal**]"
-    """
-    termo_lower = termo.lower()
-    linha_lower = linha.lower()
-    
-    start = linha_lower.find(termo_lower)
-    if start == -1:
-        return linha
-        
-    # Recorta mantendo a caixa original (maiúscula/minúscula)
-    prefixo = linha[:start]
-    miolo = linha[start:start+len(termo)]
-    sufixo = linha[start+len(termo):]
-    
-    # Sintaxe do Streamlit para cor: :cor[texto]
-    return f"{prefixo}:orange[**{miolo}**]{sufixo}"
-
 # --- INTERFACE (FRONT-END) ---
 
 st.title("⚖️ Busca no Diário Oficial do Ceará")
@@ -58,106 +39,107 @@ if botao_pesquisar:
     if not termo_busca:
         st.warning("Por favor, digite um termo para buscar.")
     else:
-        # Formata a data para o padrão da URL (YYYYMMDD)
         # O date_input devolve um objeto 'date', convertemos para string
-        data_formatada = data_selecionada.strftime("%Y%m%d")
         dia_formatado = data_selecionada.strftime("%d/%m/%Y")
         
-        termo_lower = termo_busca.lower()
-        parte = 1
-        encontrou_total = 0
+        # As ocorrências são só guardadas durante a varredura; os cartões saem depois,
+        # uma página de cada vez, para a tela não travar com milhares de resultados
+        ocorrencias = []
         
         # Área de Status (Feedback visual animado)
         status_box = st.status(f"Iniciando busca em {dia_formatado}...", expanded=True)
-        
-        # Container para os resultados (para eles aparecerem organizados)
-        resultados_container = st.container()
+
+        # A mesma busca feita antes (nesta ou em outra sessão) sai do cache de consultas
+        cache_consultas = obter_cache_consultas()
+        chave = ("linhas",) + chave_consulta([termo_busca], ignorar_acentos=False, versao=versao_extrator(EXTRATOR_PYPDF))
 
         try:
-            while True:
-                str_parte = f"{parte:02d}"
-                url = f"http://imagens.seplag.ce.gov.br/PDF/{data_formatada}/do{data_formatada}p{str_parte}.pdf"
-                
-                status_box.update(label=f"Baixando e analisando Caderno {str_parte}...")
+            guardadas = cache_consultas.obter(chave, data_selecionada)
+            if guardadas is not None:
+                ocorrencias = guardadas
+            else:
+                status_box.update(label=f"Baixando os cadernos de {dia_formatado}...")
                 
-                # Requisição
-                try:
-                    resposta = requests.get(url, timeout=15)
-                    if resposta.status_code == 404:
-                        break # Acabaram os cadernos
-                    if resposta.status_code != 200:
-                        status_box.write(f"⚠️ Erro ao acessar caderno {str_parte}: Código {resposta.status_code}")
-                        break
-                except Exception as e:
-                    st.error(f"Erro de conexão: {e}")
-                    break
+                # Os cadernos do dia são baixados em paralelo; o que já foi lido antes vem direto do disco.
+                # Páginas que com certeza não têm o termo nem chegam a ser extraídas.
+                partes, erro_download, paginas = ler_dia(data_selecionada, timeout=15, filtro=FiltroTermos([termo_busca]))
+                if isinstance(erro_download, ErroDownload):
+                    str_falha = f"{min(set(range(1, len(partes) + 2)) - set(partes)):02d}"
+                    status_box.write(f"⚠️ Erro ao acessar caderno {str_falha}: Código {erro_download.status_code}")
+                elif erro_download:
+                    st.error(f"Erro de conexão: {erro_download}")
 
-                # Processamento do PDF
-                arquivo_memoria = io.BytesIO(resposta.content)
-                leitor = PdfReader(arquivo_memoria)
+                # As páginas de todos os cadernos são lidas em paralelo, em vários processos.
+                # O status acompanha o laço, mas só é redesenhado algumas vezes por segundo.
+                def mostrar_andamento(somas, valores, itens):
+                    status_box.update(label=f"Analisando Caderno {valores['parte']:02d}... ({valores['ocorrencias']} ocorrências até agora)")
                 
-                for num_pag, pagina in enumerate(leitor.pages):
-                    texto_original = pagina.extract_text()
-                    if not texto_original: continue
-                    
-                    linhas = texto_original.split('\n')
-                    
-                    i = 0
-                    while i < len(linhas):
-                        linha_atual = linhas[i]
-                        
-                        if termo_lower in linha_atual.lower():
-                            encontrou_total += 1
-                            
-                            # Definição da Janela Visual (Contexto)
-                            LINHAS_ANTES = 4
-                            LINHAS_DEPOIS = 8
-                            
-                            inicio = max(0, i - LINHAS_ANTES)
-                            fim = min(len(linhas), i + LINHAS_DEPOIS + 1)
-                            bloco = linhas[inicio:fim]
-                            
-                            # --- MONTAGEM DO CARD DE RESULTADO ---
-                            with resultados_container:
-                                with st.expander(f"📌 Ocorrência #{encontrou_total} | Caderno {str_parte} - Pág {num_pag + 1}", expanded=True):
-                                    
-                                    # Monta o texto formatado linha a linha
-                                    texto_final_md = ""
-                                    for idx_bloco, texto_linha in enumerate(bloco):
-                                        idx_real = idx_bloco + inicio
-                                        
-                                        # Se for a linha do termo, realça. Se não, deixa cinza (contexto)
-                                        if idx_real == i:
-                                            linha_md = realcar_termo(texto_linha, termo_busca)
-                                            # Adiciona uma seta para indicar a linha
-                                            texto_final_md += f"> {linha_md}  \n" 
-                                        else:
-                                            # Texto cinza para contexto
-                                            texto_final_md += f"<span style='color:gray'>{texto_linha}</span>  \n"
-                                    
-                                    # Exibe o texto formatado (permite HTML para o cinza)
-                                    st.markdown(texto_final_md, unsafe_allow_html=True)
-                                    
-                                    # Botão para abrir o PDF direto
-                                    st.link_button(f"Abrir PDF Original (Pág {num_pag+1})", url)
-                            
-                            # Pula o loop para não repetir o mesmo contexto
-                            i = fim
-                        else:
-                            i += 1
+                with RelatorProgresso(mostrar_andamento) as andamento:
+                    for _, parte, num_pag, texto_original, _ in paginas:
+                        if texto_original:
+                            for i, inicio, bloco in ocorrencias_em_linhas(texto_original, termo_busca):
+                                ocorrencias.append((parte, num_pag, i, inicio, bloco))
+                        andamento.definir(parte=parte, ocorrencias=len(ocorrencias))
                 
-                parte += 1
+                # Só o dia lido por inteiro serve para as próximas buscas
+                if erro_download is None:
+                    cache_consultas.guardar(chave, data_selecionada, ocorrencias)
             
             # Finalização
             status_box.update(label="Busca Finalizada!", state="complete", expanded=False)
             
-            if encontrou_total == 0:
-                st.info(f"Nenhuma ocorrência encontrada para '{termo_busca}' na data {dia_formatado}.")
-            else:
-                st.success(f"Busca completa! Foram encontradas **{encontrou_total}** ocorrências.")
+            st.session_state["busca_dia"] = {
+                "data": data_selecionada, "termo": termo_busca, "ocorrencias": ocorrencias
+            }
+            st.session_state["pagina_resultados"] = 1
 
         except Exception as e:
             st.error(f"Erro crítico no sistema: {e}")
+
+# --- RESULTADOS (PAGINADOS) ---
+# Ficam na sessão: trocar de página não refaz a busca
+
+busca = st.session_state.get("busca_dia")
+if busca is not None:
+    ocorrencias = busca["ocorrencias"]
+    dia_formatado = busca["data"].strftime("%d/%m/%Y")
+    
+    if not ocorrencias:
+        st.info(f"Nenhuma ocorrência encontrada para '{busca['termo']}' na data {dia_formatado}.")
+    else:
+        st.success(f"Busca completa! Foram encontradas **{len(ocorrencias)}** ocorrências.")
+        
+        total_paginas = pagina_de_resultados(ocorrencias, 1)[2]
+        if total_paginas > 1:
+            st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, key="pagina_resultados")
+        visiveis, primeiro, _ = pagina_de_resultados(ocorrencias, st.session_state.get("pagina_resultados", 1))
+        
+        for numero, (parte, num_pag, i, inicio, bloco) in enumerate(visiveis, start=primeiro):
+            str_parte = f"{parte:02d}"
+            url = url_caderno(busca["data"], parte)
+            
+            # --- MONTAGEM DO CARD DE RESULTADO ---
+            with st.expander(f"📌 Ocorrência #{numero} | Caderno {str_parte} - Pág {num_pag + 1}", expanded=True):
+                
+                # Monta o texto formatado linha a linha
+                texto_final_md = ""
+                for idx_bloco, texto_linha in enumerate(bloco):
+                    idx_real = idx_bloco + inicio
+                    
+                    # Se for a linha do termo, realça. Se não, deixa cinza (contexto)
+                    if idx_real == i:
+                        linha_md = realcar_termo(texto_linha, busca["termo"])
+                        # Adiciona uma seta para indicar a linha
+                        texto_final_md += f"> {linha_md}  \n" 
+                    else:
+                        # Texto cinza para contexto
+                        texto_final_md += f"<span style='color:gray'>{texto_linha}</span>  \n"
+                
+                # Exibe o texto formatado (permite HTML para o cinza)
+                st.markdown(texto_final_md, unsafe_allow_html=True)
+                
+                # Botão para abrir o PDF direto
+                st.link_button(f"Abrir PDF Original (Pág {num_pag+1})", url)
             
             # --- RODAPÉ DA BARRA LATERAL ---
 with st.sidebar:
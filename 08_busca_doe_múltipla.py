@@ -1,10 +1,9 @@
 import streamlit as st
-import requests
-import io
-from pypdf import PdfReader
-from datetime import datetime, timedelta
-import re
-import unicodedata
+from datetime import datetime
+from doe import config
+from doe.baixador import url_caderno
+from doe.busca import pagina_de_resultados, realcar_bloco
+from doe.trabalhos import CANCELADO, FALHOU, obter_fila, varrer_blocos
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
@@ -95,30 +94,64 @@ st.markdown(
 )
 
 # --- FUNÇÕES AUXILIARES ---
-def remover_acentos(texto):
-    if not texto: return ""
-    nfkd = unicodedata.normalize('NFKD', texto)
-    return "".join([c for c in nfkd if not unicodedata.combining(c)])
 
-def realcar_termo(linha, termo, ignorar_acentos=False):
-    if not termo: return linha
-    
-    termo_busca = termo.lower()
-    linha_busca = linha.lower()
+def exibir_busca(id_trabalho, acompanhando=False, pode_cancelar=False):
+    """
+    Andamento e resultados (paginados) de uma varredura. Enquanto ela não termina,
+    roda como fragmento (`acompanhando`), refeito algumas vezes por segundo
+    (config.ATUALIZACOES_POR_SEGUNDO) com os parciais. Só a sessão que enviou a
+    varredura (`pode_cancelar`) vê o botão de cancelar.
+    """
+    trabalho = obter_fila().obter(id_trabalho)
+    if trabalho is None:
+        return
+    progresso = trabalho.progresso()
+    parametros = trabalho.parametros
+    resultados = trabalho.parciais()
     
-    if ignorar_acentos:
-        termo_busca = remover_acentos(termo_busca)
-        linha_busca = remover_acentos(linha_busca)
+    if trabalho.ativo:
+        with st.status(f"📂 {progresso.get('atual', 'Aguardando na fila...')}", state="running"):
+            st.write(f"Dias lidos: {progresso.get('dias', 0)}/{progresso.get('dias_totais', '?')} | Resultados até agora: {len(resultados)}")
+            if pode_cancelar and st.button("⏹️ Cancelar varredura"):
+                trabalho.cancelar()
+    elif trabalho.estado == CANCELADO:
+        st.warning("⏹️ Varredura cancelada. Abaixo, o que foi encontrado até ali.")
+    elif trabalho.estado == FALHOU:
+        st.error(f"Erro na varredura: {trabalho.erro}")
     
-    start = linha_busca.find(termo_busca)
-    if start == -1:
-        return linha
+    if not resultados:
+        if not trabalho.ativo:
+            st.info("Nenhum resultado encontrado.")
+    else:
+        if not trabalho.ativo:
+            st.success(f"✅ Encontrados **{len(resultados)}** registros.")
+        
+        chave_pagina = f"pagina_{trabalho.id}"
+        total_paginas = pagina_de_resultados(resultados, 1)[2]
+        if total_paginas > 1:
+            st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, value=1, key=chave_pagina)
+        visiveis, primeiro, _ = pagina_de_resultados(resultados, st.session_state.get(chave_pagina, 1))
         
-    prefixo = linha[:start]
-    miolo = linha[start:start+len(termo)]
-    sufixo = linha[start+len(termo):]
+        for numero, (data_bloco, parte, num_pag, _, texto_bloco, dobra, termos_bloco) in enumerate(visiveis, start=primeiro):
+            str_parte = f"{parte:02d}"
+            url = url_caderno(data_bloco, parte)
+            
+            titulo = f"📌 Resultado #{numero} | {data_bloco.strftime('%d/%m/%Y')} | Caderno {str_parte} | Pág {num_pag + 1}"
+            if parametros["monitorados"] or parametros.get("aproximada"):
+                # Na busca aproximada, as grafias encontradas (palavras quebradas numa linha só)
+                titulo += f" | {', '.join(' '.join(t.split()) for t in termos_bloco)}"
+            
+            with st.expander(titulo, expanded=False):
+                # Todas as ocorrências de todos os termos, sobre a forma sem acentos guardada no índice
+                linhas_pintadas = realcar_bloco(texto_bloco, termos_bloco, parametros["ignorar_acentos"], dobra)
+                texto_md = "".join(f"{linha}  \n" for linha in linhas_pintadas)
+                st.markdown(texto_md, unsafe_allow_html=True)
+                # Adicionamos #page={num_pag + 1} ao final da URL
+                st.link_button(f"Abrir PDF", f"{url}#page={num_pag + 1}")
     
-    return f"{prefixo}:orange[**{miolo}**]{sufixo}"
+    # Terminou enquanto o fragmento acompanhava: a página inteira é refeita sem o fragmento
+    if acompanhando and not trabalho.ativo:
+        st.rerun()
 
 # --- INTERFACE ---
 
@@ -152,105 +185,85 @@ with st.container():
             st.write("Filtros de Texto:")
             busca_exata = st.checkbox("Busca Exata (ignora palavras parciais)", value=False)
             ignorar_acentos = st.checkbox("Ignorar Acentos (recomendado)", value=True)
+            busca_aproximada = st.checkbox(
+                "Busca Aproximada (tolera erros de digitação)", value=False,
+                help="Acha também palavras com letras trocadas, faltando ou sobrando e as quebradas por hífen no fim da linha (ex.: 'licita- ção'). Sempre ignora acentos."
+            )
+
+        # Lista de monitoramento: centenas de nomes/CPF/CNPJ verificados de uma só vez
+        lista_monitoramento = st.text_area(
+            "📋 Lista de Monitoramento (um termo por linha)",
+            placeholder="Ex: nome de empresa, CPF, CNPJ...",
+            help="Quando preenchida, substitui os termos acima. Cada termo é procurado como palavra inteira."
+        )
 
     st.write("") 
     botao_pesquisar = st.button("INICIAR PESQUISA")
 
 # --- LÓGICA DE BUSCA ---
+# A varredura roda em segundo plano: mexer nos campos, recarregar ou sair da página
+# não a interrompe. O link (?trabalho=...) traz os resultados de volta.
+# A fila é do servidor inteiro: cada sessão só lista (e só cancela) as buscas
+# que ela mesma enviou; as abertas pelo link de outra sessão são só para consulta.
+
+fila = obter_fila()
+meus_trabalhos = st.session_state.setdefault("meus_trabalhos_busca", [])
+
+if "trabalho_busca" not in st.session_state and st.query_params.get("trabalho"):
+    st.session_state["trabalho_busca"] = st.query_params["trabalho"]
+
 if botao_pesquisar:
     
-    if not termo_1:
+    termos_monitorados = [l.strip() for l in lista_monitoramento.splitlines() if l.strip()]
+    
+    if not termo_1 and not termos_monitorados:
         st.warning("⚠️ O campo 'Termo Principal' é obrigatório.")
     elif data_fim < data_inicio:
         st.error("⚠️ Data Final menor que Inicial.")
     else:
-        area_resultados = st.empty() 
-        container_resultados = area_resultados.container()
-        
-        total_geral_encontrado = 0
-        status_box = st.status("🚀 Iniciando os motores...", expanded=True)
-        
-        data_atual = data_inicio
+        termos_ativos = tuple(t for t in [termo_1, termo_2] if t)
+        descricao = ", ".join(termos_monitorados[:3] if termos_monitorados else termos_ativos)
         
-        while data_atual <= data_fim:
-            dia_formatado = data_atual.strftime("%d/%m/%Y")
-            data_url = data_atual.strftime("%Y%m%d")
-            
-            status_box.update(label=f"📂 Lendo dia **{dia_formatado}**...", state="running")
-            
-            termos_ativos = [t for t in [termo_1, termo_2] if t]
-            termos_processados = []
-            for t in termos_ativos:
-                t_proc = t.lower()
-                if ignorar_acentos: t_proc = remover_acentos(t_proc)
-                termos_processados.append(t_proc)
-            
-            parte = 1 
-            
-            while True:
-                str_parte = f"{parte:02d}"
-                url = f"http://imagens.seplag.ce.gov.br/PDF/{data_url}/do{data_url}p{str_parte}.pdf"
-                
-                try:
-                    resposta = requests.get(url, timeout=10)
-                    if resposta.status_code in [404, 300]: break 
-                    if resposta.status_code != 200: break 
-                except: break
+        # Os dias que ainda não estão no índice são baixados e lidos em paralelo, em ordem de data.
+        # A busca em si é feita no índice de texto completo, dia a dia, e os termos da lista
+        # viram um único autômato, compilado uma vez para toda a varredura. A busca aproximada
+        # troca cada palavra pelas parecidas do vocabulário do índice antes de consultar.
+        trabalho = fila.enviar(
+            "busca", f"{descricao} | {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}",
+            varrer_blocos, data_inicio=data_inicio, data_fim=data_fim, termos=termos_ativos,
+            todos="E (" in tipo_logica, exata=busca_exata, ignorar_acentos=ignorar_acentos,
+            monitorados=tuple(termos_monitorados), aproximada=busca_aproximada
+        )
+        meus_trabalhos.append(trabalho.id)
+        st.session_state["trabalho_busca"] = trabalho.id
+        st.query_params["trabalho"] = trabalho.id
 
-                try:
-                    arquivo_memoria = io.BytesIO(resposta.content)
-                    leitor = PdfReader(arquivo_memoria)
-                    
-                    for num_pag, pagina in enumerate(leitor.pages):
-                        texto_pag = pagina.extract_text()
-                        if not texto_pag: continue
-                        
-                        blocos = texto_pag.split("*** *** ***")
-                        
-                        for idx_bloco, texto_bloco in enumerate(blocos):
-                            
-                            bloco_busca = texto_bloco.lower()
-                            if ignorar_acentos: bloco_busca = remover_acentos(bloco_busca)
-                            
-                            resultados_termos = []
-                            for t_proc in termos_processados:
-                                encontrou_este = False
-                                if busca_exata:
-                                    padrao = r"\b" + re.escape(t_proc) + r"\b"
-                                    if re.search(padrao, bloco_busca): encontrou_este = True
-                                else:
-                                    if t_proc in bloco_busca: encontrou_este = True
-                                resultados_termos.append(encontrou_este)
-                            
-                            match_final = False
-                            if "E (" in tipo_logica:
-                                match_final = all(resultados_termos)
-                            else:
-                                match_final = any(resultados_termos)
-                            
-                            if match_final:
-                                total_geral_encontrado += 1
-                                linhas_bloco = [l.strip() for l in texto_bloco.split('\n') if l.strip()]
-                                
-                                with container_resultados:
-                                    with st.expander(f"📌 Resultado #{total_geral_encontrado} | {dia_formatado} | Caderno {str_parte} | Pág {num_pag + 1}", expanded=False):
-                                        texto_md = ""
-                                        for linha in linhas_bloco:
-                                            linha_pintada = realcar_termo(linha, termo_1, ignorar_acentos)
-                                            if termo_2:
-                                                linha_pintada = realcar_termo(linha_pintada, termo_2, ignorar_acentos)
-                                            texto_md += f"{linha_pintada}  \n"
-                                        st.markdown(texto_md, unsafe_allow_html=True)
-                                        # --- AQUI ESTÁ A MUDANÇA ---
-                                        # Adicionamos #page={num_pag + 1} ao final da URL
-                                        st.link_button(f"Abrir PDF", f"{url}#page={num_pag + 1}")
-                except:
-                    pass
-                parte += 1
-            data_atual += timedelta(days=1)
-            
-        status_box.update(label="Varredura completa!", state="complete", expanded=False)
-        if total_geral_encontrado == 0:
-            st.info("Nenhum resultado encontrado.")
-        else:
-            st.success(f"✅ Encontrados **{total_geral_encontrado}** registros.")
\ No newline at end of file
+trabalhos = [t for t in fila.listar("busca") if t.id in meus_trabalhos]
+aberto = fila.obter(st.session_state.get("trabalho_busca"))
+if aberto is not None and aberto not in trabalhos:
+    # Aberta pelo link: continua na lista desta página, sem virar da sessão
+    trabalhos.insert(0, aberto)
+if len(trabalhos) > 1:
+    ids = [t.id for t in trabalhos]
+    atual = st.session_state.get("trabalho_busca")
+    rotulos = {t.id: f"{t.descricao} (enviada às {datetime.fromtimestamp(t.criado):%H:%M})" for t in trabalhos}
+    escolhido = st.selectbox(
+        "🗂️ Buscas recentes", ids, index=ids.index(atual) if atual in ids else 0,
+        format_func=lambda id_trabalho: rotulos.get(id_trabalho, id_trabalho)
+    )
+    if escolhido != atual:
+        st.session_state["trabalho_busca"] = escolhido
+        st.query_params["trabalho"] = escolhido
+
+# --- RESULTADOS (PAGINADOS) ---
+# Ficam no trabalho: trocar de página não refaz a varredura
+
+trabalho = fila.obter(st.session_state.get("trabalho_busca"))
+if trabalho is not None:
+    pode_cancelar = trabalho.id in meus_trabalhos
+    if trabalho.ativo:
+        st.fragment(run_every=1 / config.ATUALIZACOES_POR_SEGUNDO)(exibir_busca)(
+            trabalho.id, acompanhando=True, pode_cancelar=pode_cancelar
+        )
+    else:
+        exibir_busca(trabalho.id, pode_cancelar=pode_cancelar)
@@ -0,0 +1,53 @@
+"""
+Versão original do leitor de aditivos, só com expressões regulares. Não roda em
+produção: é a referência do benchmark, de bench.conferir_aditivos e de
+tests/test_aditivos.py, que conferem o leitor sem retrocesso (doe.aditivos) contra ela.
+"""
+import re
+
+from doe.aditivos import classificar_tipo_aditivo, formatar_moeda_br, limpar_texto_multilinha, limpar_valor_monetario
+from doe.entidades import COLUNAS_DOCUMENTO, COLUNAS_ID
+
+# Colunas que a versão com regex não tem (identificação das entidades)
+COLUNAS_NOVAS = {*COLUNAS_ID.values(), *COLUNAS_DOCUMENTO.values()}
+
+
+def sem_colunas_novas(itens):
+    """Aditivos de `extrair_dados_pagina` sem as colunas que a referência não produz."""
+    return [{k: v for k, v in item.items() if k not in COLUNAS_NOVAS} for item in itens]
+
+
+def extrair_dados_pagina_regex(texto_pagina, data_ref, nome_arquivo, num_pag, url_arquivo):
+    """Implementação original de `extrair_dados_pagina`, só com expressões regulares."""
+    dados_extraidos = []
+    padrao_bloco = r"(EXTRATO D[EO] ADITIVO.*?)(?=\nEXTRATO|\nSECRETARIA|\nPREFEITURA|\nESTADO DO CEARÁ|\*\*\*|$)"
+    blocos = re.findall(padrao_bloco, texto_pagina, flags=re.DOTALL | re.IGNORECASE)
+    
+    for bloco in blocos:
+        item = {
+            "Data": data_ref,
+            "Órgão": "Não identificado",
+            "Contratado(a)": "", 
+            "Valor Float": 0.0,
+            "Objeto": "",
+            "Tipo": "",
+            "Link": f"{url_arquivo}#page={num_pag}"
+        }
+        
+        match_orgao = re.search(r"CONTRATANTE\s*[:\-\.]\s*(.*?)(?=\n\s*[IVX]+|\n\s*CONTRATAD|\n\s*CNPJ|\n\s*OBJETO)", bloco, re.DOTALL | re.IGNORECASE)
+        if match_orgao: item["Órgão"] = limpar_texto_multilinha(match_orgao.group(1))
+            
+        match_empresa = re.search(r"CONTRATAD[OA]\s*[:\-\.]\s*(.*?)(?=\n\s*[IVX]+|\n\s*OBJETO|\n\s*FUNDAMENTAÇÃO|\n\s*CNPJ|\n\s*VIGÊNCIA)", bloco, re.DOTALL | re.IGNORECASE)
+        if match_empresa: item["Contratado(a)"] = limpar_texto_multilinha(match_empresa.group(1))
+            
+        match_valor = re.search(r"R\$\s*([\d\.,]+)", bloco)
+        if match_valor: item["Valor Float"] = limpar_valor_monetario(match_valor.group(1))
+            
+        match_objeto = re.search(r"OBJETO\s*[:\-\.]\s*(.*?)(?=\n\s*[IVX]+|\n\s*VALOR|\n\s*DOTAÇÃO|\n\s*VIGÊNCIA|\n\s*SIGNATÁRIOS|\n\s*DATA|\n\s*FUNDAMENTAÇÃO)", bloco, re.DOTALL | re.IGNORECASE)
+        if match_objeto: item["Objeto"] = limpar_texto_multilinha(match_objeto.group(1))
+        
+        item["Tipo"] = classificar_tipo_aditivo(item["Objeto"], item["Valor Float"])
+        item["Valor Formatado"] = formatar_moeda_br(item["Valor Float"])
+        
+        dados_extraidos.append(item)
+    return dados_extraidos
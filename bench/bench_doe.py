@@ -0,0 +1,261 @@
+"""
+Benchmark do robô do DOE, sem rede: mede download, extração (pypdf x pdfplumber),
+separação dos blocos, extração de aditivos e buscas sobre os PDFs de bench/fixtures.
+
+Grave as fixtures uma vez (python -m bench.gravar_fixtures AAAA-MM-DD ...) e rode:
+    python -m bench.bench_doe
+    python -m bench.bench_doe --json atual.json --comparar base.json --tolerancia 0.25
+
+Com --comparar, termina com código 1 se alguma etapa ficar mais lenta que a
+base além da tolerância.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from bench.servidor_local import DIR_FIXTURES, ServidorLocal
+from doe import config
+
+TERMOS_BUSCA = ["licitação", "pregão eletrônico", "extrato", "portaria"]
+TAMANHO_LISTA_MONITORAMENTO = 300
+
+
+def _fixtures(diretorio):
+    """{data: [caminho, ...]} das fixtures, em ordem."""
+    dias = {}
+    for nome in sorted(os.listdir(diretorio)):
+        pasta = os.path.join(diretorio, nome)
+        if len(nome) != 8 or not nome.isdigit() or not os.path.isdir(pasta):
+            continue
+        pdfs = sorted(os.path.join(pasta, f) for f in os.listdir(pasta) if f.endswith(".pdf"))
+        if pdfs:
+            dias[datetime.strptime(nome, "%Y%m%d").date()] = pdfs
+    return dias
+
+
+class Relatorio:
+    def __init__(self):
+        self.etapas = []
+
+    def medir(self, etapa, funcao, unidade, bytes_processados=0):
+        """Roda `funcao` (que devolve a quantidade de itens processados) e guarda o tempo."""
+        inicio = time.perf_counter()
+        itens = funcao()
+        segundos = time.perf_counter() - inicio
+        self.etapas.append({
+            "etapa": etapa,
+            "itens": itens,
+            "unidade": unidade,
+            "segundos": round(segundos, 4),
+            "itens_por_s": round(itens / segundos, 2) if segundos else 0.0,
+            "mb_por_s": round(bytes_processados / 1048576 / segundos, 2) if segundos and bytes_processados else None,
+        })
+        return itens
+
+    def imprimir(self):
+        print(f"{'etapa':<38} {'itens':>8} {'unidade':<8} {'seg':>9} {'itens/s':>11} {'MB/s':>8}")
+        for e in self.etapas:
+            mb = f"{e['mb_por_s']:.2f}" if e["mb_por_s"] is not None else "-"
+            print(f"{e['etapa']:<38} {e['itens']:>8} {e['unidade']:<8} {e['segundos']:>9.3f} {e['itens_por_s']:>11.1f} {mb:>8}")
+
+    def comparar(self, base, tolerancia):
+        """Etapas que ficaram mais lentas que a base além da tolerância."""
+        anteriores = {e["etapa"]: e for e in base["etapas"]}
+        regressoes = []
+        for e in self.etapas:
+            anterior = anteriores.get(e["etapa"])
+            if anterior and anterior["itens_por_s"] and e["itens_por_s"] < anterior["itens_por_s"] * (1 - tolerancia):
+                regressoes.append((e["etapa"], anterior["itens_por_s"], e["itens_por_s"]))
+        return regressoes
+
+
+# --- ETAPAS ---
+
+def medir_download(relatorio, dias, url_base):
+    from doe.baixador import baixar_periodo
+
+    config.URL_BASE = url_base
+    total_bytes = sum(os.path.getsize(p) for pdfs in dias.values() for p in pdfs)
+    inicio, fim = min(dias), max(dias)
+
+    def baixar():
+        return sum(len(cadernos) for _, cadernos, _ in baixar_periodo(inicio, fim))
+
+    relatorio.medir("download (rede local)", baixar, "cadernos", total_bytes)
+    relatorio.medir("download (cache)", baixar, "cadernos", total_bytes)
+
+
+def medir_extracao(relatorio, dias, paginas_max):
+    from doe.extracao import EXTRATOR_LAYOUT, EXTRATOR_PYPDF, contar_paginas, extrair_paginas, iterar_paginas
+
+    pdfs = [p for caminhos in dias.values() for p in caminhos]
+    total_bytes = sum(os.path.getsize(p) for p in pdfs)
+    textos = {}
+
+    for extrator in (EXTRATOR_PYPDF, EXTRATOR_LAYOUT):
+        lidos = []
+
+        def serial():
+            for caminho in pdfs:
+                fim = min(contar_paginas(caminho), paginas_max) if paginas_max else None
+                lidos.extend(iterar_paginas(caminho, extrator, 0, fim))
+            return len(lidos)
+
+        relatorio.medir(f"extração {extrator} (1 núcleo)", serial, "páginas", total_bytes)
+        textos[extrator] = lidos
+
+    itens = [(data, parte, caminho) for data, caminhos in dias.items() for parte, caminho in enumerate(caminhos, start=1)]
+    for extrator in (EXTRATOR_PYPDF, EXTRATOR_LAYOUT):
+        relatorio.medir(
+            f"extração {extrator} ({config.WORKERS_EXTRACAO} processo(s))",
+            lambda: sum(1 for _ in extrair_paginas(itens, extrator=extrator)),
+            "páginas", total_bytes
+        )
+    return textos
+
+
+def medir_blocos(relatorio, textos_pypdf):
+    from doe.blocos import separar_blocos
+
+    total_bytes = sum(len(t.encode("utf-8")) for t in textos_pypdf)
+    relatorio.medir(
+        "separação de blocos",
+        lambda: sum(len(separar_blocos(t)) for t in textos_pypdf),
+        "blocos", total_bytes
+    )
+
+
+def medir_aditivos(relatorio, textos_layout):
+    from bench.aditivos_regex import extrair_dados_pagina_regex, sem_colunas_novas
+    from doe.aditivos import extrair_dados_pagina
+
+    total_bytes = sum(len(t.encode("utf-8")) for t in textos_layout)
+    saidas = {}
+
+    for nome, funcao in (("regex", extrair_dados_pagina_regex), ("sem retrocesso", extrair_dados_pagina)):
+        def extrair():
+            saidas[nome] = [
+                funcao(texto, "01/01/2025", "bench.pdf", num_pag, "http://bench")
+                for num_pag, texto in enumerate(textos_layout, start=1)
+            ]
+            return len(textos_layout)
+
+        relatorio.medir(f"extrair_dados_pagina ({nome})", extrair, "páginas", total_bytes)
+
+    # As duas versões precisam devolver exatamente os mesmos aditivos
+    divergentes = sum(1 for a, b in zip(saidas["regex"], saidas["sem retrocesso"]) if a != sem_colunas_novas(b))
+    if divergentes:
+        print(f"AVISO: extrair_dados_pagina divergiu da versão com regex em {divergentes} página(s)")
+
+
+def medir_busca(relatorio, textos_pypdf, diretorio_temp):
+    from datetime import date
+    from doe.blocos import separar_blocos
+    from doe.indice import IndiceBlocos
+    from doe.multitermos import AutomatoTermos
+    from doe.normalizacao import dobrar
+
+    blocos = [b for t in textos_pypdf for b in separar_blocos(t)]
+    total_bytes = sum(len(b.encode("utf-8")) for b in blocos)
+    termos = [dobrar(t) for t in TERMOS_BUSCA]
+
+    def varredura_linear():
+        # Como o 08_busca_doe_múltipla.py fazia: dobra cada bloco e procura termo a termo
+        for bloco in blocos:
+            busca = dobrar(bloco)
+            [t in busca for t in termos]
+        return len(blocos)
+
+    relatorio.medir("busca linear (4 termos)", varredura_linear, "blocos", total_bytes)
+
+    indice = IndiceBlocos(os.path.join(diretorio_temp, "indice_bench.db"))
+    dia = date(2000, 1, 1)
+    relatorio.medir(
+        "indexação FTS5",
+        lambda: indice.indexar_caderno(dia, 1, textos_pypdf, "bench") or len(blocos),
+        "blocos", total_bytes
+    )
+
+    def consultas():
+        for termo in TERMOS_BUSCA:
+            indice.buscar([termo])
+        indice.buscar(TERMOS_BUSCA[:2], todos=False)
+        indice.buscar(TERMOS_BUSCA[:2], todos=True, exata=True)
+        return len(TERMOS_BUSCA) + 2
+
+    relatorio.medir("consultas no índice", consultas, "consultas")
+
+    def consultas_aproximadas():
+        # Termos com uma letra trocada: só acham alguma coisa pela busca aproximada
+        for termo in TERMOS_BUSCA:
+            indice.buscar_aproximada([termo[:2] + "x" + termo[3:]])
+        return len(TERMOS_BUSCA)
+
+    relatorio.medir("consultas aproximadas no índice", consultas_aproximadas, "consultas")
+
+    # Lista de monitoramento grande: palavras do próprio texto, para haver acertos
+    palavras = sorted({p for b in blocos[:200] for p in dobrar(b).split() if len(p) > 5})
+    lista = palavras[:TAMANHO_LISTA_MONITORAMENTO] or TERMOS_BUSCA
+    automato = AutomatoTermos(lista)
+
+    def monitorar():
+        for bloco in blocos:
+            automato.termos_encontrados(dobrar(bloco))
+        return len(blocos)
+
+    relatorio.medir(f"lista de monitoramento ({len(lista)} termos)", monitorar, "blocos", total_bytes)
+
+
+# --- PRINCIPAL ---
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark do robô do DOE sobre fixtures locais")
+    parser.add_argument("--fixtures", default=DIR_FIXTURES)
+    parser.add_argument("--paginas-max", type=int, default=0, help="limita as páginas por caderno na extração serial")
+    parser.add_argument("--json", help="grava o resultado neste arquivo")
+    parser.add_argument("--comparar", help="resultado JSON anterior, para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    args = parser.parse_args(argumentos)
+
+    dias = _fixtures(args.fixtures) if os.path.isdir(args.fixtures) else {}
+    if not dias:
+        print(f"Nenhuma fixture em {args.fixtures}. Grave algumas com: python -m bench.gravar_fixtures AAAA-MM-DD")
+        return 2
+
+    diretorio_temp = tempfile.mkdtemp(prefix="bench_doe_")
+    config.DIR_DADOS = diretorio_temp  # Cache e índices do benchmark ficam isolados
+    servidor = ServidorLocal(args.fixtures)
+    relatorio = Relatorio()
+    try:
+        medir_download(relatorio, dias, servidor.iniciar())
+        textos = medir_extracao(relatorio, dias, args.paginas_max)
+        medir_blocos(relatorio, textos["pypdf"])
+        medir_aditivos(relatorio, textos["pdfplumber-layout"])
+        medir_busca(relatorio, textos["pypdf"], diretorio_temp)
+    finally:
+        servidor.parar()
+        shutil.rmtree(diretorio_temp, ignore_errors=True)
+
+    relatorio.imprimir()
+    resultado = {"quando": datetime.now().isoformat(timespec="seconds"), "etapas": relatorio.etapas}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressoes = relatorio.comparar(json.load(f), args.tolerancia)
+        for etapa, antes, agora in regressoes:
+            print(f"REGRESSÃO: {etapa}: {antes:.1f} -> {agora:.1f} itens/s")
+        if regressoes:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Confere o leitor de aditivos sem retrocesso contra a versão original com regex,
+em páginas geradas ao acaso a partir dos pedaços que mais pesam nas regras
+(rótulos, quebras de linha, numerais romanos, R$, marcas de fim de bloco).
+
+    python -m bench.conferir_aditivos --casos 200000 --semente 7
+
+Termina com código 1 e mostra a primeira página em que as duas divergirem.
+"""
+import argparse
+import random
+import sys
+
+from bench.aditivos_regex import extrair_dados_pagina_regex, sem_colunas_novas
+from doe.aditivos import extrair_dados_pagina
+
+PEDACOS = [
+    "EXTRATO DE ADITIVO", "extrato do aditivo", "\n", "\n", "\n  ", "\n\n", "\t", " ", "  ",
+    "CONTRATANTE", "contratante", "CONTRATADA", "Contratado", ":", "-", ".", " : ",
+    "OBJETO", "objeto", "CNPJ", "VIGÊNCIA", "vigência", "VALOR", "DOTAÇÃO", "SIGNATÁRIOS",
+    "DATA", "FUNDAMENTAÇÃO", "I", "II -", "x", "v", "ivx", "ı", "İ",
+    "R$", "R$ 1.234,56", "r$ 5", "12", ",", "***", "\nEXTRATO", "\nSECRETARIA", "SECRETARIA",
+    "\nESTADO DO CEARÁ", "ESTADO DO CEARÁ", "\nPREFEITURA", "EMPRESA XYZ", "abc",
+    "prorrogação", "PRAZO", "ACRÉSCIMO",
+]
+
+
+def pagina_aleatoria(sorteio, max_pedacos=40):
+    return "".join(sorteio.choice(PEDACOS) for _ in range(sorteio.randint(0, max_pedacos)))
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Equivalência do leitor de aditivos com a versão regex")
+    parser.add_argument("--casos", type=int, default=100000)
+    parser.add_argument("--semente", type=int, default=7)
+    args = parser.parse_args(argumentos)
+
+    sorteio = random.Random(args.semente)
+    for _ in range(args.casos):
+        texto = pagina_aleatoria(sorteio)
+        novo = sem_colunas_novas(extrair_dados_pagina(texto, "01/01/2025", "x.pdf", 1, "http://x"))
+        antigo = extrair_dados_pagina_regex(texto, "01/01/2025", "x.pdf", 1, "http://x")
+        if novo != antigo:
+            print(f"Divergência na página {texto!r}")
+            print(f"  novo:  {novo}")
+            print(f"  regex: {antigo}")
+            return 1
+    print(f"{args.casos} páginas conferidas: resultados idênticos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
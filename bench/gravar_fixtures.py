@@ -0,0 +1,41 @@
+"""
+Grava cadernos reais do DOE em bench/fixtures, para o benchmark rodar sem rede depois.
+
+Uso:
+    python -m bench.gravar_fixtures 2025-03-10 2025-03-11
+"""
+import argparse
+import os
+from datetime import date
+
+import requests
+
+from bench.servidor_local import DIR_FIXTURES
+from doe import config
+from doe.baixador import STATUS_FIM, url_caderno
+
+
+def gravar_dia(data, destino=DIR_FIXTURES, max_partes=30):
+    pasta = os.path.join(destino, data.strftime("%Y%m%d"))
+    os.makedirs(pasta, exist_ok=True)
+    gravados = 0
+    for parte in range(1, max_partes + 1):
+        url = url_caderno(data, parte)
+        with requests.get(url, headers={'User-Agent': config.USER_AGENT}, timeout=60, stream=True) as resposta:
+            if resposta.status_code in STATUS_FIM:
+                break
+            resposta.raise_for_status()
+            with open(os.path.join(pasta, os.path.basename(url)), "wb") as f:
+                for pedaco in resposta.iter_content(chunk_size=256 * 1024):
+                    f.write(pedaco)
+        gravados += 1
+    return gravados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grava cadernos reais do DOE como fixtures do benchmark")
+    parser.add_argument("datas", nargs="+", type=date.fromisoformat, help="datas no formato AAAA-MM-DD")
+    args = parser.parse_args()
+
+    for data in args.datas:
+        print(f"{data}: {gravar_dia(data)} caderno(s)")
@@ -0,0 +1,122 @@
+"""
+Servidor HTTP local que imita o endereço dos PDFs da SEPLAG, para medir o robô sem rede.
+
+Os arquivos ficam em bench/fixtures/AAAAMMDD/doAAAAMMDDpNN.pdf e são servidos em
+/PDF/AAAAMMDD/doAAAAMMDDpNN.pdf. Depois do último caderno de um dia o servidor
+responde 404 nos dias ímpares e 300 nos pares, como o servidor real faz às vezes.
+Pedidos com "Range: bytes=N-" recebem 206 com o resto do arquivo. Com `cortar`,
+a primeira resposta de cada arquivo cai no meio, para exercitar a retomada.
+
+Uso avulso:
+    python -m bench.servidor_local --porta 8765
+"""
+import argparse
+import os
+import re
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+DIR_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+_padrao_caminho = re.compile(r"^/PDF/(\d{8})/(do\d{8}p\d{2}\.pdf)$")
+
+
+_padrao_faixa = re.compile(r"^bytes=(\d+)-$")
+
+
+class _Manipulador(SimpleHTTPRequestHandler):
+    diretorio_fixtures = DIR_FIXTURES
+    cortar = False
+    ja_cortados = None
+    ja_cortados_lock = None
+
+    def log_message(self, formato, *args):
+        pass
+
+    def translate_path(self, path):
+        casamento = _padrao_caminho.match(path.split("?")[0])
+        if not casamento:
+            return os.path.join(self.diretorio_fixtures, "__inexistente__")
+        return os.path.join(self.diretorio_fixtures, casamento.group(1), casamento.group(2))
+
+    def send_head(self):
+        caminho = self.translate_path(self.path)
+        if not os.path.isfile(caminho):
+            casamento = _padrao_caminho.match(self.path.split("?")[0])
+            status = 300 if casamento and int(casamento.group(1)[-2:]) % 2 == 0 else 404
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        faixa = _padrao_faixa.match(self.headers.get("Range", ""))
+        if not faixa:
+            return super().send_head()
+
+        tamanho = os.path.getsize(caminho)
+        inicio = int(faixa.group(1))
+        if inicio >= tamanho:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{tamanho}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+        arquivo = open(caminho, "rb")
+        arquivo.seek(inicio)
+        self.send_response(206)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Range", f"bytes {inicio}-{tamanho - 1}/{tamanho}")
+        self.send_header("Content-Length", str(tamanho - inicio))
+        self.end_headers()
+        return arquivo
+
+    def copyfile(self, origem, destino):
+        with self.ja_cortados_lock:
+            cortar = self.cortar and self.path not in self.ja_cortados
+            if cortar:
+                self.ja_cortados.add(self.path)
+        if not cortar:
+            return shutil.copyfileobj(origem, destino)
+        # Manda só metade do que anunciou e derruba a conexão
+        restante = os.fstat(origem.fileno()).st_size - origem.tell()
+        destino.write(origem.read(restante // 2))
+        self.close_connection = True
+
+
+class ServidorLocal:
+    def __init__(self, diretorio=None, porta=0, cortar=False):
+        manipulador = type("Manipulador", (_Manipulador,), {
+            "diretorio_fixtures": diretorio or DIR_FIXTURES,
+            "cortar": cortar,
+            "ja_cortados": set(),
+            "ja_cortados_lock": threading.Lock(),
+        })
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), manipulador)
+        self._thread = None
+
+    @property
+    def url_base(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/PDF"
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url_base
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local com os PDFs de bench/fixtures")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--fixtures", default=DIR_FIXTURES)
+    parser.add_argument("--cortar", action="store_true", help="derruba a primeira resposta de cada arquivo no meio")
+    args = parser.parse_args()
+
+    servidor = ServidorLocal(args.fixtures, args.porta, args.cortar)
+    print(f"Servindo {args.fixtures} em {servidor.url_base}")
+    servidor._servidor.serve_forever()
@@ -1,12 +1,12 @@
 import streamlit as st
-import requests
-import io
-import pdfplumber
 import pandas as pd
-import re
-import os
 import plotly.express as px
-from datetime import datetime, timedelta
+from datetime import datetime
+from doe import config
+from doe.aditivos import COLUNAS_EXPORTACAO, formatar_moeda_br, valor_excel
+from doe.metricas import obter_metricas
+from doe.resultados import obter_resultados
+from doe.trabalhos import CANCELADO, CONCLUIDO, FALHOU, obter_fila, varrer_aditivos
 
 # --- CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(page_title="Extrator Pro - DOE/CE", layout="wide")
@@ -26,21 +26,26 @@ st.markdown("""
 
 # --- FUNÇÕES ---
 
-def limpar_texto_multilinha(texto):
-    if not texto: return ""
-    return " ".join(texto.split())
+@st.cache_data(show_spinner=False, max_entries=16)
+def montar_dataframe(data_inicio, data_fim, versao, entidade=None):
+    """
+    Lê do Parquet só o período pedido (e, com `entidade`, só os cadernos em que ela
+    aparece). A tabela só muda com uma nova varredura (`versao`): trocar a
+    ordenação não a remonta.
+    """
+    df = obter_resultados().carregar(data_inicio, data_fim, entidade=entidade)
+    df['Data_Sort'] = pd.to_datetime(df['Data'])
+    df['Data'] = df['Data_Sort'].dt.strftime('%d/%m/%Y')
+    df['Valor Formatado'] = df['Valor Float'].map(formatar_moeda_br)
+    return df
 
-def limpar_valor_monetario(texto):
-    if not texto: return 0.0
-    try:
-        limpo = texto.upper().replace('R$', '').replace('.', '').replace(',', '.').strip()
-        return float(limpo)
-    except:
-        return 0.0
-
-def formatar_moeda_br(valor):
-    if not isinstance(valor, (float, int)): return "R$ 0,00"
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+@st.cache_data(show_spinner=False, max_entries=64)
+def resumir_periodo(data_inicio, data_fim, versao):
+    """Tabelas pequenas para os gráficos: total por mês e somas por órgão/contratado."""
+    df_mensal, somas = obter_resultados().resumo(data_inicio, data_fim)
+    df_mensal = df_mensal.rename(columns={'valor': 'Valor Float'})
+    df_mensal['Mes_Ano'] = df_mensal['mes'].map(lambda m: f"{m % 100:02d}/{m // 100}")
+    return df_mensal, somas
 
 def truncar_texto(texto, max_chars=20):
     if not texto: return "Não Identificado"
@@ -48,50 +53,81 @@ def truncar_texto(texto, max_chars=20):
         return texto[:max_chars] + "..."
     return texto
 
-def classificar_tipo_aditivo(objeto, valor):
-    tipos = []
-    objeto_upper = objeto.upper() if objeto else ""
-    termos_prazo = ["PRORROGA", "VIGÊNCIA", "PRAZO", "12 MESES", "DOZE MESES", "DILAÇÃO"]
-    termos_valor = ["ACRÉSCIMO", "REAJUSTE", "REALINHAMENTO", "SUPRESSÃO", "REPACTUAÇÃO", "VALOR GLOBAL"]
-    
-    if any(x in objeto_upper for x in termos_prazo): tipos.append("PRAZO")
-    if valor > 0 or any(x in objeto_upper for x in termos_valor): tipos.append("VALOR")
-    if not tipos: return "Outros"
-    return " + ".join(tipos)
+def exibir_monitoramento(id_trabalho, acompanhando=False, pode_cancelar=False):
+    """
+    Painel de acompanhamento da varredura. Enquanto ela não termina, roda como
+    fragmento (`acompanhando`), refeito algumas vezes por segundo
+    (config.ATUALIZACOES_POR_SEGUNDO) sem refazer a página. Só a sessão que
+    enviou a varredura (`pode_cancelar`) vê o botão de cancelar.
+    """
+    trabalho = obter_fila().obter(id_trabalho)
+    if trabalho is None:
+        return
+    progresso = trabalho.progresso()
 
-def extrair_dados_pagina(texto_pagina, data_ref, nome_arquivo, num_pag, url_arquivo):
-    dados_extraidos = []
-    padrao_bloco = r"(EXTRATO D[EO] ADITIVO.*?)(?=\nEXTRATO|\nSECRETARIA|\nPREFEITURA|\nESTADO DO CEARÁ|\*\*\*|$)"
-    blocos = re.findall(padrao_bloco, texto_pagina, flags=re.DOTALL | re.IGNORECASE)
+    st.divider()
+    st.subheader("📡 Monitoramento em Tempo Real")
     
-    for bloco in blocos:
-        item = {
-            "Data": data_ref,
-            "Órgão": "Não identificado",
-            "Contratado(a)": "", 
-            "Valor Float": 0.0,
-            "Objeto": "",
-            "Tipo": "",
-            "Link": f"{url_arquivo}#page={num_pag}"
-        }
-        
-        match_orgao = re.search(r"CONTRATANTE\s*[:\-\.]\s*(.*?)(?=\n\s*[IVX]+|\n\s*CONTRATAD|\n\s*CNPJ|\n\s*OBJETO)", bloco, re.DOTALL | re.IGNORECASE)
-        if match_orgao: item["Órgão"] = limpar_texto_multilinha(match_orgao.group(1))
-            
-        match_empresa = re.search(r"CONTRATAD[OA]\s*[:\-\.]\s*(.*?)(?=\n\s*[IVX]+|\n\s*OBJETO|\n\s*FUNDAMENTAÇÃO|\n\s*CNPJ|\n\s*VIGÊNCIA)", bloco, re.DOTALL | re.IGNORECASE)
-        if match_empresa: item["Contratado(a)"] = limpar_texto_multilinha(match_empresa.group(1))
-            
-        match_valor = re.search(r"R\$\s*([\d\.,]+)", bloco)
-        if match_valor: item["Valor Float"] = limpar_valor_monetario(match_valor.group(1))
-            
-        match_objeto = re.search(r"OBJETO\s*[:\-\.]\s*(.*?)(?=\n\s*[IVX]+|\n\s*VALOR|\n\s*DOTAÇÃO|\n\s*VIGÊNCIA|\n\s*SIGNATÁRIOS|\n\s*DATA|\n\s*FUNDAMENTAÇÃO)", bloco, re.DOTALL | re.IGNORECASE)
-        if match_objeto: item["Objeto"] = limpar_texto_multilinha(match_objeto.group(1))
-        
-        item["Tipo"] = classificar_tipo_aditivo(item["Objeto"], item["Valor Float"])
-        item["Valor Formatado"] = formatar_moeda_br(item["Valor Float"])
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Dias Processados", f"{progresso.get('dias', 0)}/{progresso.get('dias_totais', '?')}")
+    col2.metric("Páginas Lidas", progresso.get('paginas', 0))
+    col3.metric("Palavras Lidas", f"{progresso.get('palavras', 0):,.0f}".replace(",", "."))
+    col4.metric("Aditivos Encontrados", progresso.get('aditivos', 0))
+    
+    st.write("")
+    st.progress(progresso.get('dias', 0) / progresso['dias_totais'] if progresso.get('dias_totais') else 0.0)
+    
+    if trabalho.ativo:
+        if progresso.get('aviso'):
+            st.warning(f"❌ {progresso['aviso']}")
+        st.markdown(f"🗓️ **{progresso.get('atual', 'Aguardando na fila...')}**")
+        if pode_cancelar and st.button("⏹️ Cancelar varredura"):
+            trabalho.cancelar()
         
-        dados_extraidos.append(item)
-    return dados_extraidos
+        # Os últimos aditivos encontrados aparecem enquanto a varredura continua
+        ultimos = trabalho.parciais(max(0, trabalho.quantidade_parciais() - 10))
+        if ultimos:
+            st.dataframe(pd.DataFrame(ultimos)[["Data", "Órgão", "Contratado(a)", "Valor Formatado"]], hide_index=True)
+    elif trabalho.estado == CONCLUIDO:
+        st.success("✅ Processamento Finalizado!")
+    elif trabalho.estado == CANCELADO:
+        st.warning("⏹️ Varredura cancelada. Os dias já processados continuam gravados.")
+    elif trabalho.estado == FALHOU:
+        st.error(f"Erro na varredura: {trabalho.erro}")
+    
+    exibir_desempenho()
+
+    # Terminou enquanto o fragmento acompanhava: a página inteira é refeita para mostrar os resultados
+    if acompanhando and not trabalho.ativo:
+        st.rerun()
+
+def exibir_desempenho():
+    """Tempos por etapa, caches e erros medidos pelo servidor (todas as varreduras desde que ele subiu)."""
+    metricas = obter_metricas()
+    retrato = metricas.retrato()
+    with st.expander("⏱️ Desempenho por etapa"):
+        st.caption(f"Medidas do servidor desde {datetime.fromtimestamp(retrato['desde']):%d/%m/%Y %H:%M}, somando todas as varreduras.")
+        contadores = retrato['contadores']
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Baixado", f"{contadores.get('download.bytes', 0) / 1024 / 1024:.1f} MB".replace(".", ","))
+        col2.metric("Acerto do Cache de PDFs", f"{retrato['taxa_acerto'].get('cache_pdf', 0):.0%}")
+        col3.metric("Acerto do Armazém de Textos", f"{retrato['taxa_acerto'].get('armazem_textos', 0):.0%}")
+
+        if retrato['etapas']:
+            etapas = pd.DataFrame.from_dict(retrato['etapas'], orient="index")
+            etapas.columns = ["Execuções", "Total (s)", "Média (ms)", "Máximo (ms)", "Por Segundo"]
+            st.dataframe(etapas, use_container_width=True)
+        if retrato['erros']:
+            st.markdown("**Erros por tipo**")
+            st.dataframe(pd.DataFrame(retrato['erros']).rename(columns={"etapa": "Etapa", "tipo": "Tipo", "quantidade": "Quantidade"}), hide_index=True)
+
+        col_json, col_prom = st.columns(2)
+        col_json.download_button("📥 Exportar JSON", metricas.para_json(), file_name="metricas_doe.json", mime="application/json")
+        col_prom.download_button("📥 Exportar Prometheus", metricas.para_prometheus(), file_name="metricas_doe.prom", mime="text/plain")
+
+def rotulo_trabalho(id_trabalho):
+    trabalho = obter_fila().obter(id_trabalho)
+    return f"{trabalho.descricao} (enviada às {datetime.fromtimestamp(trabalho.criado):%H:%M})" if trabalho else id_trabalho
 
 # --- UI PRINCIPAL ---
 
@@ -109,113 +145,67 @@ with st.sidebar:
     btn_executar = st.button("🚀 INICIAR VARREDURA", type="primary")
 
 # --- FASE 1: EXECUÇÃO ---
+# A varredura roda em segundo plano: mexer nos filtros, recarregar ou sair da página
+# não a interrompe. O link (?trabalho=...) traz de volta o acompanhamento.
+# A fila é do servidor inteiro: cada sessão só lista (e só cancela) as varreduras
+# que ela mesma enviou; as abertas pelo link de outra sessão são só para consulta.
+
+fila = obter_fila()
+meus_trabalhos = st.session_state.setdefault('meus_trabalhos_aditivos', [])
+
+if 'trabalho_aditivos' not in st.session_state and st.query_params.get('trabalho'):
+    st.session_state['trabalho_aditivos'] = st.query_params['trabalho']
 
 if btn_executar:
     if dt_fim < dt_inicio:
         st.error("Data Final deve ser maior que Inicial.")
     else:
-        if 'resultados_busca' in st.session_state:
-            del st.session_state['resultados_busca']
+        trabalho = fila.enviar(
+            "aditivos", f"{dt_inicio.strftime('%d/%m/%Y')} a {dt_fim.strftime('%d/%m/%Y')}",
+            varrer_aditivos, data_inicio=dt_inicio, data_fim=dt_fim
+        )
+        meus_trabalhos.append(trabalho.id)
+        st.session_state['trabalho_aditivos'] = trabalho.id
+        st.query_params['trabalho'] = trabalho.id
 
+trabalhos = [t for t in fila.listar("aditivos") if t.id in meus_trabalhos]
+if trabalhos:
+    with st.sidebar:
         st.divider()
-        st.subheader("📡 Monitoramento em Tempo Real")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        m_dias = col1.empty()
-        m_pags = col2.empty()
-        m_palavras = col3.empty()
-        m_aditivos = col4.empty()
-        
-        st.write("")
-        barra_progresso = st.progress(0)
-        status_log = st.empty()
-        
-        lista_temp = []
-        dias_totais = (dt_fim - dt_inicio).days + 1
-        dias_proc = 0
-        total_pags = 0
-        total_words = 0
-        total_ads = 0
-        
-        data_cursor = dt_inicio
-        
-        while data_cursor <= dt_fim:
-            url_date = data_cursor.strftime("%Y%m%d")
-            data_str = data_cursor.strftime("%d/%m/%Y")
-            
-            status_log.markdown(f"🗓️ **Pesquisando dia {data_str}...**")
-            
-            parte = 1
-            max_partes = 10 
-            
-            while parte <= max_partes:
-                nome_arq = f"do{url_date}p{f'{parte:02d}'}.pdf"
-                url_web = f"http://imagens.seplag.ce.gov.br/PDF/{url_date}/{nome_arq}"
-                
-                status_log.markdown(f"🗓️ **Dia {data_str}** &nbsp;&nbsp; ➡️ &nbsp;&nbsp; 📄 *Verificando: {nome_arq}*")
-                
-                arquivo_para_abrir = None
-                origem = ""
-                
-                if os.path.exists(nome_arq):
-                    arquivo_para_abrir = open(nome_arq, "rb")
-                    origem = "Local"
-                else:
-                    try:
-                        headers = {'User-Agent': 'Mozilla/5.0'}
-                        check = requests.head(url_web, headers=headers, timeout=5)
-                        if check.status_code == 200:
-                            status_log.markdown(f"🗓️ **Dia {data_str}** &nbsp;&nbsp; ➡️ &nbsp;&nbsp; ⬇️ *Baixando: {url_web}*")
-                            resp = requests.get(url_web, headers=headers, timeout=10)
-                            arquivo_para_abrir = io.BytesIO(resp.content)
-                            origem = "Web"
-                        elif check.status_code == 404:
-                            if parte == 1: status_log.warning(f"❌ Dia {data_str}: Arquivo não encontrado.")
-                            break 
-                        else: break
-                    except: break
+        ids = [t.id for t in trabalhos]
+        atual = st.session_state.get('trabalho_aditivos')
+        if atual not in ids and fila.obter(atual) is not None:
+            # Aberta pelo link: continua na lista desta página, sem virar da sessão
+            ids.insert(0, atual)
+        escolhido = st.selectbox(
+            "🗂️ Varreduras recentes", ids, index=ids.index(atual) if atual in ids else 0,
+            format_func=rotulo_trabalho
+        )
+        if escolhido != atual:
+            st.session_state['trabalho_aditivos'] = escolhido
+            st.query_params['trabalho'] = escolhido
 
-                if arquivo_para_abrir:
-                    try:
-                        with pdfplumber.open(arquivo_para_abrir) as pdf:
-                            total_p_pdf = len(pdf.pages)
-                            for i, page in enumerate(pdf.pages):
-                                status_log.markdown(f"🗓️ **Dia {data_str}** &nbsp;&nbsp; ➡️ &nbsp;&nbsp; 👁️ *Lendo {nome_arq} (Pág {i+1}/{total_p_pdf})*")
-                                texto = page.extract_text(layout=True) or ""
-                                total_words += len(texto.split())
-                                total_pags += 1
-                                
-                                novos = extrair_dados_pagina(texto, data_str, nome_arq, i+1, url_web)
-                                if novos:
-                                    lista_temp.extend(novos)
-                                    total_ads += len(novos)
-                                
-                                if i % 2 == 0:
-                                    m_pags.metric("Páginas Lidas", total_pags)
-                                    m_palavras.metric("Palavras Lidas", f"{total_words:,.0f}".replace(",", "."))
-                                    m_aditivos.metric("Aditivos Encontrados", total_ads)
-                                    
-                        if origem == "Local": arquivo_para_abrir.close()
-                    except: pass
-                
-                parte += 1 
-            
-            dias_proc += 1
-            m_dias.metric("Dias Processados", f"{dias_proc}/{dias_totais}")
-            barra_progresso.progress(dias_proc / dias_totais)
-            data_cursor += timedelta(days=1)
-            
-        st.session_state['resultados_busca'] = lista_temp
-        barra_progresso.progress(1.0)
-        status_log.success("✅ Processamento Finalizado!")
+trabalho = fila.obter(st.session_state.get('trabalho_aditivos'))
+if trabalho is not None:
+    pode_cancelar = trabalho.id in meus_trabalhos
+    if trabalho.ativo:
+        st.fragment(run_every=1 / config.ATUALIZACOES_POR_SEGUNDO)(exibir_monitoramento)(
+            trabalho.id, acompanhando=True, pode_cancelar=pode_cancelar
+        )
+    else:
+        exibir_monitoramento(trabalho.id, pode_cancelar=pode_cancelar)
+
+if trabalho is not None and trabalho.estado == CONCLUIDO:
+    st.session_state['resultados_busca'] = {**trabalho.resultado, "versao": trabalho.terminado}
+else:
+    st.session_state.pop('resultados_busca', None)
 
 # --- FASE 2: VISUALIZAÇÃO ---
 
-if 'resultados_busca' in st.session_state and st.session_state['resultados_busca']:
-    lista_final = st.session_state['resultados_busca']
-    df = pd.DataFrame(lista_final)
-    df['Data_Sort'] = pd.to_datetime(df['Data'], dayfirst=True, errors='coerce')
-    
+busca_atual = st.session_state.get('resultados_busca')
+df = montar_dataframe(busca_atual["inicio"], busca_atual["fim"], busca_atual["versao"]) if busca_atual else None
+
+if df is not None and not df.empty:
     st.divider()
     
     tab_tabela, tab_grafico = st.tabs(["📋 Tabela Detalhada", "📊 Dashboard & Gráficos"])
@@ -227,18 +217,26 @@ if 'resultados_busca' in st.session_state and st.session_state['resultados_busca
         
         st.markdown(f"### 📋 Registros Encontrados: {len(df)} | Valor Total dos Aditivos no Período: :green[{total_geral_fmt}]")
         
+        # Consulta por entidade: o dicionário de entidades aponta os cadernos, sem varrer a tabela
+        busca_entidade = st.text_input("🔎 Filtrar por CNPJ/CPF ou nome do órgão/empresa", placeholder="Ex: 07.954.571/0001-04")
+        df_base = df
+        if busca_entidade.strip():
+            entidade = obter_resultados().entidades.procurar(busca_entidade)
+            df_base = montar_dataframe(busca_atual["inicio"], busca_atual["fim"], busca_atual["versao"], entidade) if entidade else df.iloc[0:0]
+            st.caption(f"{len(df_base)} aditivo(s) dessa entidade no período | Valor: {formatar_moeda_br(df_base['Valor Float'].sum())}")
+        
         # Lógica de Ordenação Atualizada
         if "Valor" in criterio_ordem: 
-            df_view = df.sort_values(by="Valor Float", ascending=False)
+            df_view = df_base.sort_values(by="Valor Float", ascending=False)
         elif "Contratante" in criterio_ordem: 
-            df_view = df.sort_values(by="Órgão", ascending=True)
+            df_view = df_base.sort_values(by="Órgão", ascending=True)
         elif "Contratado" in criterio_ordem: # Nova Lógica
-            df_view = df.sort_values(by="Contratado(a)", ascending=True)
+            df_view = df_base.sort_values(by="Contratado(a)", ascending=True)
         else: 
-            df_view = df.sort_values(by=['Data_Sort', 'Link'])
+            df_view = df_base.sort_values(by=['Data_Sort', 'Link'])
 
         st.dataframe(
-            df_view[["Data", "Órgão", "Contratado(a)", "Tipo", "Valor Formatado", "Objeto", "Link"]],
+            df_view[["Data", "Órgão", "Contratado(a)", "CNPJ/CPF Contratado(a)", "Tipo", "Valor Formatado", "Objeto", "Link"]],
             column_config={
                 "Data": st.column_config.TextColumn("Data Publicação", width="small"),
                 "Valor Formatado": st.column_config.TextColumn("Valor (R$)", width="medium"),
@@ -246,6 +244,7 @@ if 'resultados_busca' in st.session_state and st.session_state['resultados_busca
                 "Objeto": st.column_config.TextColumn("Objeto", width="large"),
                 "Órgão": st.column_config.TextColumn("Órgão", width="medium"),
                 "Contratado(a)": st.column_config.TextColumn("Contratado(a)", width="medium"),
+                "CNPJ/CPF Contratado(a)": st.column_config.TextColumn("CNPJ/CPF", width="small"),
             },
             hide_index=True,
             use_container_width=True,
@@ -253,8 +252,8 @@ if 'resultados_busca' in st.session_state and st.session_state['resultados_busca
         )
         
         df_csv = df_view.copy()
-        df_csv['Valor Excel'] = df_csv['Valor Float'].apply(lambda x: str(x).replace('.', ','))
-        csv_data = df_csv[["Data", "Órgão", "Contratado(a)", "Tipo", "Valor Excel", "Objeto", "Link"]].to_csv(index=False, sep=';', encoding='utf-8-sig')
+        df_csv['Valor Excel'] = df_csv['Valor Float'].apply(valor_excel)
+        csv_data = df_csv[COLUNAS_EXPORTACAO].to_csv(index=False, sep=';', encoding='utf-8-sig')
         st.download_button("📥 Baixar Tabela (.csv)", csv_data, "aditivos.csv", "text/csv")
 
     # === ABA 2: DASHBOARD ===
@@ -264,18 +263,14 @@ if 'resultados_busca' in st.session_state and st.session_state['resultados_busca
         if df.empty:
             st.warning("Sem dados para gerar gráficos.")
         else:
-            df_valores = df[df['Valor Float'] > 0]
+            # Os gráficos saem dos resumos mensais, não das linhas da tabela
+            df_mensal, somas = resumir_periodo(busca_atual["inicio"], busca_atual["fim"], busca_atual["versao"])
             
             # 1. EVOLUÇÃO MENSAL
-            df['Mes_Ano'] = df['Data_Sort'].dt.strftime('%m/%Y')
-            df['Sort_Mes'] = df['Data_Sort'].dt.strftime('%Y-%m')
-            
-            qtd_meses = df['Mes_Ano'].nunique()
+            qtd_meses = len(df_mensal)
             
             if qtd_meses > 1:
                 st.markdown("##### 📅 Total Acumulado por Mês")
-                df_mensal = df.groupby(['Sort_Mes', 'Mes_Ano'])['Valor Float'].sum().reset_index()
-                df_mensal = df_mensal.sort_values('Sort_Mes')
                 
                 fig_bar_mes = px.bar(
                     df_mensal, x='Mes_Ano', y='Valor Float',
@@ -291,8 +286,8 @@ if 'resultados_busca' in st.session_state and st.session_state['resultados_busca
             
             with col_g1:
                 st.markdown("##### 🏛️ Top 5 Contratantes (Órgãos)")
-                if not df_valores.empty:
-                    top5_orgaos = df_valores.groupby('Órgão')['Valor Float'].sum().nlargest(5).reset_index()
+                if not somas['Órgão'].empty:
+                    top5_orgaos = somas['Órgão'].nlargest(5).rename('Valor Float').reset_index()
                     top5_orgaos['Nome Legenda'] = top5_orgaos['Órgão'].apply(lambda x: truncar_texto(x, 20))
                     
                     fig_pie1 = px.pie(
@@ -308,8 +303,8 @@ if 'resultados_busca' in st.session_state and st.session_state['resultados_busca
 
             with col_g2:
                 st.markdown("##### 🏢 Top 5 Contratados (Empresas)")
-                if not df_valores.empty:
-                    top5_empresas = df_valores.groupby('Contratado(a)')['Valor Float'].sum().nlargest(5).reset_index()
+                if not somas['Contratado(a)'].empty:
+                    top5_empresas = somas['Contratado(a)'].nlargest(5).rename('Valor Float').reset_index()
                     top5_empresas['Nome Legenda'] = top5_empresas['Contratado(a)'].apply(lambda x: truncar_texto(x, 20))
                     
                     fig_pie2 = px.pie(
@@ -323,5 +318,5 @@ if 'resultados_busca' in st.session_state and st.session_state['resultados_busca
                 else:
                     st.info("Sem dados monetários.")
 
-elif 'resultados_busca' in st.session_state and not st.session_state['resultados_busca']:
+elif df is not None:
     st.warning("Pesquisa finalizada. Nenhum aditivo encontrado.")
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Núcleo compartilhado pelos robôs do Diário Oficial do Estado do Ceará (DOE/CE).
+"""
@@ -0,0 +1,199 @@
+"""
+Linha de comando do robô do DOE, sem Streamlit.
+
+Uso:
+    python -m doe buscar --inicio 2025-01-02 --fim 2025-01-10 licitação "pregão eletrônico"
+    python -m doe buscar --inicio 2020-01-01 --fim 2024-12-31 --lista empresas.txt --saida achados.jsonl
+    python -m doe buscar --inicio 2025-01-02 --fim 2025-03-31 --aproximada "construtora alvorada"
+    python -m doe aditivos --inicio 2025-01-02 --fim 2025-01-10 > aditivos.csv
+    python -m doe aditivos --inicio 2020-01-01 --fim 2024-12-31 --saida aditivos.csv --workers 16
+    python -m doe aditivos --inicio 2020-01-01 --fim 2024-12-31 --saida aditivos.csv --continuar
+    python -m doe ingerir --inicio 2025-01-01 --uma-vez
+
+Com --saida, o resultado é gravado dia a dia (CSV, JSONL ou Parquet, pela extensão
+ou por --formato) e uma varredura interrompida continua com --continuar.
+"""
+import argparse
+import sys
+from datetime import date
+
+import pyarrow as pa
+
+from doe import config
+from doe.aditivos import COLUNAS_EXPORTACAO, leitor_do_caderno, linha_exportacao
+from doe.baixador import url_caderno
+from doe.blocos import linhas_do_bloco
+from doe.extracao import EXTRATOR_LAYOUT
+from doe.indice import indexar_periodo, obter_indice
+from doe.leitura import ler_periodo
+from doe.multitermos import AutomatoTermos
+from doe.periodos import faixas_pendentes
+from doe.saidas import FORMATOS, abrir_saida
+
+COLUNAS_BUSCA = ["Data", "Caderno", "Página", "Termos", "Trecho", "Link"]
+
+
+def _periodo(parser):
+    parser.add_argument("--inicio", type=date.fromisoformat, required=True, help="AAAA-MM-DD")
+    parser.add_argument("--fim", type=date.fromisoformat, default=None, help="AAAA-MM-DD (padrão: igual ao início)")
+
+
+def _lote(parser):
+    parser.add_argument("--saida", default=None, help="arquivo CSV/JSONL ou pasta Parquet (padrão: saída padrão)")
+    parser.add_argument("--formato", choices=FORMATOS, default=None, help="padrão: pela extensão de --saida")
+    parser.add_argument("--continuar", action="store_true", help="retoma a varredura interrompida em --saida")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"processos de extração (padrão: {config.WORKERS_EXTRACAO}, um por núcleo)")
+    parser.add_argument("--conexoes", type=int, default=None,
+                        help=f"downloads simultâneos (padrão: {config.MAX_CONEXOES})")
+
+
+def _avisar(mensagem):
+    print(mensagem, file=sys.stderr, flush=True)
+
+
+def _varrer(args, saida, ler_dias):
+    """
+    Grava na `saida` os dias ainda não concluídos do período. `ler_dias(inicio, fim)`
+    gera (data, erro, linhas) por dia; dias com download interrompido ficam para a
+    próxima rodada com --continuar.
+    """
+    fim = args.fim or args.inicio
+    total_linhas = 0
+    falhos = []
+    try:
+        for inicio_faixa, fim_faixa in faixas_pendentes(args.inicio, fim, saida.concluidos):
+            for data, erro, linhas in ler_dias(inicio_faixa, fim_faixa):
+                if erro is not None:
+                    falhos.append(data)
+                    _avisar(f"{data:%d/%m/%Y}: download interrompido: {erro}")
+                    continue
+                saida.gravar_dia(data, linhas)
+                total_linhas += len(linhas)
+                _avisar(f"{data:%d/%m/%Y}: {len(linhas)} linha(s)")
+    finally:
+        saida.fechar()
+
+    _avisar(f"{total_linhas} linha(s) gravada(s)")
+    if falhos:
+        _avisar(f"{len(falhos)} dia(s) com falha; rode de novo com --continuar para tentar só eles")
+        return 1
+    return 0
+
+
+def _linha_busca(data, parte, pagina, bloco, texto, dobra, termos):
+    return {
+        "Data": f"{data:%d/%m/%Y}", "Caderno": parte, "Página": pagina + 1,
+        "Termos": "; ".join(" ".join(t.split()) for t in termos), "Trecho": " ".join(linhas_do_bloco(texto)),
+        "Link": f"{url_caderno(data, parte)}#page={pagina + 1}",
+    }
+
+
+def buscar(args):
+    indice = obter_indice()
+    automato = None
+    if args.lista:
+        with open(args.lista, encoding="utf-8") as f:
+            automato = AutomatoTermos([linha.strip() for linha in f if linha.strip()], not args.com_acentos)
+    elif not args.termos:
+        _avisar("informe os termos ou --lista")
+        return 2
+
+    def blocos_por_dia(data_inicio, data_fim):
+        for data, _, erro in indexar_periodo(data_inicio, data_fim, indice=indice):
+            if automato is not None:
+                blocos = indice.buscar_monitorados(automato, data_inicio=data, data_fim=data)
+            elif args.aproximada:
+                blocos = indice.buscar_aproximada(
+                    args.termos, todos=not args.ou, max_erros=args.erros, data_inicio=data, data_fim=data
+                )
+            else:
+                blocos = [
+                    bloco + (args.termos,) for bloco in indice.buscar(
+                        args.termos, todos=not args.ou, exata=args.exata,
+                        ignorar_acentos=not args.com_acentos, data_inicio=data, data_fim=data
+                    )
+                ]
+            yield data, erro, blocos
+
+    if args.saida is None and args.formato is None:
+        # Sem saída pedida: uma linha legível por bloco, como sempre
+        encontrados = 0
+        for data, erro, blocos in blocos_por_dia(args.inicio, args.fim or args.inicio):
+            if erro is not None:
+                _avisar(f"{data:%d/%m/%Y}: download interrompido: {erro}")
+            for data_bloco, parte, pagina, _, texto, _, _ in blocos:
+                linhas = linhas_do_bloco(texto)
+                print(f"{data_bloco:%d/%m/%Y} | Caderno {parte:02d} | Pág {pagina + 1} | {linhas[0] if linhas else ''}")
+            encontrados += len(blocos)
+        _avisar(f"{encontrados} bloco(s) encontrado(s)")
+        return 0
+
+    def ler_dias(data_inicio, data_fim):
+        for data, erro, blocos in blocos_por_dia(data_inicio, data_fim):
+            yield data, erro, [_linha_busca(*bloco) for bloco in blocos]
+
+    saida = abrir_saida(args.saida, args.formato, COLUNAS_BUSCA,
+                        tipos={"Caderno": pa.int16(), "Página": pa.int32()}, continuar=args.continuar)
+    return _varrer(args, saida, ler_dias)
+
+
+def aditivos(args):
+    def ler_dias(data_inicio, data_fim):
+        periodo = ler_periodo(data_inicio, data_fim, extrator=EXTRATOR_LAYOUT, processador=leitor_do_caderno)
+        for data, _, erro, paginas in periodo:
+            linhas = [linha_exportacao(aditivo) for *_, novos in paginas for aditivo in novos or []]
+            yield data, erro, linhas
+
+    saida = abrir_saida(args.saida, args.formato, COLUNAS_EXPORTACAO, continuar=args.continuar)
+    return _varrer(args, saida, ler_dias)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(prog="python -m doe", description="Robô do Diário Oficial do Ceará")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_buscar = comandos.add_parser("buscar", help="procura termos nos blocos do período")
+    _periodo(p_buscar)
+    p_buscar.add_argument("termos", nargs="*")
+    p_buscar.add_argument("--lista", metavar="ARQUIVO", default=None,
+                          help="lista de monitoramento (um termo por linha): blocos com qualquer um deles")
+    p_buscar.add_argument("--ou", action="store_true", help="basta um dos termos no bloco")
+    p_buscar.add_argument("--exata", action="store_true", help="só palavras inteiras")
+    p_buscar.add_argument("--com-acentos", action="store_true", help="diferencia letras acentuadas")
+    p_buscar.add_argument("--aproximada", action="store_true",
+                          help="aceita erros de digitação/OCR e palavras quebradas por hífen no fim da linha")
+    p_buscar.add_argument("--erros", type=int, default=None,
+                          help="com --aproximada, edições aceitas por palavra (padrão: conforme o tamanho, até 2)")
+    _lote(p_buscar)
+    p_buscar.set_defaults(funcao=buscar)
+
+    p_aditivos = comandos.add_parser("aditivos", help="extrai os aditivos do período (colunas do aditivos.csv)")
+    _periodo(p_aditivos)
+    _lote(p_aditivos)
+    p_aditivos.set_defaults(funcao=aditivos)
+
+    comandos.add_parser("ingerir", help="ingestão diária (mesmas opções de python -m doe.ingestao)", add_help=False)
+
+    args, resto = parser.parse_known_args(argumentos)
+    if args.comando == "ingerir":
+        from doe.ingestao import main as ingerir
+        return ingerir(resto)
+    if resto:
+        parser.error(f"argumentos não reconhecidos: {' '.join(resto)}")
+
+    # Valem para o processo todo: precisam estar definidos antes do primeiro download/extração
+    if args.workers:
+        config.WORKERS_EXTRACAO = args.workers
+    if args.conexoes:
+        config.MAX_CONEXOES = args.conexoes
+    if args.formato == "parquet" and not args.saida:
+        parser.error("a saída em Parquet precisa de --saida (uma pasta)")
+    try:
+        return args.funcao(args)
+    except FileExistsError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
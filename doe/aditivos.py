@@ -0,0 +1,177 @@
+"""
+Leitura dos EXTRATOS DE ADITIVO publicados no DOE.
+
+As funções ficam fora dos apps para poderem rodar dentro dos processos de extração.
+"""
+import re
+from functools import partial
+
+from doe.baixador import url_caderno
+from doe.entidades import marcar_entidades, primeiro_documento
+
+
+def limpar_texto_multilinha(texto):
+    if not texto: return ""
+    return " ".join(texto.split())
+
+def limpar_valor_monetario(texto):
+    if not texto: return 0.0
+    try:
+        limpo = texto.upper().replace('R$', '').replace('.', '').replace(',', '.').strip()
+        return float(limpo)
+    except ValueError:
+        return 0.0
+
+def formatar_moeda_br(valor):
+    if not isinstance(valor, (float, int)): return "R$ 0,00"
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+# Colunas do aditivos.csv baixado no buscadordiario.py (e da saída em lote da linha de comando)
+COLUNAS_EXPORTACAO = ["Data", "Órgão", "Contratado(a)", "Tipo", "Valor Excel", "Objeto", "Link"]
+
+def valor_excel(valor):
+    """Valor com vírgula decimal, como o Excel em português espera."""
+    return str(valor).replace('.', ',')
+
+def linha_exportacao(aditivo):
+    """Aditivo (dict de `extrair_dados_pagina`) com as colunas de COLUNAS_EXPORTACAO."""
+    return {**aditivo, "Valor Excel": valor_excel(aditivo["Valor Float"])}
+
+def classificar_tipo_aditivo(objeto, valor):
+    tipos = []
+    objeto_upper = objeto.upper() if objeto else ""
+    termos_prazo = ["PRORROGA", "VIGÊNCIA", "PRAZO", "12 MESES", "DOZE MESES", "DILAÇÃO"]
+    termos_valor = ["ACRÉSCIMO", "REAJUSTE", "REALINHAMENTO", "SUPRESSÃO", "REPACTUAÇÃO", "VALOR GLOBAL"]
+    
+    if any(x in objeto_upper for x in termos_prazo): tipos.append("PRAZO")
+    if valor > 0 or any(x in objeto_upper for x in termos_valor): tipos.append("VALOR")
+    if not tipos: return "Outros"
+    return " + ".join(tipos)
+
+# --- LEITOR SEM RETROCESSO ---
+
+# Início e fim de cada EXTRATO DE ADITIVO na página (mesmas marcas da versão com regex, em bench/aditivos_regex.py)
+_CABECALHO = re.compile(r"EXTRATO D[EO] ADITIVO", re.IGNORECASE)
+_FIM_BLOCO = re.compile(r"\nEXTRATO|\nSECRETARIA|\nPREFEITURA|\nESTADO DO CEARÁ|\*\*\*", re.IGNORECASE)
+
+# Rótulo de cada campo; o grupo guarda os espaços entre o rótulo e o texto
+_ROTULOS = {
+    "Órgão": re.compile(r"CONTRATANTE\s*[:\-\.](\s*)", re.IGNORECASE),
+    "Contratado(a)": re.compile(r"CONTRATAD[OA]\s*[:\-\.](\s*)", re.IGNORECASE),
+    "Objeto": re.compile(r"OBJETO\s*[:\-\.](\s*)", re.IGNORECASE),
+}
+
+# O que encerra cada campo quando aparece no começo de uma linha
+_FIM_CAMPO = {
+    "Órgão": re.compile(r"[IVX]|CONTRATAD|CNPJ|OBJETO", re.IGNORECASE),
+    "Contratado(a)": re.compile(r"[IVX]|OBJETO|FUNDAMENTAÇÃO|CNPJ|VIGÊNCIA", re.IGNORECASE),
+    "Objeto": re.compile(r"[IVX]|VALOR|DOTAÇÃO|VIGÊNCIA|SIGNATÁRIOS|DATA|FUNDAMENTAÇÃO", re.IGNORECASE),
+}
+
+# Quebras de linha seguidas de qualquer uma dessas palavras: achadas uma vez só por bloco
+_QUEBRA = re.compile(
+    r"\n\s*(?=[IVX]|CONTRATAD|CNPJ|OBJETO|FUNDAMENTAÇÃO|VIGÊNCIA|VALOR|DOTAÇÃO|SIGNATÁRIOS|DATA)",
+    re.IGNORECASE
+)
+
+_VALOR = re.compile(r"R\$\s*([\d\.,]+)")
+
+
+def _blocos_aditivo(texto):
+    """Trechos "EXTRATO DE ADITIVO ..." da página, sem voltar atrás no texto."""
+    fim_texto = len(texto) - 1 if texto.endswith("\n") else len(texto)
+    pos = 0
+    while True:
+        cabecalho = _CABECALHO.search(texto, pos)
+        if not cabecalho:
+            return
+        fim = _FIM_BLOCO.search(texto, cabecalho.end())
+        pos = fim.start() if fim else max(fim_texto, cabecalho.end())
+        yield texto[cabecalho.start():pos]
+        if not fim:
+            return
+
+
+def _campos_do_bloco(bloco):
+    """
+    Contratante, contratado e objeto do bloco, com o mesmo resultado das buscas antigas.
+
+    Cada campo vai do seu rótulo "CAMPO:" até a primeira linha que começa com uma das
+    palavras que o encerram. As quebras candidatas são achadas numa só varredura e
+    servem aos três campos. Sem nenhuma delas depois do rótulo, um rótulo seguido
+    direto de uma quebra e de uma dessas palavras vale como campo vazio.
+    """
+    rotulos = {campo: padrao.search(bloco) for campo, padrao in _ROTULOS.items()}
+    inicios = [m.end() for m in rotulos.values() if m]
+    if not inicios:
+        return {}
+    quebras = [(q.start(), q.end()) for q in _QUEBRA.finditer(bloco, min(inicios))]
+
+    campos = {}
+    for campo, rotulo in rotulos.items():
+        if not rotulo:
+            continue
+        fim_campo = _FIM_CAMPO[campo]
+        for inicio_quebra, palavra in quebras:
+            if inicio_quebra >= rotulo.end() and fim_campo.match(bloco, palavra):
+                campos[campo] = bloco[rotulo.end():inicio_quebra]
+                break
+        else:
+            if "\n" in rotulo.group(1) and fim_campo.match(bloco, rotulo.end()):
+                campos[campo] = ""
+    return campos
+
+
+def _documentos_do_bloco(bloco):
+    """
+    CNPJ/CPF do contratante e do contratado: o primeiro documento válido entre o
+    rótulo de cada um e o rótulo seguinte (ou o fim do bloco).
+    """
+    achados = {campo: padrao.search(bloco) for campo, padrao in _ROTULOS.items()}
+    rotulos = sorted((m.start(), campo) for campo, m in achados.items() if m)
+    documentos = {}
+    for i, (inicio, campo) in enumerate(rotulos):
+        if campo == "Objeto":
+            continue
+        fim = rotulos[i + 1][0] if i + 1 < len(rotulos) else len(bloco)
+        documento = primeiro_documento(bloco, inicio, fim)
+        if documento:
+            documentos[campo] = documento
+    return documentos
+
+
+def extrair_dados_pagina(texto_pagina, data_ref, nome_arquivo, num_pag, url_arquivo):
+    dados_extraidos = []
+    for bloco in _blocos_aditivo(texto_pagina):
+        item = {
+            "Data": data_ref,
+            "Órgão": "Não identificado",
+            "Contratado(a)": "", 
+            "Valor Float": 0.0,
+            "Objeto": "",
+            "Tipo": "",
+            "Link": f"{url_arquivo}#page={num_pag}"
+        }
+        
+        for campo, texto in _campos_do_bloco(bloco).items():
+            item[campo] = limpar_texto_multilinha(texto)
+            
+        match_valor = _VALOR.search(bloco)
+        if match_valor: item["Valor Float"] = limpar_valor_monetario(match_valor.group(1))
+        
+        item["Tipo"] = classificar_tipo_aditivo(item["Objeto"], item["Valor Float"])
+        item["Valor Formatado"] = formatar_moeda_br(item["Valor Float"])
+        marcar_entidades(item, _documentos_do_bloco(bloco))
+        
+        dados_extraidos.append(item)
+    return dados_extraidos
+
+def leitor_do_caderno(data, parte):
+    """Extrator de aditivos de um caderno, pronto para rodar no processo de extração."""
+    nome_arq = f"do{data.strftime('%Y%m%d')}p{parte:02d}.pdf"
+    return partial(
+        extrair_dados_pagina,
+        data_ref=data.strftime("%d/%m/%Y"),
+        nome_arquivo=nome_arq,
+        url_arquivo=url_caderno(data, parte)
+    )
@@ -0,0 +1,83 @@
+"""
+Busca aproximada: palavras com erros de digitação/OCR e quebradas por hífen no fim da linha.
+
+Na indexação, cada bloco vira a lista das suas palavras (sem acentos, em
+minúsculas, com "licita-\\nção" de volta a "licitacao"), e cada palavra nova entra
+num vocabulário indexado por trigramas. Na consulta, cada palavra do termo é
+trocada pelas palavras do vocabulário a poucas edições dela (`variantes`) e o
+índice de palavras só devolve os blocos que têm alguma dessas variantes.
+"""
+import re
+
+from doe.normalizacao import dobrar
+
+# Palavra, aceitando a quebra "pala-\n  vra" no meio (o texto já vem dobrado)
+_PALAVRA = re.compile(r"[^\W_]+(?:-[ \t]*\n\s*[^\W_]+)*")
+_QUEBRA = re.compile(r"-\s+")
+
+# Limite de edições pelo tamanho da palavra: (tamanho máximo, edições)
+ERROS_POR_TAMANHO = ((3, 0), (7, 1))
+MAX_ERROS = 2
+
+
+def palavras_com_posicoes(dobrado):
+    """(palavra, inicio, fim) de cada palavra do texto dobrado, com as quebras por hífen desfeitas."""
+    return [(_QUEBRA.sub("", m.group()), m.start(), m.end()) for m in _PALAVRA.finditer(dobrado)]
+
+
+def palavras_de(texto):
+    """Palavras do texto como são guardadas no índice (dobradas e sem quebras por hífen)."""
+    return [palavra for palavra, _, _ in palavras_com_posicoes(dobrar(texto))]
+
+
+def trigramas(palavra):
+    """Trigramas da palavra com uma marca em cada ponta ("$ab", "abc", "bc$"...)."""
+    marcada = f"${palavra}$"
+    return {marcada[i:i + 3] for i in range(len(marcada) - 2)}
+
+
+def erros_permitidos(palavra, maximo=None):
+    """
+    Edições aceitas para a palavra: poucas nas curtas (senão tudo vira variante)
+    e nunca tantas que ela possa ficar sem nenhum trigrama em comum com a variante.
+    """
+    erros = MAX_ERROS
+    for tamanho, limite in ERROS_POR_TAMANHO:
+        if len(palavra) <= tamanho:
+            erros = limite
+            break
+    if maximo is not None:
+        erros = min(erros, maximo)
+    # Cada edição estraga no máximo 3 trigramas; precisa sobrar pelo menos um
+    return max(0, min(erros, (len(trigramas(palavra)) - 1) // 3))
+
+
+def distancia_limitada(a, b, limite):
+    """Distância de edição (Levenshtein) entre a e b, ou limite + 1 se passar do limite."""
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    if a == b:
+        return 0
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        atual = [i]
+        for j, cb in enumerate(b, start=1):
+            atual.append(min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        # A menor distância da linha só cresce daqui para a frente
+        if min(atual) > limite:
+            return limite + 1
+        anterior = atual
+    return anterior[-1] if anterior[-1] <= limite else limite + 1
+
+
+def ocorrencias(palavras_bloco, variantes_termo):
+    """
+    (inicio, fim) no texto dobrado de cada trecho do bloco em que as palavras seguidas
+    caem, uma a uma, nas variantes de cada palavra do termo (lista de conjuntos).
+    """
+    tamanho = len(variantes_termo)
+    achados = []
+    for i in range(len(palavras_bloco) - tamanho + 1):
+        if all(palavras_bloco[i + k][0] in variantes_termo[k] for k in range(tamanho)):
+            achados.append((palavras_bloco[i][1], palavras_bloco[i + tamanho - 1][2]))
+    return achados
@@ -0,0 +1,365 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from doe import config
+from doe.cache import obter_cache
+from doe.metricas import obter_metricas
+
+# Códigos com que o servidor da SEPLAG responde quando o caderno não existe
+STATUS_FIM = (404, 300)
+
+# Códigos que indicam problema passageiro: vale tentar de novo depois de esperar
+STATUS_TRANSITORIOS = (408, 425, 429, 500, 502, 503, 504)
+
+# Quantos cadernos de um mesmo dia pedimos de uma vez, antes de saber quantos existem.
+# A primeira rodada usa o maior número de cadernos dos dias anteriores, se ele for maior.
+JANELA_PARTES = 4
+MAX_PRIMEIRA_JANELA = 16
+
+# Tamanho dos pedaços lidos da rede e gravados no disco
+TAMANHO_PEDACO = 256 * 1024
+
+
+class ErroDownload(Exception):
+    def __init__(self, url, status_code):
+        super().__init__(f"Código {status_code} ao acessar {url}")
+        self.url = url
+        self.status_code = status_code
+
+
+class PDFInvalido(Exception):
+    """O arquivo recebido não tem o tamanho anunciado ou não parece um PDF completo."""
+
+
+def url_caderno(data, parte):
+    data_url = data.strftime("%Y%m%d")
+    return f"{config.URL_BASE}/{data_url}/do{data_url}p{parte:02d}.pdf"
+
+
+# --- SESSÃO HTTP ---
+
+_sessao = None
+_lock_sessao = threading.Lock()
+
+
+def obter_sessao():
+    """Sessão única do processo, para reaproveitar as conexões (keep-alive) entre downloads."""
+    global _sessao
+    with _lock_sessao:
+        if _sessao is None:
+            _sessao = requests.Session()
+            _sessao.headers['User-Agent'] = config.USER_AGENT
+            adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=config.MAX_CONEXOES)
+            _sessao.mount("http://", adaptador)
+            _sessao.mount("https://", adaptador)
+        return _sessao
+
+
+class _Limitador:
+    """Espaça o início dos pedidos a um mesmo servidor (no máximo N por segundo)."""
+
+    def __init__(self, por_segundo):
+        self.intervalo = 1.0 / por_segundo if por_segundo else 0.0
+        self._proximo = 0.0
+        self._lock = threading.Lock()
+
+    def esperar(self):
+        if not self.intervalo:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            vez = max(agora, self._proximo)
+            self._proximo = vez + self.intervalo
+        if vez > agora:
+            time.sleep(vez - agora)
+
+
+_limitadores = {}
+
+
+def _limitador(url):
+    servidor = urlsplit(url).netloc
+    with _lock_sessao:
+        if servidor not in _limitadores:
+            _limitadores[servidor] = _Limitador(config.REQUISICOES_POR_SEGUNDO)
+        return _limitadores[servidor]
+
+
+# --- DOWNLOAD DE UM CADERNO ---
+
+# Um mesmo caderno nunca é baixado por duas threads ao mesmo tempo (o parcial é compartilhado).
+# Cada trava fica no dicionário só enquanto alguém a usa ou espera por ela: (trava, usuarios)
+_locks_cadernos = {}
+_lock_cadernos = threading.Lock()
+
+
+@contextmanager
+def _lock_caderno(data, parte):
+    chave = (data, parte)
+    with _lock_cadernos:
+        entrada = _locks_cadernos.setdefault(chave, [threading.Lock(), 0])
+        entrada[1] += 1
+    try:
+        with entrada[0]:
+            yield
+    finally:
+        with _lock_cadernos:
+            entrada[1] -= 1
+            if not entrada[1]:
+                del _locks_cadernos[chave]
+
+
+def _tamanho_total(resposta):
+    """Tamanho do arquivo inteiro, pelo Content-Range (206/416) ou Content-Length (200)."""
+    if resposta.status_code in (206, 416):
+        total = resposta.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+    else:
+        total = resposta.headers.get("Content-Length", "")
+    return int(total) if total.isdigit() else None
+
+
+def _conferir_pdf(caminho, tamanho_esperado):
+    """Levanta PDFInvalido se o arquivo não bater com o tamanho anunciado ou não for um PDF inteiro."""
+    tamanho = os.path.getsize(caminho)
+    if tamanho_esperado is not None and tamanho != tamanho_esperado:
+        raise PDFInvalido(f"{tamanho} bytes recebidos de {tamanho_esperado} anunciados")
+    with open(caminho, "rb") as f:
+        if f.read(5) != b"%PDF-":
+            raise PDFInvalido("o arquivo não começa com %PDF-")
+        f.seek(max(0, tamanho - 1024))
+        if b"%%EOF" not in f.read():
+            raise PDFInvalido("o arquivo não termina com %%EOF")
+
+
+def _espera(tentativa):
+    """Espera antes da próxima tentativa: dobra a cada vez, com um pouco de acaso."""
+    return min(config.ESPERA_MAXIMA, config.ESPERA_INICIAL * 2 ** tentativa) * random.uniform(0.5, 1.0)
+
+
+def _tentar_download(url, parcial, timeout, validador):
+    """
+    Uma tentativa: continua o arquivo parcial (HTTP Range) ou o começa do zero.
+    Devolve o status; 200 significa arquivo completo e conferido. `validador` (dict)
+    guarda o ETag/Last-Modified da versão que está sendo baixada, entre as tentativas.
+    """
+    inicio = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+    cabecalhos = {}
+    if inicio:
+        cabecalhos["Range"] = f"bytes={inicio}-"
+        if validador.get("valor"):
+            # Se o arquivo mudou no servidor, ele manda o novo inteiro (200) em vez do pedaço
+            cabecalhos["If-Range"] = validador["valor"]
+
+    _limitador(url).esperar()
+    metricas = obter_metricas()
+    pedido = time.perf_counter()
+    with obter_sessao().get(url, headers=cabecalhos, timeout=timeout, stream=True) as resposta:
+        # Latência: do pedido até chegarem os cabeçalhos da resposta
+        metricas.registrar_tempo("download.latencia", time.perf_counter() - pedido)
+        status = resposta.status_code
+        metricas.contar(f"download.status.{status}")
+        if status not in (200, 206, 416):
+            return status
+
+        total = _tamanho_total(resposta)
+        validador["valor"] = resposta.headers.get("ETag") or resposta.headers.get("Last-Modified") or validador.get("valor")
+        if status != 416:
+            # 200: o servidor mandou o arquivo inteiro (sem suporte a Range, ou o arquivo mudou)
+            with open(parcial, "ab" if status == 206 else "wb") as f:
+                for pedaco in resposta.iter_content(chunk_size=TAMANHO_PEDACO):
+                    f.write(pedaco)
+                    metricas.contar("download.bytes", len(pedaco))
+            metricas.registrar_tempo("download.transferencia", time.perf_counter() - pedido)
+
+    # Veio menos que o anunciado: a conexão caiu, a próxima tentativa continua daqui
+    if total is not None and os.path.getsize(parcial) < total:
+        raise requests.ConnectionError(f"conexão encerrada com {os.path.getsize(parcial)} de {total} bytes")
+    _conferir_pdf(parcial, total)
+    return 200
+
+
+def baixar_caderno(data, parte, timeout=15, cache=None):
+    """
+    Devolve o caminho local do caderno, baixando-o só se ainda não estiver no cache.
+    Retorna None quando o caderno não existe (fim dos cadernos do dia).
+
+    Falhas de rede e respostas passageiras (429, 5xx...) são tentadas de novo, com
+    espera crescente, continuando o download de onde parou. O `timeout` vale para
+    cada leitura da rede, não para o arquivo inteiro.
+    """
+    cache = cache or obter_cache()
+    metricas = obter_metricas()
+
+    with _lock_caderno(data, parte):
+        caminho = cache.caminho(data, parte)
+        if caminho:
+            metricas.contar("cache_pdf.acertos")
+            return caminho
+        if cache.esta_ausente(data, parte):
+            metricas.contar("cache_pdf.acertos")
+            return None
+        metricas.contar("cache_pdf.faltas")
+
+        url = url_caderno(data, parte)
+        parcial = cache.caminho_parcial(data, parte)
+        validador = {}
+        for tentativa in range(config.TENTATIVAS_DOWNLOAD):
+            ultima = tentativa == config.TENTATIVAS_DOWNLOAD - 1
+            try:
+                status = _tentar_download(url, parcial, timeout, validador)
+            except requests.RequestException as e:
+                metricas.erro("download", e)
+                if ultima:
+                    raise
+                time.sleep(_espera(tentativa))
+                continue
+            except PDFInvalido as e:
+                metricas.erro("download", e)
+                # Conteúdo estragado não se conserta continuando: recomeça do zero
+                os.remove(parcial)
+                validador.clear()
+                if ultima:
+                    raise
+                time.sleep(_espera(tentativa))
+                continue
+
+            if status == 200:
+                return cache.guardar_arquivo(data, parte, parcial)
+            if status in STATUS_FIM:
+                if os.path.exists(parcial):
+                    os.remove(parcial)
+                cache.marcar_ausente(data, parte, status)
+                return None
+            erro = ErroDownload(url, status)
+            metricas.erro("download", erro)
+            if status not in STATUS_TRANSITORIOS or ultima:
+                raise erro
+            time.sleep(_espera(tentativa))
+
+
+# --- DOWNLOAD CONCORRENTE ---
+
+def _obter_caderno(data, parte, timeout, precisa_pdf):
+    """Devolve (existe, caminho); o caminho é None quando o PDF não precisou ser baixado."""
+    if precisa_pdf is not None and not precisa_pdf(data, parte):
+        return True, None
+    caminho = baixar_caderno(data, parte, timeout)
+    return caminho is not None, caminho
+
+
+def _pedir_partes(executor, data, primeira, ultima, timeout, precisa_pdf):
+    return [
+        (parte, executor.submit(_obter_caderno, data, parte, timeout, precisa_pdf))
+        for parte in range(primeira, ultima + 1)
+    ]
+
+
+def _limitar(ultima, max_partes):
+    return min(ultima, max_partes) if max_partes else ultima
+
+
+def _recolher_dia(executor, data, pedidos, total, max_partes, timeout, precisa_pdf, cache):
+    """
+    Espera os cadernos do dia. Sem o total conhecido (`total` None), pede novas
+    janelas enquanto eles continuarem existindo e, no fim, guarda quantos eram.
+
+    Um caderno que falha (mesmo depois das novas tentativas) não derruba os demais
+    já pedidos: eles são recolhidos e o erro volta junto, para o dia ser refeito depois.
+    """
+    cadernos = []
+    erro = None
+    while pedidos:
+        for indice, (parte, futuro) in enumerate(pedidos):
+            try:
+                existe, caminho = futuro.result()
+            except Exception as e:
+                erro = erro or e
+                continue
+            if not existe:
+                for _, restante in pedidos[indice + 1:]:
+                    restante.cancel()
+                if erro is None:
+                    cache.registrar_partes(data, len(cadernos))
+                return cadernos, erro
+            cadernos.append((parte, caminho))
+
+        proxima = pedidos[-1][0] + 1
+        if erro is not None or total is not None or (max_partes and proxima > max_partes):
+            break
+        pedidos = _pedir_partes(executor, data, proxima, _limitar(proxima + JANELA_PARTES - 1, max_partes), timeout, precisa_pdf)
+    return cadernos, erro
+
+
+def _pedir_dia(executor, data, max_partes, timeout, precisa_pdf, cache):
+    """
+    Primeira rodada de pedidos do dia. Com o total já conhecido, pede exatamente
+    esses cadernos (nenhum, nos dias sem publicação); senão, uma janela do tamanho
+    típico dos dias anteriores, para quase sempre achar o fim numa rodada só.
+    """
+    total = cache.partes_do_dia(data)
+    if total is not None:
+        ultima = _limitar(total, max_partes)
+    else:
+        tipico = cache.partes_tipicas(data)
+        ultima = _limitar(min(max(JANELA_PARTES, tipico + 1), MAX_PRIMEIRA_JANELA), max_partes)
+    return total, _pedir_partes(executor, data, 1, ultima, timeout, precisa_pdf)
+
+
+def baixar_periodo(data_inicio, data_fim, max_conexoes=None, max_partes=None, timeout=15, precisa_pdf=None):
+    """
+    Baixa todos os cadernos entre as duas datas, vários dias e cadernos ao mesmo tempo.
+
+    Gera (data, [(parte, caminho), ...], erro) sempre em ordem de data, assim que
+    cada dia termina. O erro é a exceção que interrompeu o dia, ou None.
+
+    Se `precisa_pdf(data, parte)` devolver False (ex.: o texto já está guardado),
+    o caderno não é baixado e aparece com caminho None. O fim dos cadernos do dia
+    continua sendo descoberto normalmente, e o total de cada dia fica guardado no cache.
+    """
+    max_conexoes = max_conexoes or config.MAX_CONEXOES
+    cache = obter_cache()
+    datas = []
+    data = data_inicio
+    while data <= data_fim:
+        datas.append(data)
+        data += timedelta(days=1)
+
+    executor = ThreadPoolExecutor(max_workers=max_conexoes)
+    em_voo = []
+    proxima = 0
+
+    def adiantar():
+        nonlocal proxima
+        # Mantém alguns dias à frente na fila para a rede nunca ficar ociosa
+        while proxima < len(datas) and len(em_voo) < max_conexoes:
+            dia = datas[proxima]
+            em_voo.append((dia, *_pedir_dia(executor, dia, max_partes, timeout, precisa_pdf, cache)))
+            proxima += 1
+
+    try:
+        adiantar()
+        while em_voo:
+            dia, total, pedidos = em_voo.pop(0)
+            cadernos, erro = _recolher_dia(executor, dia, pedidos, total, max_partes, timeout, precisa_pdf, cache)
+            adiantar()
+            yield dia, cadernos, erro
+    finally:
+        # Se quem consome parar antes do fim, não espera os dias adiantados: os que
+        # ainda não começaram são cancelados e os que já estão baixando terminam sozinhos
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def baixar_dia(data, max_conexoes=None, max_partes=None, timeout=15, precisa_pdf=None):
+    """Atalho para um único dia: devolve ([(parte, caminho), ...], erro)."""
+    for _, cadernos, erro in baixar_periodo(data, data, max_conexoes, max_partes, timeout, precisa_pdf):
+        return cadernos, erro
+    return [], None
@@ -0,0 +1,11 @@
+# Os atos publicados no DOE vêm separados por esta marca
+SEPARADOR_BLOCOS = "*** *** ***"
+
+
+def separar_blocos(texto_pagina):
+    return texto_pagina.split(SEPARADOR_BLOCOS)
+
+
+def linhas_do_bloco(texto_bloco):
+    """Linhas não vazias do bloco, sem espaços nas pontas (como aparecem nos cards)."""
+    return [l.strip() for l in texto_bloco.split('\n') if l.strip()]
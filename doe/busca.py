@@ -0,0 +1,142 @@
+import re
+
+from doe.normalizacao import dobrar, dobrar_com_mapa, posicao_original
+
+# Janela de contexto mostrada em volta de cada linha encontrada
+LINHAS_ANTES = 4
+LINHAS_DEPOIS = 8
+
+# Quantos resultados viram cartões de cada vez nas telas de busca
+RESULTADOS_POR_PAGINA = 20
+
+
+def processar_termos(termos, ignorar_acentos=True):
+    """Termos na forma em que são comparados: minúsculos e, se pedido, sem acentos."""
+    processados = []
+    for t in termos:
+        if not t:
+            continue
+        processados.append(dobrar(t) if ignorar_acentos else t.lower())
+    return processados
+
+
+def compilar_padroes(termos_processados):
+    """Padrões de "Busca Exata" (palavra inteira), compilados uma única vez por busca."""
+    return [re.compile(r"\b" + re.escape(t) + r"\b") for t in termos_processados]
+
+
+def bloco_corresponde(bloco_busca, termos_processados, todos=True, padroes=None):
+    """
+    Regra das buscas: `bloco_busca` já deve estar na mesma forma dos termos.
+    Com `padroes` (compilar_padroes), cada termo precisa aparecer como palavra inteira.
+    """
+    if padroes is not None:
+        resultados_termos = [p.search(bloco_busca) is not None for p in padroes]
+    else:
+        resultados_termos = [t in bloco_busca for t in termos_processados]
+    return all(resultados_termos) if todos else any(resultados_termos)
+
+
+def _trechos(texto, termos, ignorar_acentos, dobra=None):
+    """
+    Intervalos [inicio, fim) do texto original com algum dos termos, já unidos quando
+    se sobrepõem. A procura é feita uma vez na forma dobrada (`dobra`, se já vier
+    pronta do índice) e levada de volta ao original pelo mapa de posições.
+    """
+    dobrado, mapa = dobra if dobra is not None else dobrar_com_mapa(texto)
+    trechos = []
+    for termo in termos:
+        alvo = dobrar(termo) if termo else ""
+        if not alvo:
+            continue
+        inicio = dobrado.find(alvo)
+        while inicio != -1:
+            a = posicao_original(mapa, inicio)
+            b = posicao_original(mapa, inicio + len(alvo) - 1) + 1
+            # Sem ignorar acentos, só vale onde o original bate letra por letra
+            if ignorar_acentos or texto[a:b].lower() == termo.lower():
+                trechos.append((a, b))
+            inicio = dobrado.find(alvo, inicio + 1)
+
+    unidos = []
+    for a, b in sorted(trechos):
+        if unidos and a <= unidos[-1][1]:
+            unidos[-1][1] = max(unidos[-1][1], b)
+        else:
+            unidos.append([a, b])
+    return unidos
+
+
+def _marcar(texto, trechos, inicio, fim):
+    """texto[inicio:fim] com os trechos (cortados nessas pontas) em laranja e negrito."""
+    pedacos = []
+    cursor = inicio
+    for a, b in trechos:
+        a, b = max(a, inicio), min(b, fim)
+        if a >= b:
+            continue
+        # Sintaxe do Streamlit para cor: :cor[texto]
+        pedacos.append(f"{texto[cursor:a]}:orange[**{texto[a:b]}**]")
+        cursor = b
+    pedacos.append(texto[cursor:fim])
+    return "".join(pedacos)
+
+
+def realcar_termo(linha, termo, ignorar_acentos=False):
+    """
+    Marca todas as ocorrências do termo com cor e negrito em Markdown.
+    Ex: "lei municipal" vira ":orange[**lei municipal**]"
+    """
+    if not termo: return linha
+    return _marcar(linha, _trechos(linha, [termo], ignorar_acentos), 0, len(linha))
+
+
+def realcar_bloco(texto_bloco, termos, ignorar_acentos=True, dobra=None):
+    """
+    Linhas do bloco, como em `linhas_do_bloco`, com todas as ocorrências de todos os
+    termos realçadas. `dobra` é o (texto_dobrado, mapa) que o índice guarda com o
+    bloco; sem ela, o bloco é dobrado aqui.
+    """
+    trechos = _trechos(texto_bloco, termos, ignorar_acentos, dobra)
+    linhas = []
+    inicio = 0
+    for linha in texto_bloco.split("\n"):
+        conteudo = linha.strip()
+        if conteudo:
+            comeco = inicio + len(linha) - len(linha.lstrip())
+            linhas.append(_marcar(texto_bloco, trechos, comeco, comeco + len(conteudo)))
+        inicio += len(linha) + 1
+    return linhas
+
+
+def ocorrencias_em_linhas(texto, termo, linhas_antes=LINHAS_ANTES, linhas_depois=LINHAS_DEPOIS):
+    """
+    Linhas do texto que contêm o termo, com a janela de contexto em volta.
+
+    Gera (indice_linha, inicio_janela, linhas_janela). Depois de cada ocorrência a
+    busca continua após a janela, para não repetir o mesmo contexto.
+    """
+    termo_lower = termo.lower()
+    linhas = texto.split('\n')
+    
+    i = 0
+    while i < len(linhas):
+        if termo_lower in linhas[i].lower():
+            inicio = max(0, i - linhas_antes)
+            fim = min(len(linhas), i + linhas_depois + 1)
+            yield i, inicio, linhas[inicio:fim]
+            i = fim
+        else:
+            i += 1
+
+
+def pagina_de_resultados(resultados, pagina, por_pagina=RESULTADOS_POR_PAGINA):
+    """
+    Recorte de uma página (começando em 1) da lista de resultados, para só ela virar
+    widgets na tela. Devolve (itens, numero_do_primeiro, total_de_paginas); páginas
+    fora do intervalo são trazidas para a primeira ou a última.
+    """
+    total_paginas = max(1, -(-len(resultados) // por_pagina))
+    pagina = min(max(1, pagina), total_paginas)
+    inicio = (pagina - 1) * por_pagina
+    return resultados[inicio:inicio + por_pagina], inicio + 1, total_paginas
@@ -0,0 +1,227 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+from doe import config
+
+
+def _chave_data(data):
+    return data.strftime("%Y%m%d")
+
+
+class CachePDF:
+    """
+    Cache em disco dos cadernos do DOE, compartilhado por todos os apps.
+
+    Os arquivos são guardados pelo SHA-256 do conteúdo e um índice SQLite
+    associa cada (data, parte) ao seu arquivo. Quando o total passa do limite,
+    os arquivos acessados há mais tempo são descartados (LRU). Os 404/300
+    também ficam registrados para que varreduras repetidas não voltem à rede,
+    assim como quantos cadernos cada dia tem (zero nos dias sem publicação).
+    """
+
+    def __init__(self, diretorio=None, limite_bytes=None):
+        self.diretorio = diretorio or os.path.join(config.DIR_DADOS, "pdfs")
+        self.dir_objetos = os.path.join(self.diretorio, "objetos")
+        self.dir_parciais = os.path.join(self.diretorio, "parciais")
+        self.limite_bytes = limite_bytes or config.CACHE_MAX_MB * 1024 * 1024
+        os.makedirs(self.dir_objetos, exist_ok=True)
+        os.makedirs(self.dir_parciais, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(self.diretorio, "indice.db"),
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cadernos (
+                data TEXT, parte INTEGER, sha256 TEXT,
+                PRIMARY KEY (data, parte)
+            );
+            CREATE TABLE IF NOT EXISTS objetos (
+                sha256 TEXT PRIMARY KEY, tamanho INTEGER, ultimo_acesso REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_objetos_acesso ON objetos (ultimo_acesso);
+            CREATE TABLE IF NOT EXISTS ausentes (
+                data TEXT, parte INTEGER, status INTEGER, registrado REAL,
+                PRIMARY KEY (data, parte)
+            );
+            CREATE TABLE IF NOT EXISTS manifestos (
+                data TEXT PRIMARY KEY, partes INTEGER, registrado REAL
+            );
+        """)
+
+    def _caminho_objeto(self, sha):
+        return os.path.join(self.dir_objetos, sha[:2], f"{sha}.pdf")
+
+    # --- CONSULTA ---
+
+    def caminho(self, data, parte):
+        """Devolve o caminho local do caderno, ou None se ele não estiver no cache."""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT sha256 FROM cadernos WHERE data = ? AND parte = ?",
+                (_chave_data(data), parte)
+            ).fetchone()
+            if not linha:
+                return None
+
+            sha = linha[0]
+            arquivo = self._caminho_objeto(sha)
+            if not os.path.exists(arquivo):
+                # Alguém apagou o arquivo por fora: esquece a entrada
+                self._conn.execute("DELETE FROM cadernos WHERE sha256 = ?", (sha,))
+                self._conn.execute("DELETE FROM objetos WHERE sha256 = ?", (sha,))
+                return None
+
+            self._conn.execute(
+                "UPDATE objetos SET ultimo_acesso = ? WHERE sha256 = ?",
+                (time.time(), sha)
+            )
+            return arquivo
+
+    def esta_ausente(self, data, parte):
+        """Indica se já sabemos que o caderno não existe (404/300)."""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT registrado FROM ausentes WHERE data = ? AND parte = ?",
+                (_chave_data(data), parte)
+            ).fetchone()
+        if not linha:
+            return False
+        if data < date.today() - timedelta(days=config.DIAS_RECENTES):
+            return True
+        return time.time() - linha[0] < config.TTL_AUSENTE_RECENTE
+
+    def partes_do_dia(self, data):
+        """Quantos cadernos o dia tem, se já soubermos (dias recentes valem só por um tempo)."""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT partes, registrado FROM manifestos WHERE data = ?", (_chave_data(data),)
+            ).fetchone()
+        if not linha:
+            return None
+        partes, registrado = linha
+        if data < date.today() - timedelta(days=config.DIAS_RECENTES):
+            return partes
+        return partes if time.time() - registrado < config.TTL_AUSENTE_RECENTE else None
+
+    def partes_tipicas(self, data, dias=14):
+        """Maior número de cadernos nos dias anteriores já conhecidos (0 se nenhum)."""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT MAX(partes) FROM manifestos WHERE data < ? AND data >= ?",
+                (_chave_data(data), _chave_data(data - timedelta(days=dias)))
+            ).fetchone()
+        return linha[0] or 0
+
+    # --- GRAVAÇÃO ---
+
+    def guardar(self, data, parte, conteudo):
+        """Grava o conteúdo do caderno e devolve o caminho local."""
+        return self.guardar_em_partes(data, parte, [conteudo])
+
+    def caminho_parcial(self, data, parte):
+        """Onde fica um download interrompido do caderno, para ser continuado depois."""
+        return os.path.join(self.dir_parciais, f"{_chave_data(data)}p{parte:02d}.pdf.parcial")
+
+    def guardar_em_partes(self, data, parte, pedacos):
+        """
+        Grava o caderno a partir de um iterável de pedaços de bytes (ex.: `iter_content`),
+        sem nunca ter o arquivo inteiro na memória. Devolve o caminho local.
+        """
+        temporario = os.path.join(self.dir_objetos, f"recebendo.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temporario, "wb") as f:
+                for pedaco in pedacos:
+                    if pedaco:
+                        f.write(pedaco)
+            return self.guardar_arquivo(data, parte, temporario)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def guardar_arquivo(self, data, parte, origem):
+        """Move para o cache um caderno já completo em disco (ex.: um download parcial terminado)."""
+        hash_conteudo = hashlib.sha256()
+        with open(origem, "rb") as f:
+            for pedaco in iter(lambda: f.read(1024 * 1024), b""):
+                hash_conteudo.update(pedaco)
+        tamanho = os.path.getsize(origem)
+
+        sha = hash_conteudo.hexdigest()
+        arquivo = self._caminho_objeto(sha)
+        os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+        os.replace(origem, arquivo)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO objetos (sha256, tamanho, ultimo_acesso) VALUES (?, ?, ?)",
+                (sha, tamanho, time.time())
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cadernos (data, parte, sha256) VALUES (?, ?, ?)",
+                (_chave_data(data), parte, sha)
+            )
+            self._conn.execute(
+                "DELETE FROM ausentes WHERE data = ? AND parte = ?",
+                (_chave_data(data), parte)
+            )
+            self._descartar_excesso(preservar=sha)
+        return arquivo
+
+    def marcar_ausente(self, data, parte, status):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ausentes (data, parte, status, registrado) VALUES (?, ?, ?, ?)",
+                (_chave_data(data), parte, status, time.time())
+            )
+
+    def registrar_partes(self, data, partes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO manifestos (data, partes, registrado) VALUES (?, ?, ?)",
+                (_chave_data(data), partes, time.time())
+            )
+
+    def _descartar_excesso(self, preservar=None):
+        total = self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM objetos").fetchone()[0]
+        if total <= self.limite_bytes:
+            return
+
+        antigos = self._conn.execute(
+            "SELECT sha256, tamanho FROM objetos ORDER BY ultimo_acesso ASC"
+        ).fetchall()
+        for sha, tamanho in antigos:
+            if total <= self.limite_bytes:
+                break
+            if sha == preservar:
+                continue
+            try:
+                os.remove(self._caminho_objeto(sha))
+            except FileNotFoundError:
+                pass
+            self._conn.execute("DELETE FROM cadernos WHERE sha256 = ?", (sha,))
+            self._conn.execute("DELETE FROM objetos WHERE sha256 = ?", (sha,))
+            total -= tamanho
+
+
+# --- INSTÂNCIA COMPARTILHADA ---
+
+_cache_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_cache():
+    """Instância única do cache para o processo (todas as sessões a compartilham)."""
+    global _cache_padrao
+    with _lock_padrao:
+        if _cache_padrao is None:
+            _cache_padrao = CachePDF()
+        return _cache_padrao
@@ -0,0 +1,51 @@
+import os
+
+# --- ENDEREÇOS ---
+URL_BASE = "http://imagens.seplag.ce.gov.br/PDF"
+USER_AGENT = "Mozilla/5.0"
+
+# --- ARMAZENAMENTO LOCAL ---
+# Tudo o que o robô guarda em disco (PDFs, índices...) fica abaixo desta pasta.
+DIR_DADOS = os.environ.get(
+    "DOE_DIR_DADOS",
+    os.path.join(os.path.expanduser("~"), ".cache", "bot_doe")
+)
+
+# Tamanho máximo do cache de PDFs (em MB) antes de descartar os menos usados
+CACHE_MAX_MB = int(os.environ.get("DOE_CACHE_MAX_MB", "4096"))
+
+# Por quanto tempo (em segundos) um 404 de um dia recente é considerado válido.
+# Dias antigos não mudam mais, então o 404 deles vale para sempre.
+TTL_AUSENTE_RECENTE = int(os.environ.get("DOE_TTL_AUSENTE", "1800"))
+DIAS_RECENTES = 3
+
+# --- REDE ---
+# Quantas conexões simultâneas o robô abre com o servidor da SEPLAG
+MAX_CONEXOES = int(os.environ.get("DOE_MAX_CONEXOES", "8"))
+
+# Quantos pedidos por segundo, no máximo, começam para um mesmo servidor (0 = sem limite)
+REQUISICOES_POR_SEGUNDO = float(os.environ.get("DOE_REQUISICOES_POR_SEGUNDO", "10"))
+
+# Tentativas por caderno antes de desistir. Entre elas a espera dobra (com um pouco de
+# acaso), e o download continua de onde parou (HTTP Range) em vez de recomeçar.
+TENTATIVAS_DOWNLOAD = int(os.environ.get("DOE_TENTATIVAS_DOWNLOAD", "5"))
+ESPERA_INICIAL = 0.5
+ESPERA_MAXIMA = 30
+
+# --- EXTRAÇÃO ---
+# Quantos processos extraem texto dos PDFs ao mesmo tempo (padrão: um por núcleo)
+WORKERS_EXTRACAO = int(os.environ.get("DOE_WORKERS_EXTRACAO", "0")) or os.cpu_count() or 1
+
+# --- TRABALHOS EM SEGUNDO PLANO ---
+# Quantas varreduras dos apps rodam ao mesmo tempo; as demais esperam na fila
+TRABALHOS_SIMULTANEOS = int(os.environ.get("DOE_TRABALHOS_SIMULTANEOS", "2"))
+
+# Quantas vezes por segundo o andamento das varreduras chega à tela (doe.progresso)
+ATUALIZACOES_POR_SEGUNDO = float(os.environ.get("DOE_ATUALIZACOES_POR_SEGUNDO", "4"))
+
+# --- CACHE DE CONSULTAS ---
+# Resultados das buscas guardados na memória do servidor, dia a dia, para todas as
+# sessões: quanta memória (em MB, aproximada) no máximo e por quanto tempo (em segundos).
+# Dias recentes, que ainda podem ganhar cadernos, valem só por TTL_AUSENTE_RECENTE.
+CACHE_CONSULTAS_MAX_MB = int(os.environ.get("DOE_CACHE_CONSULTAS_MAX_MB", "256"))
+TTL_CONSULTAS = int(os.environ.get("DOE_TTL_CONSULTAS", "86400"))
@@ -0,0 +1,151 @@
+"""
+Cache de resultados de busca compartilhado por todas as sessões do processo.
+
+Os resultados são guardados por dia, com a consulta normalizada como chave
+(`chave_consulta`): duas pessoas procurando "Licitação" e "licitacao" no mesmo
+modo caem na mesma entrada, e uma busca de 01/03 a 31/03 aproveita os dias de
+uma anterior de 15/03 a 15/04, indo ao índice só pelos que faltam
+(`consultar_periodo`). As entradas vencem pelo tempo e, passando do limite de
+memória, as usadas há mais tempo saem primeiro (LRU).
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from doe import config
+from doe.aproximada import palavras_de
+from doe.busca import processar_termos
+from doe.metricas import obter_metricas
+from doe.periodos import faixas_pendentes
+
+
+def chave_consulta(termos, todos=True, exata=False, ignorar_acentos=True, monitorados=(), aproximada=False,
+                   versao=None):
+    """
+    Chave de uma busca: os termos na forma em que são comparados, sem repetição
+    nem ordem, e só as opções que mudam o resultado no modo usado. `versao` é a
+    do extrator, para um extrator novo não servir resultados antigos.
+    """
+    if monitorados:
+        # A lista é sempre procurada como "qualquer um", em palavras inteiras
+        return ("lista", tuple(sorted(set(processar_termos(monitorados, ignorar_acentos)))), ignorar_acentos, versao)
+    if aproximada:
+        normalizados = tuple(sorted({" ".join(palavras_de(t)) for t in termos if t}))
+        return ("aproximada", normalizados, todos or len(normalizados) == 1, versao)
+    normalizados = tuple(sorted(set(processar_termos(termos, ignorar_acentos))))
+    return ("termos", normalizados, todos or len(normalizados) == 1, exata, ignorar_acentos, versao)
+
+
+def tamanho_aproximado(valor):
+    """Bytes ocupados pelo valor e pelo que ele contém (tuplas, listas, dicts e textos)."""
+    if isinstance(valor, (tuple, list)):
+        return sys.getsizeof(valor) + sum(tamanho_aproximado(v) for v in valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamanho_aproximado(k) + tamanho_aproximado(v) for k, v in valor.items())
+    return sys.getsizeof(valor)
+
+
+class CacheConsultas:
+    """
+    Resultados por (chave, dia), na memória, com validade e descarte LRU pelo
+    tamanho: os blocos guardados trazem o texto inteiro, a forma dobrada e o mapa,
+    então um termo comum num período longo pesa bem mais que um raro.
+    Os resultados guardados são compartilhados: quem os recebe não deve alterá-los.
+    """
+
+    def __init__(self, limite_bytes=None, ttl=None):
+        self.limite_bytes = limite_bytes or config.CACHE_CONSULTAS_MAX_MB * 1024 * 1024
+        self.ttl = config.TTL_CONSULTAS if ttl is None else ttl
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._dias = OrderedDict()  # (chave, data) -> (validade, tamanho, resultados)
+
+    def _validade(self, data):
+        if data < date.today() - timedelta(days=config.DIAS_RECENTES):
+            return time.time() + self.ttl
+        return time.time() + min(self.ttl, config.TTL_AUSENTE_RECENTE)
+
+    def obter(self, chave, data):
+        """Resultados guardados do dia, ou None se não houver (ou se já venceram)."""
+        with self._lock:
+            entrada = self._dias.get((chave, data))
+            if entrada is not None and entrada[0] < time.time():
+                self._descartar((chave, data))
+                entrada = None
+            if entrada is not None:
+                self._dias.move_to_end((chave, data))
+        obter_metricas().contar("cache_consultas.acertos" if entrada is not None else "cache_consultas.faltas")
+        return entrada[2] if entrada is not None else None
+
+    def guardar(self, chave, data, resultados):
+        tamanho = tamanho_aproximado(resultados)
+        with self._lock:
+            if (chave, data) in self._dias:
+                self._descartar((chave, data))
+            if tamanho > self.limite_bytes:
+                return  # Sozinho já passaria do limite: não vale a pena guardar
+            self._dias[(chave, data)] = (self._validade(data), tamanho, resultados)
+            self.bytes += tamanho
+            while self.bytes > self.limite_bytes:
+                self._descartar(next(iter(self._dias)))
+
+    def _descartar(self, chave_dia):
+        self.bytes -= self._dias.pop(chave_dia)[1]
+
+    def limpar(self):
+        with self._lock:
+            self._dias.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._dias)
+
+
+def consultar_periodo(chave, data_inicio, data_fim, indexar, consultar, cache=None):
+    """
+    Resultados de cada dia do período, em ordem de data, como (data, resultados).
+
+    Os dias que estão no cache saem dele; os demais são preparados em faixas
+    seguidas por `indexar(inicio, fim)` (que gera (data, partes, erro), como
+    `indexar_periodo`) e respondidos por `consultar(data)`. Só entram no cache os
+    dias cujo download terminou sem erro.
+    """
+    # Um cache vazio também vale (ele tem __len__): só None usa o do processo
+    cache = cache if cache is not None else obter_cache_consultas()
+    guardados = {}
+    for ordinal in range(data_inicio.toordinal(), data_fim.toordinal() + 1):
+        resultados = cache.obter(chave, date.fromordinal(ordinal))
+        if resultados is not None:
+            guardados[date.fromordinal(ordinal)] = resultados
+
+    proximo = data_inicio
+    for inicio_faixa, fim_faixa in faixas_pendentes(data_inicio, data_fim, guardados) + [(None, None)]:
+        # Primeiro os dias guardados que vêm antes da faixa que falta
+        while proximo <= data_fim and (inicio_faixa is None or proximo < inicio_faixa):
+            yield proximo, guardados[proximo]
+            proximo += timedelta(days=1)
+        if inicio_faixa is None:
+            break
+        for data, _, erro in indexar(inicio_faixa, fim_faixa):
+            resultados = consultar(data)
+            if erro is None:
+                cache.guardar(chave, data, resultados)
+            yield data, resultados
+        proximo = fim_faixa + timedelta(days=1)
+
+
+# --- INSTÂNCIA COMPARTILHADA ---
+
+_cache_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_cache_consultas():
+    """Cache único do processo: todas as sessões do Streamlit veem os mesmos resultados."""
+    global _cache_padrao
+    with _lock_padrao:
+        if _cache_padrao is None:
+            _cache_padrao = CacheConsultas()
+        return _cache_padrao
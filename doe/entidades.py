@@ -0,0 +1,236 @@
+"""
+Entidades dos aditivos (órgãos contratantes e contratados): CNPJ/CPF, nome
+normalizado e um identificador estável para cada uma.
+
+O identificador é "cnpj:<14 dígitos>" ou "cpf:<11 dígitos>" quando o bloco traz
+um documento válido e "nome:<hash do nome normalizado>" quando não traz. Assim o
+mesmo órgão ou empresa cai sempre na mesma chave, por mais que a grafia do nome
+varie de um extrato para outro.
+
+O `DicionarioEntidades` guarda em SQLite em quais cadernos cada identificador
+aparece, para as consultas por entidade abrirem só esses cadernos.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from doe.normalizacao import dobrar
+
+# Papéis de uma entidade no aditivo (o contratante fica na coluna "Órgão")
+PAPEIS = ("Órgão", "Contratado(a)")
+COLUNAS_ID = {papel: f"ID {papel}" for papel in PAPEIS}
+COLUNAS_DOCUMENTO = {papel: f"CNPJ/CPF {papel}" for papel in PAPEIS}
+
+# CNPJ e CPF já formatados, ou qualquer grupo de dígitos logo depois do rótulo
+_DOCUMENTO = re.compile(
+    r"(?<![\d.])\d{2}\.\d{3}\.\d{3}/\d{4}-\d{2}(?!\d)"
+    r"|(?<![\d.])\d{3}\.\d{3}\.\d{3}-\d{2}(?!\d)"
+    r"|(?:CNPJ|CPF)[^\d\n]{0,25}(\d[\d. /-]{9,22}\d)",
+    re.IGNORECASE
+)
+_NAO_DIGITO = re.compile(r"\D")
+
+# O nome termina onde começa o documento ("EMPRESA X LTDA, inscrita no CNPJ...")
+_FIM_NOME = re.compile(r"\b(?:cnpj|cpf|inscrit[ao])\b")
+_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+_SOCIEDADE_ANONIMA = re.compile(r"\bs a\b")
+# Palavras que não distinguem uma entidade de outra
+_LIGACOES = {"de", "da", "do", "das", "dos", "e"}
+_SUFIXOS = {"ltda", "sa", "eireli", "me", "epp", "mei"}
+
+
+# --- DOCUMENTOS ---
+
+def _digito(digitos, pesos):
+    resto = sum(int(d) * p for d, p in zip(digitos, pesos)) % 11
+    return "0" if resto < 2 else str(11 - resto)
+
+
+def cnpj_valido(digitos):
+    if len(digitos) != 14 or digitos == digitos[0] * 14:
+        return False
+    pesos = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    return digitos[12] == _digito(digitos[:12], pesos) and digitos[13] == _digito(digitos[:13], [6] + pesos)
+
+
+def cpf_valido(digitos):
+    if len(digitos) != 11 or digitos == digitos[0] * 11:
+        return False
+    return digitos[9] == _digito(digitos[:9], range(10, 1, -1)) and digitos[10] == _digito(digitos[:10], range(11, 1, -1))
+
+
+def documento_de(texto):
+    """("cnpj"|"cpf", dígitos) se o texto for um CNPJ/CPF válido, senão None."""
+    digitos = _NAO_DIGITO.sub("", texto or "")
+    if cnpj_valido(digitos):
+        return "cnpj", digitos
+    if cpf_valido(digitos):
+        return "cpf", digitos
+    return None
+
+
+def primeiro_documento(texto, inicio=0, fim=None):
+    """Primeiro CNPJ/CPF válido em texto[inicio:fim]; números com dígito verificador errado são ignorados."""
+    for achado in _DOCUMENTO.finditer(texto, inicio, len(texto) if fim is None else fim):
+        documento = documento_de(achado.group(1) or achado.group())
+        if documento:
+            return documento
+    return None
+
+
+def formatar_documento(documento):
+    tipo, d = documento
+    if tipo == "cnpj":
+        return f"{d[:2]}.{d[2:5]}.{d[5:8]}/{d[8:12]}-{d[12:]}"
+    return f"{d[:3]}.{d[3:6]}.{d[6:9]}-{d[9:]}"
+
+
+# --- NOMES E IDENTIFICADORES ---
+
+def normalizar_nome(nome):
+    """
+    Forma do nome usada para compará-lo: minúsculo, sem acentos, sem pontuação,
+    sem "de/da/do" e sem o tipo da sociedade (LTDA, S/A, ME...) no final.
+    """
+    texto = dobrar(nome or "")
+    corte = _FIM_NOME.search(texto)
+    if corte:
+        texto = texto[:corte.start()]
+    texto = _SOCIEDADE_ANONIMA.sub("sa", _NAO_ALFANUMERICO.sub(" ", texto))
+    palavras = [p for p in texto.split() if p not in _LIGACOES]
+    while len(palavras) > 1 and palavras[-1] in _SUFIXOS:
+        palavras.pop()
+    return " ".join(palavras)
+
+
+def id_por_nome(nome):
+    normalizado = normalizar_nome(nome)
+    if not normalizado:
+        return ""
+    return "nome:" + hashlib.sha1(normalizado.encode("utf-8")).hexdigest()[:16]
+
+
+def id_entidade(documento=None, nome=None):
+    """Identificador estável: o do documento, se houver, senão o do nome ("" sem nenhum dos dois)."""
+    if documento:
+        return f"{documento[0]}:{documento[1]}"
+    return id_por_nome(nome)
+
+
+def documento_do_id(id_ent):
+    """CNPJ/CPF formatado de um identificador "cnpj:"/"cpf:" ("" nos demais)."""
+    tipo, _, digitos = (id_ent or "").partition(":")
+    return formatar_documento((tipo, digitos)) if tipo in ("cnpj", "cpf") else ""
+
+
+def marcar_entidades(item, documentos):
+    """Acrescenta ao aditivo o CNPJ/CPF e o identificador de cada papel; `documentos` vem por papel."""
+    for papel in PAPEIS:
+        documento = documentos.get(papel)
+        item[COLUNAS_DOCUMENTO[papel]] = formatar_documento(documento) if documento else ""
+        item[COLUNAS_ID[papel]] = id_entidade(documento, item[papel])
+    return item
+
+
+# --- DICIONÁRIO ---
+
+class DicionarioEntidades:
+    """
+    Em quais cadernos cada entidade aparece, com os nomes usados em cada um.
+
+    Cada linha de `aparicoes` liga um identificador a um caderno; `id_nome` é o
+    identificador pelo nome daquela grafia. Um nome que só aparece junto de um
+    único CNPJ/CPF é tratado como essa mesma entidade (veja `resolver`).
+    """
+
+    def __init__(self, caminho):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS aparicoes (
+                id TEXT, data TEXT, parte INTEGER, papel TEXT, nome TEXT, id_nome TEXT,
+                quantidade INTEGER, valor REAL,
+                PRIMARY KEY (id, data, parte, papel, nome)
+            );
+            CREATE INDEX IF NOT EXISTS idx_aparicoes_caderno ON aparicoes (data, parte);
+            CREATE INDEX IF NOT EXISTS idx_aparicoes_nome ON aparicoes (id_nome);
+        """)
+
+    def registrar_caderno(self, data, parte, aditivos):
+        """Troca as aparições do caderno pelas dos aditivos informados."""
+        chave = data.strftime("%Y%m%d")
+        linhas = {}
+        for aditivo in aditivos:
+            for papel in PAPEIS:
+                id_ent = aditivo.get(COLUNAS_ID[papel])
+                if not id_ent:
+                    continue
+                nome = aditivo[papel]
+                linha = linhas.setdefault((id_ent, papel, nome), [id_por_nome(nome), 0, 0.0])
+                linha[1] += 1
+                linha[2] += aditivo["Valor Float"]
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM aparicoes WHERE data = ? AND parte = ?", (chave, parte))
+                self._conn.executemany(
+                    "INSERT INTO aparicoes (id, data, parte, papel, nome, id_nome, quantidade, valor)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(id_ent, chave, parte, papel, nome, *linha) for (id_ent, papel, nome), linha in linhas.items()]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def resolver(self, ids):
+        """
+        {id: id final}. Identificadores por nome cujo nome só apareceu com um
+        CNPJ/CPF viram o desse documento; os demais ficam como estão.
+        """
+        ids = list(dict.fromkeys(i for i in ids if i))
+        finais = {i: i for i in ids}
+        por_nome = [i for i in ids if i.startswith("nome:")]
+        with self._lock:
+            for k in range(0, len(por_nome), 500):
+                lote = por_nome[k:k + 500]
+                linhas = self._conn.execute(
+                    f"SELECT id_nome, MIN(id) FROM aparicoes WHERE id_nome IN ({','.join('?' * len(lote))})"
+                    " AND id != id_nome GROUP BY id_nome HAVING COUNT(DISTINCT id) = 1",
+                    lote
+                ).fetchall()
+                finais.update(linhas)
+        return finais
+
+    def equivalentes(self, id_ent):
+        """O identificador e os identificadores por nome que `resolver` troca por ele."""
+        if not id_ent.startswith(("cnpj:", "cpf:")):
+            return {id_ent}
+        with self._lock:
+            nomes = [linha[0] for linha in self._conn.execute(
+                "SELECT DISTINCT id_nome FROM aparicoes WHERE id = ?", (id_ent,)
+            )]
+        return {id_ent} | {i for i, final in self.resolver(nomes).items() if final == id_ent}
+
+    def procurar(self, texto):
+        """Identificador de um CNPJ/CPF ou nome digitado (já resolvido), ou "" se não der para montar um."""
+        documento = documento_de(texto)
+        if documento:
+            return id_entidade(documento)
+        id_ent = id_por_nome(texto)
+        return self.resolver([id_ent]).get(id_ent, "") if id_ent else ""
+
+    def cadernos(self, id_ent, data_inicio, data_fim):
+        """(data, parte) dos cadernos do período em que a entidade aparece, em ordem."""
+        ids = sorted(self.equivalentes(id_ent))
+        with self._lock:
+            linhas = self._conn.execute(
+                f"SELECT DISTINCT data, parte FROM aparicoes WHERE id IN ({','.join('?' * len(ids))})"
+                " AND data >= ? AND data <= ? ORDER BY data, parte",
+                (*ids, data_inicio.strftime("%Y%m%d"), data_fim.strftime("%Y%m%d"))
+            ).fetchall()
+        return [(datetime.strptime(data, "%Y%m%d").date(), parte) for data, parte in linhas]
@@ -0,0 +1,253 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from doe import config
+from doe.metricas import obter_metricas
+
+# --- EXTRATORES ---
+# "pypdf" é o usado nas buscas por termo; "pdfplumber-layout" preserva a
+# disposição das colunas e é o que o extrator de aditivos espera.
+EXTRATOR_PYPDF = "pypdf"
+EXTRATOR_LAYOUT = "pdfplumber-layout"
+
+# Aumente quando a forma de extrair mudar, para invalidar os textos já guardados
+REVISAO_EXTRACAO = 1
+
+PAGINAS_POR_TAREFA = 8
+
+# Contador das páginas cujo texto não saiu (elas vêm vazias, e o caderno não é dado como completo)
+PAGINAS_COM_ERRO = "extracao.paginas_com_erro"
+
+
+def versao_extrator(extrator):
+    if extrator == EXTRATOR_LAYOUT:
+        import pdfplumber
+        biblioteca = pdfplumber.__version__
+    else:
+        import pypdf
+        biblioteca = pypdf.__version__
+    return f"{extrator}-{biblioteca}-r{REVISAO_EXTRACAO}"
+
+
+def contar_paginas(caminho):
+    from pypdf import PdfReader
+    # Com o arquivo aberto, o pypdf lê só o que precisa (com o caminho, ele carregaria o PDF inteiro)
+    with open(caminho, "rb") as f:
+        return len(PdfReader(f).pages)
+
+
+def _paginas_descartadas(caminho, inicio, fim, filtro):
+    """Índices em [inicio, fim) que o `filtro` garante não conter nenhum termo."""
+    if filtro is None:
+        return set()
+    from pypdf import PdfReader
+    metricas = obter_metricas()
+    comeco = time.perf_counter()
+    with open(caminho, "rb") as f:
+        leitor = PdfReader(f)
+        fim = len(leitor.pages) if fim is None else fim
+        descartadas = {indice for indice in range(inicio, fim) if not filtro.pode_conter(leitor.pages[indice])}
+    metricas.registrar_tempo("prefiltro", time.perf_counter() - comeco, quantidade=fim - inicio)
+    metricas.contar("prefiltro.descartadas", len(descartadas))
+    return descartadas
+
+
+def iterar_paginas(caminho, extrator, inicio=0, fim=None, filtro=None):
+    """
+    Gera o texto das páginas [inicio, fim) uma a uma, lendo o PDF do disco sob demanda
+    e liberando cada página logo depois de extraída. Páginas com erro saem vazias e
+    são contadas em PAGINAS_COM_ERRO.
+
+    Com um `filtro` (veja doe.prefiltro), as páginas que ele descarta nem são
+    extraídas e saem como None.
+    """
+    metricas = obter_metricas()
+    etapa = f"extracao.{extrator}"
+    try:
+        descartadas = _paginas_descartadas(caminho, inicio, fim, filtro)
+    except Exception as e:
+        metricas.erro("prefiltro", e)
+        descartadas = set()
+
+    if extrator == EXTRATOR_LAYOUT:
+        import pdfplumber
+        with pdfplumber.open(caminho) as pdf:
+            fim = len(pdf.pages) if fim is None else fim
+            for indice in range(inicio, fim):
+                if indice in descartadas:
+                    yield None
+                    continue
+                comeco = time.perf_counter()
+                pagina = pdf.pages[indice]
+                try:
+                    texto = pagina.extract_text(layout=True) or ""
+                except Exception as e:
+                    metricas.erro(etapa, e)
+                    metricas.contar(PAGINAS_COM_ERRO)
+                    texto = ""
+                finally:
+                    pagina.close()
+                metricas.registrar_tempo(etapa, time.perf_counter() - comeco)
+                yield texto
+    else:
+        from pypdf import PdfReader
+        with open(caminho, "rb") as f:
+            leitor = PdfReader(f)
+            fim = len(leitor.pages) if fim is None else fim
+            for indice in range(inicio, fim):
+                if indice in descartadas:
+                    yield None
+                    continue
+                comeco = time.perf_counter()
+                try:
+                    texto = leitor.pages[indice].extract_text() or ""
+                except Exception as e:
+                    metricas.erro(etapa, e)
+                    metricas.contar(PAGINAS_COM_ERRO)
+                    texto = ""
+                metricas.registrar_tempo(etapa, time.perf_counter() - comeco)
+                yield texto
+
+
+def _extrair_intervalo(caminho, extrator, inicio, fim, processar, filtro=None):
+    """
+    Roda dentro do processo de extração: lê as páginas [inicio, fim) do PDF e,
+    se houver, aplica `processar(texto, num_pag=...)` a cada uma.
+    Devolve ([(indice_pagina, texto, resultado), ...], medidas), sem as páginas
+    descartadas pelo `filtro`; `medidas` são as métricas do trecho (Metricas.retirar),
+    com as páginas que falharam em PAGINAS_COM_ERRO.
+    """
+    metricas = obter_metricas()
+    saida = []
+    for indice, texto in enumerate(iterar_paginas(caminho, extrator, inicio, fim, filtro), start=inicio):
+        if texto is None:
+            continue
+        resultado = None
+        if processar is not None:
+            with metricas.medir("processamento"):
+                resultado = processar(texto, num_pag=indice + 1)
+        saida.append((indice, texto, resultado))
+    return saida, metricas.retirar()
+
+
+# --- POOL DE PROCESSOS ---
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def obter_pool():
+    """Pool único do processo; é compartilhado por todas as sessões do Streamlit."""
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            # "spawn" evita herdar as threads do servidor do Streamlit num fork
+            _pool = ProcessPoolExecutor(
+                max_workers=config.WORKERS_EXTRACAO,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+# --- EXTRAÇÃO EM LOTE ---
+
+def _do_armazem(data, parte, textos, processar):
+    """Páginas que já estavam guardadas: só falta rodar `processar`, aqui mesmo."""
+    metricas = obter_metricas()
+    for indice, texto in enumerate(textos):
+        resultado = None
+        if processar is not None:
+            with metricas.medir("processamento"):
+                resultado = processar(texto, num_pag=indice + 1)
+        yield data, parte, indice, texto, resultado
+
+
+def _tarefas(cadernos, extrator, armazem, versao, paginas_por_tarefa, filtro=None):
+    """Gera ("pronto", gerador) para cadernos guardados e ("tarefa", argumentos) para os demais."""
+    metricas = obter_metricas()
+    for item in cadernos:
+        data, parte, caminho = item[0], item[1], item[2]
+        processar = item[3] if len(item) > 3 else None
+
+        if armazem is not None:
+            textos = armazem.obter(data, parte, extrator, versao)
+            if textos is not None:
+                metricas.contar("armazem_textos.acertos")
+                yield "pronto", _do_armazem(data, parte, textos, processar)
+                continue
+            metricas.contar("armazem_textos.faltas")
+        if caminho is None:
+            continue
+
+        try:
+            total = contar_paginas(caminho)
+        except Exception as e:
+            metricas.erro("extracao.abrir_pdf", e)
+            continue  # PDF corrompido: pula o caderno inteiro
+        for inicio in range(0, total, paginas_por_tarefa):
+            fim = min(total, inicio + paginas_por_tarefa)
+            yield "tarefa", (data, parte, total, (caminho, extrator, inicio, fim, processar, filtro))
+
+
+def extrair_paginas(cadernos, extrator=EXTRATOR_PYPDF, armazem=None, paginas_por_tarefa=PAGINAS_POR_TAREFA,
+                    filtro=None):
+    """
+    Extrai o texto das páginas distribuindo-as entre os núcleos da máquina.
+
+    `cadernos` é um iterável de (data, parte, caminho) ou (data, parte, caminho, processar),
+    onde `processar` é uma função "picklable" chamada no processo de extração como
+    processar(texto, num_pag=...). Gera (data, parte, indice_pagina, texto, resultado)
+    na mesma ordem de leitura dos cadernos; `indice_pagina` começa em 0.
+
+    Com um `armazem` (ArmazemTextos), cadernos já extraídos vêm direto dele (o caminho
+    pode ser None) e os novos são guardados para as próximas buscas. Um caderno com
+    alguma página que falhou não é marcado como completo, e é extraído de novo na próxima vez.
+
+    Com um `filtro` (doe.prefiltro.FiltroTermos), páginas dos PDFs que com certeza não
+    contêm os termos são puladas sem extração; como o texto fica incompleto, nada
+    é guardado no armazém nesse caso (os textos já guardados continuam sendo usados).
+    """
+    versao = versao_extrator(extrator)
+    metricas = obter_metricas()
+    pool = obter_pool()
+    limite = config.WORKERS_EXTRACAO * 2
+    pendentes = deque()
+    falhos = set()
+
+    def entregar(tipo, conteudo):
+        if tipo == "pronto":
+            yield from conteudo
+            return
+
+        data, parte, total, futuro, fim = conteudo
+        try:
+            paginas, medidas = futuro.result()
+        except Exception as e:
+            metricas.erro("extracao.abrir_pdf", e)
+            falhos.add((data, parte))
+            return  # O PDF não abriu no processo de extração: pula o trecho
+        if medidas["contadores"].get(PAGINAS_COM_ERRO):
+            # Alguma página saiu vazia por erro: o texto guardado fica incompleto
+            falhos.add((data, parte))
+        metricas.incorporar(medidas)
+        if armazem is not None and filtro is None:
+            armazem.guardar_paginas(data, parte, extrator, [(indice, texto) for indice, texto, _ in paginas])
+            if fim == total and (data, parte) not in falhos:
+                armazem.concluir_caderno(data, parte, extrator, versao, total)
+        for indice, texto, resultado in paginas:
+            yield data, parte, indice, texto, resultado
+
+    for tipo, conteudo in _tarefas(cadernos, extrator, armazem, versao, paginas_por_tarefa, filtro):
+        if tipo == "tarefa":
+            data, parte, total, argumentos = conteudo
+            conteudo = (data, parte, total, pool.submit(_extrair_intervalo, *argumentos), argumentos[3])
+        pendentes.append((tipo, conteudo))
+        # Só deixa algumas tarefas na fila para não segurar páginas demais na memória
+        while len(pendentes) >= limite:
+            yield from entregar(*pendentes.popleft())
+
+    while pendentes:
+        yield from entregar(*pendentes.popleft())
@@ -0,0 +1,362 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from doe import config
+from doe.aproximada import distancia_limitada, erros_permitidos, ocorrencias, palavras_com_posicoes, palavras_de, trigramas
+from doe.baixador import baixar_periodo
+from doe.blocos import separar_blocos
+from doe.busca import bloco_corresponde, compilar_padroes, processar_termos
+from doe.extracao import EXTRATOR_PYPDF, extrair_paginas, versao_extrator
+from doe.normalizacao import dobrar_com_mapa, posicao_original
+from doe.textos import obter_armazem
+
+# O tokenizador "trigram" só consegue filtrar termos com pelo menos 3 letras
+MIN_CARACTERES_FTS = 3
+
+# Parâmetros por comando nas consultas ao vocabulário (o SQLite aceita bem mais)
+LOTE_SQL = 500
+
+
+def _chave_data(data):
+    return data.strftime("%Y%m%d")
+
+
+def _frase_fts(termo):
+    return '"' + termo.replace('"', '""') + '"'
+
+
+def _data(chave):
+    return datetime.strptime(chave, "%Y%m%d").date()
+
+
+def _dobra(sem_acento, mapa):
+    """(texto_sem_acento, mapa) de um bloco, como `dobrar_com_mapa` devolveria."""
+    return sem_acento, [tuple(p) for p in json.loads(mapa)] if mapa else []
+
+
+_SELECT_BLOCOS = (
+    "SELECT b.data, b.parte, b.pagina, b.bloco, b.texto, f.{coluna}, f.texto_sem_acento, b.mapa "
+    "FROM blocos b JOIN blocos_fts f ON f.rowid = b.id"
+)
+
+
+class IndiceBlocos:
+    """
+    Índice de texto completo (SQLite FTS5) dos blocos "*** *** ***" do DOE.
+
+    Cada bloco é guardado em minúsculas e também sem acentos (como em
+    `remover_acentos`), com o tokenizador de trigramas, que permite achar
+    qualquer trecho do texto e não só palavras inteiras. O FTS só seleciona os
+    candidatos; a confirmação final usa exatamente a regra das buscas lineares.
+
+    A forma sem acentos é feita uma única vez, na indexação, junto com o mapa de
+    volta às posições do original (`dobrar_com_mapa`); as buscas devolvem as duas,
+    para o realce não precisar normalizar o bloco de novo.
+
+    Para a busca aproximada (`buscar_aproximada`), cada bloco também é guardado
+    como lista de palavras, já sem as quebras por hífen, num segundo índice FTS5
+    (por palavra), e cada palavra nova entra no vocabulário com os seus trigramas.
+    """
+
+    def __init__(self, caminho=None):
+        caminho = caminho or os.path.join(config.DIR_DADOS, "indice.db")
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blocos (
+                id INTEGER PRIMARY KEY,
+                data TEXT, parte INTEGER, pagina INTEGER, bloco INTEGER, texto TEXT, mapa TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_blocos_local ON blocos (data, parte, pagina, bloco);
+            CREATE VIRTUAL TABLE IF NOT EXISTS blocos_fts USING fts5(
+                texto_min, texto_sem_acento, tokenize = 'trigram'
+            );
+            CREATE TABLE IF NOT EXISTS cadernos_indexados (
+                data TEXT, parte INTEGER, versao TEXT,
+                PRIMARY KEY (data, parte)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS blocos_palavras USING fts5(palavras, tokenize = 'unicode61');
+            CREATE TABLE IF NOT EXISTS vocabulario (palavra TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS vocabulario_trigramas (
+                trigrama TEXT, tamanho INTEGER, palavra TEXT,
+                PRIMARY KEY (trigrama, tamanho, palavra)
+            ) WITHOUT ROWID;
+        """)
+
+    # --- ESCRITA ---
+
+    def _gravar_palavras(self, id_bloco, dobrado):
+        """Palavras do bloco no índice por palavra; devolve o conjunto delas para o vocabulário."""
+        palavras = [p for p, _, _ in palavras_com_posicoes(dobrado)]
+        self._conn.execute(
+            "INSERT INTO blocos_palavras (rowid, palavras) VALUES (?, ?)", (id_bloco, " ".join(palavras))
+        )
+        return set(palavras)
+
+    def _registrar_vocabulario(self, palavras):
+        """Acrescenta ao vocabulário (e aos trigramas dele) as palavras que ainda não estão lá."""
+        novas = set(palavras)
+        lista = list(novas)
+        for k in range(0, len(lista), LOTE_SQL):
+            lote = lista[k:k + LOTE_SQL]
+            novas.difference_update(linha[0] for linha in self._conn.execute(
+                f"SELECT palavra FROM vocabulario WHERE palavra IN ({','.join('?' * len(lote))})", lote
+            ))
+        self._conn.executemany("INSERT OR IGNORE INTO vocabulario (palavra) VALUES (?)", [(p,) for p in novas])
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO vocabulario_trigramas (trigrama, tamanho, palavra) VALUES (?, ?, ?)",
+            [(t, len(p), p) for p in novas for t in trigramas(p)]
+        )
+
+    def indexado(self, data, parte, versao):
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT versao FROM cadernos_indexados WHERE data = ? AND parte = ?",
+                (_chave_data(data), parte)
+            ).fetchone()
+        return bool(linha) and linha[0] == versao
+
+    def indexar_caderno(self, data, parte, textos_paginas, versao):
+        """Troca os blocos do caderno pelos das páginas informadas (lista de textos, em ordem)."""
+        chave = _chave_data(data)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                antigos = "SELECT id FROM blocos WHERE data = ? AND parte = ?"
+                self._conn.execute(f"DELETE FROM blocos_fts WHERE rowid IN ({antigos})", (chave, parte))
+                self._conn.execute(f"DELETE FROM blocos_palavras WHERE rowid IN ({antigos})", (chave, parte))
+                self._conn.execute("DELETE FROM blocos WHERE data = ? AND parte = ?", (chave, parte))
+
+                vocabulario = set()
+                for pagina, texto_pagina in enumerate(textos_paginas):
+                    for num_bloco, texto_bloco in enumerate(separar_blocos(texto_pagina)):
+                        if not texto_bloco.strip():
+                            continue
+                        dobrado, mapa = dobrar_com_mapa(texto_bloco)
+                        cursor = self._conn.execute(
+                            "INSERT INTO blocos (data, parte, pagina, bloco, texto, mapa) VALUES (?, ?, ?, ?, ?, ?)",
+                            (chave, parte, pagina, num_bloco, texto_bloco, json.dumps(mapa) if mapa else "")
+                        )
+                        self._conn.execute(
+                            "INSERT INTO blocos_fts (rowid, texto_min, texto_sem_acento) VALUES (?, ?, ?)",
+                            (cursor.lastrowid, texto_bloco.lower(), dobrado)
+                        )
+                        vocabulario |= self._gravar_palavras(cursor.lastrowid, dobrado)
+                self._registrar_vocabulario(vocabulario)
+
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cadernos_indexados (data, parte, versao) VALUES (?, ?, ?)",
+                    (chave, parte, versao)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # --- CONSULTA ---
+
+    def buscar(self, termos, todos=True, exata=False, ignorar_acentos=True, data_inicio=None, data_fim=None):
+        """
+        Blocos que contêm os termos, em ordem de data/caderno/página.
+
+        `todos=True` exige todos os termos no bloco (E); `False` aceita qualquer um (OU).
+        Cada termo é procurado como trecho contínuo (frase). Devolve uma lista de
+        (data, parte, indice_pagina, indice_bloco, texto_original, dobra), onde `dobra`
+        é o (texto_sem_acento, mapa) para `realcar_bloco`.
+        """
+        termos = [t for t in termos if t]
+        if not termos:
+            return []
+
+        coluna = "texto_sem_acento" if ignorar_acentos else "texto_min"
+        processados = processar_termos(termos, ignorar_acentos)
+
+        # Termos curtos não passam pelo FTS: ficam só para a confirmação final
+        filtraveis = [t for t in processados if len(t) >= MIN_CARACTERES_FTS]
+        usar_fts = bool(filtraveis) and (todos or len(filtraveis) == len(processados))
+
+        sql = _SELECT_BLOCOS.format(coluna=coluna)
+        condicoes = []
+        parametros = []
+        if usar_fts:
+            operador = " AND " if todos else " OR "
+            condicoes.append("blocos_fts MATCH ?")
+            parametros.append("{" + coluna + "} : (" + operador.join(_frase_fts(t) for t in filtraveis) + ")")
+        if data_inicio:
+            condicoes.append("b.data >= ?")
+            parametros.append(_chave_data(data_inicio))
+        if data_fim:
+            condicoes.append("b.data <= ?")
+            parametros.append(_chave_data(data_fim))
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY b.data, b.parte, b.pagina, b.bloco"
+
+        with self._lock:
+            linhas = self._conn.execute(sql, parametros).fetchall()
+
+        padroes = compilar_padroes(processados) if exata else None
+        resultados = []
+        for data, parte, pagina, bloco, texto, texto_busca, sem_acento, mapa in linhas:
+            if bloco_corresponde(texto_busca, processados, todos, padroes):
+                resultados.append((_data(data), parte, pagina, bloco, texto, _dobra(sem_acento, mapa)))
+        return resultados
+
+    def buscar_monitorados(self, automato, data_inicio=None, data_fim=None):
+        """
+        Blocos com pelo menos um termo da lista de monitoramento (AutomatoTermos).
+
+        Cada bloco é percorrido uma única vez pelo autômato. Devolve uma lista de
+        (data, parte, indice_pagina, indice_bloco, texto_original, dobra, termos_encontrados),
+        com `dobra` como em `buscar`.
+        """
+        if not len(automato):
+            return []
+
+        coluna = "texto_sem_acento" if automato.ignorar_acentos else "texto_min"
+        sql = _SELECT_BLOCOS.format(coluna=coluna)
+        condicoes = []
+        parametros = []
+        if data_inicio:
+            condicoes.append("b.data >= ?")
+            parametros.append(_chave_data(data_inicio))
+        if data_fim:
+            condicoes.append("b.data <= ?")
+            parametros.append(_chave_data(data_fim))
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY b.data, b.parte, b.pagina, b.bloco"
+
+        with self._lock:
+            linhas = self._conn.execute(sql, parametros).fetchall()
+
+        resultados = []
+        for data, parte, pagina, bloco, texto, texto_busca, sem_acento, mapa in linhas:
+            termos = automato.termos_encontrados(texto_busca)
+            if termos:
+                resultados.append((_data(data), parte, pagina, bloco, texto, _dobra(sem_acento, mapa), termos))
+        return resultados
+
+    def variantes(self, palavra, erros):
+        """
+        Palavras do vocabulário a no máximo `erros` edições da palavra (ela inclusa).
+
+        Só são comparadas as do tamanho certo que têm trigramas suficientes em comum:
+        cada edição estraga no máximo 3 trigramas da palavra.
+        """
+        if not erros:
+            return {palavra}
+        tris = sorted(trigramas(palavra))
+        with self._lock:
+            candidatas = [linha[0] for linha in self._conn.execute(
+                f"SELECT palavra FROM vocabulario_trigramas WHERE trigrama IN ({','.join('?' * len(tris))})"
+                " AND tamanho BETWEEN ? AND ? GROUP BY palavra HAVING COUNT(*) >= ?",
+                (*tris, len(palavra) - erros, len(palavra) + erros, len(tris) - 3 * erros)
+            )]
+        return {palavra} | {c for c in candidatas if distancia_limitada(palavra, c, erros) <= erros}
+
+    def buscar_aproximada(self, termos, todos=True, max_erros=None, data_inicio=None, data_fim=None):
+        """
+        Blocos com os termos escritos de forma parecida: cada palavra do termo aceita
+        algumas edições (`erros_permitidos`, até `max_erros`) e as palavras quebradas
+        por hífen no fim da linha contam inteiras. Sempre ignora acentos.
+
+        Devolve as tuplas de `buscar_monitorados`, com os trechos encontrados (como
+        estão no texto original) no lugar dos termos, prontos para `realcar_bloco`.
+        """
+        consultas = []
+        for termo in termos:
+            palavras = palavras_de(termo or "")
+            if palavras:
+                consultas.append([self.variantes(p, erros_permitidos(p, max_erros)) for p in palavras])
+        if not consultas:
+            return []
+
+        # Cada palavra do termo vira um OU das suas variantes; a ordem delas é conferida depois
+        expressoes = [
+            " AND ".join("(" + " OR ".join(_frase_fts(v) for v in sorted(variantes)) + ")" for variantes in consulta)
+            for consulta in consultas
+        ]
+        operador = " AND " if todos else " OR "
+        sql = _SELECT_BLOCOS.format(coluna="texto_sem_acento") + " JOIN blocos_palavras p ON p.rowid = b.id"
+        condicoes = ["blocos_palavras MATCH ?"]
+        parametros = [operador.join(f"({e})" for e in expressoes)]
+        if data_inicio:
+            condicoes.append("b.data >= ?")
+            parametros.append(_chave_data(data_inicio))
+        if data_fim:
+            condicoes.append("b.data <= ?")
+            parametros.append(_chave_data(data_fim))
+        sql += " WHERE " + " AND ".join(condicoes) + " ORDER BY b.data, b.parte, b.pagina, b.bloco"
+
+        with self._lock:
+            linhas = self._conn.execute(sql, parametros).fetchall()
+
+        resultados = []
+        for data, parte, pagina, bloco, texto, _, sem_acento, mapa in linhas:
+            dobra = _dobra(sem_acento, mapa)
+            dobrado, mapa_posicoes = dobra
+            palavras_bloco = palavras_com_posicoes(dobrado)
+            achados = [ocorrencias(palavras_bloco, consulta) for consulta in consultas]
+            if not (all(achados) if todos else any(achados)):
+                continue
+            trechos = []
+            for inicio, fim in sorted(o for a in achados for o in a):
+                a = posicao_original(mapa_posicoes, inicio)
+                b = posicao_original(mapa_posicoes, fim - 1) + 1
+                trechos.append(texto[a:b])
+            resultados.append((_data(data), parte, pagina, bloco, texto, dobra, tuple(dict.fromkeys(trechos))))
+        return resultados
+
+
+def indexar_periodo(data_inicio, data_fim, indice=None, armazem=None, timeout=15):
+    """
+    Garante que todos os cadernos do período estejam no índice, dia a dia.
+
+    Gera (data, partes, erro) em ordem de data assim que cada dia fica pronto.
+    Só baixa/extrai o que não estiver nem no índice nem no armazém de textos.
+    """
+    indice = indice or obter_indice()
+    armazem = armazem or obter_armazem()
+    versao = versao_extrator(EXTRATOR_PYPDF)
+
+    def precisa_pdf(data, parte):
+        return not indice.indexado(data, parte, versao) and not armazem.tem(data, parte, EXTRATOR_PYPDF, versao)
+
+    for data, cadernos, erro in baixar_periodo(data_inicio, data_fim, timeout=timeout, precisa_pdf=precisa_pdf):
+        faltam = [
+            (data, parte, caminho) for parte, caminho in cadernos
+            if not indice.indexado(data, parte, versao)
+        ]
+
+        # As páginas chegam em ordem, caderno após caderno
+        paginas_por_parte = {}
+        for _, parte, _, texto, _ in extrair_paginas(faltam, extrator=EXTRATOR_PYPDF, armazem=armazem):
+            paginas_por_parte.setdefault(parte, []).append(texto)
+
+        for _, parte, _ in faltam:
+            # Só indexa o que foi extraído por inteiro
+            if armazem.tem(data, parte, EXTRATOR_PYPDF, versao):
+                indice.indexar_caderno(data, parte, paginas_por_parte.get(parte, []), versao)
+
+        yield data, [parte for parte, _ in cadernos], erro
+
+
+# --- INSTÂNCIA COMPARTILHADA ---
+
+_indice_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_indice():
+    global _indice_padrao
+    with _lock_padrao:
+        if _indice_padrao is None:
+            _indice_padrao = IndiceBlocos()
+        return _indice_padrao
@@ -0,0 +1,223 @@
+"""
+Ingestão diária do DOE, sem interface: baixa os cadernos novos, extrai o texto,
+indexa os blocos e roda o extrator de aditivos (gravados no Parquet de `doe.resultados`),
+deixando tudo pronto para os apps.
+
+Uso:
+    python -m doe.ingestao --inicio 2025-01-01          # fica rodando, todo dia às 07:00
+    python -m doe.ingestao --inicio 2025-01-01 --uma-vez
+    python -m doe.ingestao --metricas /var/lib/node_exporter/doe.prom   # métricas para o Prometheus
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from doe import config
+from doe.aditivos import leitor_do_caderno
+from doe.baixador import baixar_periodo
+from doe.extracao import EXTRATOR_LAYOUT, EXTRATOR_PYPDF, extrair_paginas, versao_extrator
+from doe.indice import obter_indice
+from doe.metricas import obter_metricas
+from doe.resultados import obter_resultados
+from doe.textos import obter_armazem
+
+log = logging.getLogger("doe.ingestao")
+
+
+def _chave_data(data):
+    return data.strftime("%Y%m%d")
+
+
+class RegistroIngestao:
+    """
+    O que a ingestão já concluiu: cada (data, parte) processado, com quantas páginas
+    e aditivos tinha, e os dias "fechados" (antigos o bastante para não ganharem cadernos
+    novos). Os aditivos em si ficam só no Parquet de `doe.resultados`.
+    """
+
+    def __init__(self, caminho=None):
+        caminho = caminho or os.path.join(config.DIR_DADOS, "ingestao.db")
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cadernos (
+                data TEXT, parte INTEGER, paginas INTEGER, quantidade_aditivos INTEGER, concluido_em REAL,
+                PRIMARY KEY (data, parte)
+            );
+            CREATE TABLE IF NOT EXISTS dias (
+                data TEXT PRIMARY KEY, partes INTEGER, concluido_em REAL
+            );
+        """)
+
+    def caderno_concluido(self, data, parte):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM cadernos WHERE data = ? AND parte = ?", (_chave_data(data), parte)
+            ).fetchone() is not None
+
+    def dia_fechado(self, data):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM dias WHERE data = ?", (_chave_data(data),)
+            ).fetchone() is not None
+
+    def marcar_caderno(self, data, parte, paginas, quantidade_aditivos):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cadernos (data, parte, paginas, quantidade_aditivos, concluido_em)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (_chave_data(data), parte, paginas, quantidade_aditivos, time.time())
+            )
+
+    def fechar_dia(self, data, partes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dias (data, partes, concluido_em) VALUES (?, ?, ?)",
+                (_chave_data(data), partes, time.time())
+            )
+
+    def primeiro_dia_registrado(self):
+        with self._lock:
+            linha = self._conn.execute("SELECT MIN(data) FROM cadernos").fetchone()
+        return datetime.strptime(linha[0], "%Y%m%d").date() if linha[0] else None
+
+    def primeiro_dia_aberto(self, desde):
+        """Primeiro dia a partir de `desde` que ainda não foi fechado."""
+        with self._lock:
+            fechados = {
+                linha[0] for linha in self._conn.execute(
+                    "SELECT data FROM dias WHERE data >= ?", (_chave_data(desde),)
+                )
+            }
+        dia = desde
+        while _chave_data(dia) in fechados:
+            dia += timedelta(days=1)
+        return dia
+
+
+# --- CICLO DE INGESTÃO ---
+
+def _processar_caderno(data, parte, caminho, indice, armazem, versao_busca):
+    # Texto "corrido" (pypdf) para o índice de busca
+    textos = [
+        texto for _, _, _, texto, _ in
+        extrair_paginas([(data, parte, caminho)], extrator=EXTRATOR_PYPDF, armazem=armazem)
+    ]
+    if not armazem.tem(data, parte, EXTRATOR_PYPDF, versao_busca):
+        raise RuntimeError("extração incompleta")
+    if not indice.indexado(data, parte, versao_busca):
+        indice.indexar_caderno(data, parte, textos, versao_busca)
+
+    # Texto com layout (pdfplumber) para o extrator de aditivos
+    aditivos = []
+    itens = [(data, parte, caminho, leitor_do_caderno(data, parte))]
+    for _, _, _, _, novos in extrair_paginas(itens, extrator=EXTRATOR_LAYOUT, armazem=armazem):
+        aditivos.extend(novos or [])
+    # Um trecho que falhou na extração deixaria o caderno sem parte dos aditivos
+    if not armazem.tem(data, parte, EXTRATOR_LAYOUT, versao_extrator(EXTRATOR_LAYOUT)):
+        raise RuntimeError("extração incompleta")
+    return len(textos), aditivos
+
+
+def ingerir(data_inicio, data_fim, registro=None, indice=None, armazem=None, resultados=None):
+    """
+    Processa tudo o que falta entre as datas e devolve quantos cadernos novos foram concluídos.
+    Pode ser interrompida a qualquer momento: o que já foi registrado não é refeito.
+    """
+    registro = registro or RegistroIngestao()
+    indice = indice or obter_indice()
+    armazem = armazem or obter_armazem()
+    resultados = resultados or obter_resultados()
+    versao_busca = versao_extrator(EXTRATOR_PYPDF)
+    limite_fechamento = date.today() - timedelta(days=config.DIAS_RECENTES)
+    novos = 0
+
+    def precisa_pdf(data, parte):
+        return not registro.caderno_concluido(data, parte)
+
+    for data, cadernos, erro in baixar_periodo(data_inicio, data_fim, precisa_pdf=precisa_pdf):
+        if registro.dia_fechado(data):
+            continue
+
+        falhou = erro is not None
+        if erro is not None:
+            log.warning("%s: download interrompido após %d caderno(s): %s", data, len(cadernos), erro)
+
+        for parte, caminho in cadernos:
+            if caminho is None:
+                continue  # Já concluído em outra rodada
+            try:
+                paginas, aditivos = _processar_caderno(data, parte, caminho, indice, armazem, versao_busca)
+            except Exception as e:
+                falhou = True
+                log.warning("%s parte %02d: %s", data, parte, e)
+                continue
+            resultados.gravar_caderno(data, parte, aditivos)
+            registro.marcar_caderno(data, parte, paginas, len(aditivos))
+            novos += 1
+            log.info("%s parte %02d: %d página(s), %d aditivo(s)", data, parte, paginas, len(aditivos))
+
+        # Dias antigos não recebem cadernos novos: não precisam ser olhados de novo
+        if not falhou and data <= limite_fechamento:
+            registro.fechar_dia(data, len(cadernos))
+
+    return novos
+
+
+def _gravar_metricas(arquivo):
+    """Grava o retrato das métricas no formato do Prometheus, trocando o arquivo de uma vez só."""
+    temporario = f"{arquivo}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(obter_metricas().para_prometheus())
+    os.replace(temporario, arquivo)
+
+
+def _proxima_execucao(hora, agora):
+    alvo = agora.replace(hour=hora.hour, minute=hora.minute, second=0, microsecond=0)
+    if alvo <= agora:
+        alvo += timedelta(days=1)
+    return alvo
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Ingestão diária do Diário Oficial do Ceará")
+    parser.add_argument("--inicio", type=date.fromisoformat, default=None,
+                        help="primeiro dia a ingerir (AAAA-MM-DD); padrão: onde a última execução parou, ou hoje")
+    parser.add_argument("--hora", default="07:00", help="horário diário da verificação (HH:MM)")
+    parser.add_argument("--uma-vez", action="store_true", help="roda um ciclo e sai")
+    parser.add_argument("--metricas", metavar="ARQUIVO", default=None,
+                        help="grava as métricas de desempenho (texto do Prometheus) ao fim de cada ciclo")
+    args = parser.parse_args(argumentos)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    hora = datetime.strptime(args.hora, "%H:%M").time()
+    registro = RegistroIngestao()
+    desde = args.inicio or registro.primeiro_dia_registrado() or date.today()
+
+    while True:
+        inicio = registro.primeiro_dia_aberto(desde)
+        hoje = date.today()
+        if inicio <= hoje:
+            log.info("Ingerindo de %s até %s", inicio, hoje)
+            novos = ingerir(inicio, hoje, registro=registro)
+            log.info("Ciclo concluído: %d caderno(s) novo(s)", novos)
+        if args.metricas:
+            _gravar_metricas(args.metricas)
+
+        if args.uma_vez:
+            break
+
+        proxima = _proxima_execucao(hora, datetime.now())
+        log.info("Próxima verificação em %s", proxima)
+        time.sleep(max(1, (proxima - datetime.now()).total_seconds()))
+
+
+if __name__ == "__main__":
+    main()
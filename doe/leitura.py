@@ -0,0 +1,39 @@
+from doe.baixador import baixar_periodo
+from doe.extracao import EXTRATOR_PYPDF, extrair_paginas, versao_extrator
+from doe.textos import obter_armazem
+
+
+def ler_periodo(data_inicio, data_fim, extrator=EXTRATOR_PYPDF, processador=None,
+                max_partes=None, timeout=15, armazem=None, filtro=None):
+    """
+    Texto de todas as páginas do período, dia a dia e em ordem de data.
+
+    Gera (data, partes, erro, paginas), onde `paginas` gera
+    (data, parte, indice_pagina, texto, resultado). Cadernos cujo texto já está no
+    armazém não são baixados nem lidos de novo. `processador(data, parte)`, se
+    informado, devolve a função a aplicar em cada página daquele caderno
+    (veja `extrair_paginas`). Com um `filtro`, as páginas que ele descarta não
+    aparecem em `paginas`.
+    """
+    armazem = armazem or obter_armazem()
+    versao = versao_extrator(extrator)
+
+    def precisa_pdf(data, parte):
+        return not armazem.tem(data, parte, extrator, versao)
+
+    periodo = baixar_periodo(data_inicio, data_fim, max_partes=max_partes, timeout=timeout, precisa_pdf=precisa_pdf)
+    for data, cadernos, erro in periodo:
+        itens = [
+            (data, parte, caminho, processador(data, parte) if processador else None)
+            for parte, caminho in cadernos
+        ]
+        paginas = extrair_paginas(itens, extrator=extrator, armazem=armazem, filtro=filtro)
+        yield data, [parte for parte, _ in cadernos], erro, paginas
+
+
+def ler_dia(data, extrator=EXTRATOR_PYPDF, processador=None, max_partes=None, timeout=15, armazem=None,
+            filtro=None):
+    """Atalho para um único dia: devolve (partes, erro, paginas)."""
+    for _, partes, erro, paginas in ler_periodo(data, data, extrator, processador, max_partes, timeout, armazem, filtro):
+        return partes, erro, paginas
+    return [], None, iter(())
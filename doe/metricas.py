@@ -0,0 +1,177 @@
+"""
+Medidas de desempenho por etapa: tempos, contadores e erros por tipo.
+
+Há um registro por processo (`obter_metricas`). O que é medido dentro dos
+processos de extração volta junto com as páginas e é somado ao registro do
+processo principal (veja `doe.extracao`). O retrato sai em JSON ou no formato
+de texto do Prometheus.
+"""
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIXO_PROMETHEUS = "doe"
+
+# Pares (acertos, faltas) dos caches, para a taxa de acerto do retrato
+CACHES = {
+    "cache_pdf": ("cache_pdf.acertos", "cache_pdf.faltas"),
+    "armazem_textos": ("armazem_textos.acertos", "armazem_textos.faltas"),
+    "cache_consultas": ("cache_consultas.acertos", "cache_consultas.faltas"),
+}
+
+
+class Metricas:
+    """Contadores e cronômetros de um processo, seguros para várias threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.desde = time.time()
+            self._contadores = {}
+            self._tempos = {}  # etapa -> [quantidade, segundos, maximo]
+            self._erros = {}  # (etapa, tipo) -> quantidade
+
+    # --- REGISTRO ---
+
+    def contar(self, nome, valor=1):
+        with self._lock:
+            self._contadores[nome] = self._contadores.get(nome, 0) + valor
+
+    def registrar_tempo(self, etapa, segundos, quantidade=1):
+        with self._lock:
+            tempo = self._tempos.setdefault(etapa, [0, 0.0, 0.0])
+            tempo[0] += quantidade
+            tempo[1] += segundos
+            tempo[2] = max(tempo[2], segundos)
+
+    def erro(self, etapa, excecao):
+        chave = (etapa, type(excecao).__name__)
+        with self._lock:
+            self._erros[chave] = self._erros.get(chave, 0) + 1
+
+    @contextmanager
+    def medir(self, etapa):
+        """Cronometra o bloco; se ele levantar uma exceção, ela também conta como erro da etapa."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.erro(etapa, e)
+            raise
+        finally:
+            self.registrar_tempo(etapa, time.perf_counter() - inicio)
+
+    # --- ENTRE PROCESSOS ---
+
+    def retirar(self):
+        """Devolve as medidas acumuladas (em forma "picklable") e recomeça do zero."""
+        with self._lock:
+            bruto = {"contadores": self._contadores, "tempos": self._tempos, "erros": self._erros}
+            self._contadores, self._tempos, self._erros = {}, {}, {}
+        return bruto
+
+    def incorporar(self, bruto):
+        """Soma as medidas vindas de `retirar` (de outro processo)."""
+        with self._lock:
+            for nome, valor in bruto["contadores"].items():
+                self._contadores[nome] = self._contadores.get(nome, 0) + valor
+            for etapa, (quantidade, segundos, maximo) in bruto["tempos"].items():
+                tempo = self._tempos.setdefault(etapa, [0, 0.0, 0.0])
+                tempo[0] += quantidade
+                tempo[1] += segundos
+                tempo[2] = max(tempo[2], maximo)
+            for chave, quantidade in bruto["erros"].items():
+                self._erros[chave] = self._erros.get(chave, 0) + quantidade
+
+    # --- RETRATO ---
+
+    def retrato(self):
+        """Tudo o que foi medido até agora, em estruturas simples (prontas para JSON)."""
+        with self._lock:
+            contadores = dict(self._contadores)
+            tempos = {etapa: list(valores) for etapa, valores in self._tempos.items()}
+            erros = dict(self._erros)
+            desde = self.desde
+
+        etapas = {}
+        for etapa, (quantidade, segundos, maximo) in sorted(tempos.items()):
+            etapas[etapa] = {
+                "quantidade": quantidade,
+                "segundos": round(segundos, 4),
+                "media_ms": round(segundos / quantidade * 1000, 2) if quantidade else 0.0,
+                "maximo_ms": round(maximo * 1000, 2),
+                "por_segundo": round(quantidade / segundos, 2) if segundos else 0.0,
+            }
+
+        taxas = {}
+        for cache, (acertos, faltas) in CACHES.items():
+            total = contadores.get(acertos, 0) + contadores.get(faltas, 0)
+            if total:
+                taxas[cache] = round(contadores.get(acertos, 0) / total, 4)
+
+        return {
+            "desde": desde,
+            "segundos": round(time.time() - desde, 1),
+            "contadores": dict(sorted(contadores.items())),
+            "etapas": etapas,
+            "taxa_acerto": taxas,
+            "erros": [
+                {"etapa": etapa, "tipo": tipo, "quantidade": quantidade}
+                for (etapa, tipo), quantidade in sorted(erros.items())
+            ],
+        }
+
+    def para_json(self):
+        return json.dumps(self.retrato(), ensure_ascii=False, indent=2)
+
+    def para_prometheus(self):
+        """Retrato no formato de texto do Prometheus (ex.: para o textfile collector)."""
+        retrato = self.retrato()
+        linhas = []
+
+        def serie(nome, tipo, amostras):
+            nome = f"{PREFIXO_PROMETHEUS}_{nome}"
+            linhas.append(f"# TYPE {nome} {tipo}")
+            for rotulos, valor in amostras:
+                texto_rotulos = ",".join(f'{k}="{_escapar(v)}"' for k, v in rotulos.items())
+                linhas.append(f"{nome}{{{texto_rotulos}}} {valor}" if texto_rotulos else f"{nome} {valor}")
+
+        for nome, valor in retrato["contadores"].items():
+            serie(_nome_prometheus(nome) + "_total", "counter", [({}, valor)])
+        etapas = retrato["etapas"].items()
+        if etapas:
+            serie("etapa_segundos_total", "counter", [({"etapa": e}, v["segundos"]) for e, v in etapas])
+            serie("etapa_execucoes_total", "counter", [({"etapa": e}, v["quantidade"]) for e, v in etapas])
+            serie("etapa_maximo_segundos", "gauge", [({"etapa": e}, round(v["maximo_ms"] / 1000, 6)) for e, v in etapas])
+        if retrato["taxa_acerto"]:
+            serie("cache_taxa_acerto", "gauge", [({"cache": c}, t) for c, t in retrato["taxa_acerto"].items()])
+        if retrato["erros"]:
+            serie("erros_total", "counter", [({"etapa": e["etapa"], "tipo": e["tipo"]}, e["quantidade"]) for e in retrato["erros"]])
+        return "\n".join(linhas) + "\n"
+
+
+def _nome_prometheus(nome):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", nome)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# --- INSTÂNCIA COMPARTILHADA ---
+
+_metricas_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_metricas():
+    global _metricas_padrao
+    with _lock_padrao:
+        if _metricas_padrao is None:
+            _metricas_padrao = Metricas()
+        return _metricas_padrao
@@ -0,0 +1,98 @@
+from collections import deque
+
+from doe.normalizacao import dobrar
+
+
+def _caractere_de_palavra(c):
+    # Mesma noção de "palavra" do \w das expressões regulares
+    return c.isalnum() or c == "_"
+
+
+class AutomatoTermos:
+    """
+    Autômato de Aho–Corasick para listas grandes de termos (empresas, CPF/CNPJ...).
+
+    Os termos são compilados uma única vez e cada bloco é percorrido uma só vez,
+    não importa quantos termos existam. O texto recebido já deve estar na mesma
+    forma dos termos: minúsculo e, com `ignorar_acentos`, sem acentos.
+    """
+
+    def __init__(self, termos, ignorar_acentos=True, palavra_inteira=True):
+        self.ignorar_acentos = ignorar_acentos
+        self.palavra_inteira = palavra_inteira
+
+        # termo processado -> termo como o usuário digitou (o primeiro, se repetido)
+        self.originais = {}
+        for termo in termos:
+            termo = termo.strip()
+            if not termo:
+                continue
+            processado = dobrar(termo) if ignorar_acentos else termo.lower()
+            self.originais.setdefault(processado, termo)
+
+        self._transicoes = [{}]
+        self._falha = [0]
+        self._saidas = [[]]
+        for processado in self.originais:
+            self._inserir(processado)
+        self._ligar_falhas()
+
+    def __len__(self):
+        return len(self.originais)
+
+    def _inserir(self, termo):
+        estado = 0
+        for c in termo:
+            proximo = self._transicoes[estado].get(c)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saidas.append([])
+                self._transicoes[estado][c] = proximo
+            estado = proximo
+        self._saidas[estado].append(termo)
+
+    def _ligar_falhas(self):
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for c, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and c not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                destino = self._transicoes[falha].get(c, 0)
+                self._falha[proximo] = destino if destino != proximo else 0
+                # Herda as saídas do estado de falha (termos que são sufixo deste)
+                self._saidas[proximo] = self._saidas[proximo] + self._saidas[self._falha[proximo]]
+
+    def _limite_ok(self, texto, inicio, fim):
+        """Equivalente ao \\b nas duas pontas do termo encontrado em texto[inicio:fim]."""
+        antes = texto[inicio - 1] if inicio > 0 else ""
+        depois = texto[fim] if fim < len(texto) else ""
+        borda_inicio = _caractere_de_palavra(texto[inicio]) != (bool(antes) and _caractere_de_palavra(antes))
+        borda_fim = _caractere_de_palavra(texto[fim - 1]) != (bool(depois) and _caractere_de_palavra(depois))
+        return borda_inicio and borda_fim
+
+    def ocorrencias(self, texto):
+        """Gera (inicio, fim, termo_processado) para cada ocorrência, em uma única passada."""
+        transicoes = self._transicoes
+        falha = self._falha
+        saidas = self._saidas
+        estado = 0
+        for posicao, c in enumerate(texto):
+            while estado and c not in transicoes[estado]:
+                estado = falha[estado]
+            estado = transicoes[estado].get(c, 0)
+            for termo in saidas[estado]:
+                inicio = posicao - len(termo) + 1
+                if not self.palavra_inteira or self._limite_ok(texto, inicio, posicao + 1):
+                    yield inicio, posicao + 1, termo
+
+    def termos_encontrados(self, texto):
+        """Termos (como digitados) que aparecem no texto, na ordem da primeira ocorrência."""
+        encontrados = {}
+        for _, _, termo in self.ocorrencias(texto):
+            encontrados.setdefault(self.originais[termo], None)
+        return list(encontrados)
@@ -0,0 +1,79 @@
+import unicodedata
+from bisect import bisect_right
+
+
+def _sem_acentos(c):
+    return "".join(d for d in unicodedata.normalize('NFKD', c) if not unicodedata.combining(d))
+
+
+class _Tabela(dict):
+    """
+    Tabela de `str.translate` preenchida sob demanda: cada caractere é normalizado
+    uma única vez por processo e daí em diante a troca é feita em C.
+    """
+
+    def __init__(self, funcao):
+        super().__init__()
+        self._funcao = funcao
+
+    def __missing__(self, codigo):
+        self[codigo] = self._funcao(chr(codigo))
+        return self[codigo]
+
+
+_SEM_ACENTOS = _Tabela(_sem_acentos)
+_DOBRA = _Tabela(lambda c: _sem_acentos(c.lower()))
+
+
+def remover_acentos(texto):
+    if not texto: return ""
+    if texto.isascii(): return texto
+    return texto.translate(_SEM_ACENTOS)
+
+
+def dobrar(texto):
+    """Forma usada nas buscas "ignorando acentos": minúsculas e sem acentos."""
+    if texto.isascii(): return texto.lower()
+    return texto.translate(_DOBRA)
+
+
+def dobrar_com_mapa(texto):
+    """
+    (dobrado, mapa): o texto como em `dobrar` e o mapa de volta às posições do original.
+
+    Quase todo caractere vira exatamente um; o mapa só guarda os pontos em que isso
+    deixa de valer (acento solto que some, "ﬁ" que vira "fi"...), como uma lista de
+    (posicao_dobrada, deslocamento). Vazio quando as posições coincidem.
+    """
+    dobrado = dobrar(texto)
+    if texto.isascii() or all(len(_DOBRA[ord(c)]) == 1 for c in set(texto)):
+        return dobrado, []
+
+    mapa = []
+
+    def marcar(posicao, deslocamento):
+        atual = mapa[-1][1] if mapa else 0
+        if mapa and mapa[-1][0] == posicao:
+            mapa.pop()
+            atual = mapa[-1][1] if mapa else 0
+        if deslocamento != atual:
+            mapa.append((posicao, deslocamento))
+
+    posicao = 0
+    for indice, c in enumerate(texto):
+        tamanho = len(_DOBRA[ord(c)])
+        if tamanho != 1:
+            # Todos os caracteres gerados apontam para o original; o seguinte volta a andar junto
+            for k in range(tamanho):
+                marcar(posicao + k, indice - posicao - k)
+            marcar(posicao + tamanho, indice + 1 - posicao - tamanho)
+        posicao += tamanho
+    return dobrado, mapa
+
+
+def posicao_original(mapa, posicao):
+    """Posição no texto original do caractere `posicao` do texto dobrado (veja `dobrar_com_mapa`)."""
+    if not mapa:
+        return posicao
+    ponto = bisect_right(mapa, (posicao, float("inf"))) - 1
+    return posicao + (mapa[ponto][1] if ponto >= 0 else 0)
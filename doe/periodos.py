@@ -0,0 +1,16 @@
+"""Períodos de dias: o que ainda falta fazer num intervalo de datas."""
+from datetime import date
+
+
+def faixas_pendentes(data_inicio, data_fim, concluidos):
+    """Intervalos (inicio, fim) de dias seguidos do período que ainda não foram concluídos."""
+    faixas = []
+    for ordinal in range(data_inicio.toordinal(), data_fim.toordinal() + 1):
+        dia = date.fromordinal(ordinal)
+        if dia in concluidos:
+            continue
+        if faixas and faixas[-1][1].toordinal() == ordinal - 1:
+            faixas[-1] = (faixas[-1][0], dia)
+        else:
+            faixas.append((dia, dia))
+    return faixas
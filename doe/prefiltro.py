@@ -0,0 +1,124 @@
+"""
+Pré-filtro de páginas: descarta, antes da extração completa, as páginas que com
+certeza não contêm nenhum dos termos procurados.
+
+O texto "bruto" da página sai direto dos operadores de texto (Tj, TJ, ', ") do
+fluxo de conteúdo, sem posicionar nada. Só dá para confiar nele quando todas as
+fontes da página usam uma codificação simples (WinAnsi/MacRoman, sem tabelas
+próprias); em qualquer outro caso a página é tratada como candidata.
+"""
+import re
+
+from doe.normalizacao import dobrar
+
+# Codificações de fonte que dá para ler sem a tabela da própria fonte
+_CODIFICACOES = {"/WinAnsiEncoding": "cp1252", "/MacRomanEncoding": "mac_roman"}
+
+# Dentro do fluxo de conteúdo, só interessam as strings: (literais) e <hexadecimais>.
+# Estes são os únicos pedaços que mudam o sentido dos bytes em volta.
+_TOKEN = re.compile(rb"\\(?:[0-7]{1,3}|\r\n|.)|[()]|<[0-9A-Fa-f\s]*>", re.DOTALL)
+_ESCAPES_SIMPLES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+_ESPACOS = re.compile(r"\s+")
+
+
+def _compactar(texto):
+    """Minúsculo, sem acentos e sem espaço nenhum (a extração decide onde eles ficam)."""
+    return _ESPACOS.sub("", dobrar(texto))
+
+
+def _desfazer_escape(sequencia):
+    if sequencia[:1].isdigit():
+        return bytes([int(sequencia, 8) & 0xFF])
+    if sequencia in (b"\n", b"\r", b"\r\n"):
+        return b""  # Continuação de linha
+    return _ESCAPES_SIMPLES.get(sequencia, sequencia)
+
+
+def _strings(dados):
+    """Bytes de cada string do fluxo, na ordem; parênteses aninhados e escapes resolvidos."""
+    strings = []
+    atual = []
+    profundidade = 0
+    pos = 0
+    for token in _TOKEN.finditer(dados):
+        trecho = token.group()
+        if profundidade == 0:
+            if trecho == b"(":
+                profundidade, atual, pos = 1, [], token.end()
+            elif trecho[:1] == b"<":
+                digitos = re.sub(rb"\s", b"", trecho[1:-1])
+                strings.append(bytes.fromhex((digitos + b"0" * (len(digitos) % 2)).decode("ascii")))
+            continue
+
+        atual.append(dados[pos:token.start()])
+        pos = token.end()
+        if trecho[:1] == b"\\":
+            atual.append(_desfazer_escape(trecho[1:]))
+        elif trecho == b")":
+            profundidade -= 1
+            if profundidade == 0:
+                strings.append(b"".join(atual))
+            else:
+                atual.append(trecho)
+        else:
+            if trecho == b"(":
+                profundidade += 1
+            atual.append(trecho)
+    return strings
+
+
+def _codificacao(pagina):
+    """Codificação única das fontes da página, ou None se alguma não for simples."""
+    recursos = pagina.get("/Resources")
+    recursos = recursos.get_object() if recursos is not None else {}
+    # Textos dentro de formulários (XObject) não aparecem no fluxo da página
+    for xobjeto in (recursos.get("/XObject") or {}).values():
+        if xobjeto.get_object().get("/Subtype") == "/Form":
+            return None
+
+    codificacoes = set()
+    for fonte in (recursos.get("/Font") or {}).values():
+        fonte = fonte.get_object()
+        codificacao = fonte.get("/Encoding")
+        if (fonte.get("/Subtype") not in ("/Type1", "/TrueType") or "/ToUnicode" in fonte
+                or codificacao not in _CODIFICACOES):
+            return None
+        codificacoes.add(_CODIFICACOES[codificacao])
+    return codificacoes.pop() if len(codificacoes) == 1 else None
+
+
+def texto_bruto(pagina):
+    """Texto dos operadores de texto de uma página do pypdf, ou None se não der para confiar nele."""
+    codificacao = _codificacao(pagina)
+    if codificacao is None:
+        return None
+    conteudo = pagina.get_contents()
+    if conteudo is None:
+        return ""
+    dados = conteudo.get_data()
+    if b"BI" in dados and re.search(rb"\bBI\b", dados):
+        return None  # Imagem embutida: bytes binários podem parecer strings
+
+    return "".join(string.decode(codificacao, errors="replace") for string in _strings(dados))
+
+
+class FiltroTermos:
+    """
+    Diz se uma página pode conter algum dos termos. É "picklable", para rodar
+    dentro dos processos de extração.
+    """
+
+    def __init__(self, termos):
+        self.termos = [_compactar(t) for t in termos if t and _compactar(t)]
+
+    def pode_conter(self, pagina):
+        if not self.termos:
+            return True
+        try:
+            texto = texto_bruto(pagina)
+        except Exception:
+            return True
+        if texto is None:
+            return True
+        compacto = _compactar(texto)
+        return any(termo in compacto for termo in self.termos)
@@ -0,0 +1,61 @@
+"""
+Andamento de laços longos entregue a um ritmo fixo, não a cada volta do laço.
+
+O laço informa tudo ao `RelatorProgresso` (que só junta os valores, sem travas nem
+chamadas à interface) e ele repassa o acumulado a quem exibe no máximo
+`config.ATUALIZACOES_POR_SEGUNDO` vezes por segundo. Assim a velocidade da
+varredura não depende de quantas vezes a tela é atualizada.
+"""
+import time
+
+from doe import config
+
+
+class RelatorProgresso:
+    """
+    Junta o andamento e chama publicar(somas, valores, itens) no ritmo combinado:
+    `somas` são os incrementos desde a última entrega, `valores` os últimos valores
+    definidos e `itens` o que foi acrescentado. Como gerenciador de contexto,
+    entrega o que sobrou ao sair do bloco (inclusive por exceção).
+    """
+
+    def __init__(self, publicar, por_segundo=None):
+        self._publicar = publicar
+        self.intervalo = 1 / (por_segundo or config.ATUALIZACOES_POR_SEGUNDO)
+        self._proxima = 0.0  # A primeira informação sai na hora
+        self._somas = {}
+        self._valores = {}
+        self._itens = []
+
+    def somar(self, **valores):
+        for nome, valor in valores.items():
+            self._somas[nome] = self._somas.get(nome, 0) + valor
+        self._talvez_entregar()
+
+    def definir(self, **valores):
+        self._valores.update(valores)
+        self._talvez_entregar()
+
+    def acrescentar(self, itens):
+        self._itens.extend(itens)
+        self._talvez_entregar()
+
+    def _talvez_entregar(self):
+        agora = time.monotonic()
+        if agora >= self._proxima:
+            self.entregar(agora)
+
+    def entregar(self, agora=None):
+        """Repassa agora o que estiver acumulado, sem esperar o próximo intervalo."""
+        if self._somas or self._valores or self._itens:
+            somas, valores, itens = self._somas, self._valores, self._itens
+            self._somas, self._valores, self._itens = {}, {}, []
+            self._publicar(somas, valores, itens)
+        self._proxima = (agora or time.monotonic()) + self.intervalo
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.entregar()
+        return False
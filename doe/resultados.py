@@ -0,0 +1,299 @@
+"""
+Aditivos extraídos, guardados em Parquet particionado por mês (mes=AAAAMM).
+
+Cada caderno vira um arquivo próprio, regravado por inteiro quando o caderno é
+lido de novo. A leitura só abre os meses do período pedido e só as colunas pedidas.
+Cada mês também tem um resumo (total e somas por órgão/contratado) em _resumos/,
+refeito na primeira leitura depois que algum caderno do mês muda (e não a cada
+caderno gravado), para o painel não precisar das linhas. O resumo guarda a lista
+dos arquivos de que saiu (nome, tamanho, data e inode); se ela não bate com a da
+pasta, ele é refeito.
+
+Órgãos e contratados são somados pelo identificador da entidade (doe.entidades),
+não pelo nome como veio no extrato; o dicionário de entidades (_entidades.db)
+diz em quais cadernos cada uma aparece, para as consultas por CNPJ/CPF.
+"""
+import json
+import os
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from doe import config
+from doe.entidades import COLUNAS_DOCUMENTO, COLUNAS_ID, DicionarioEntidades, documento_do_id, id_por_nome
+
+_CATEGORIA = pa.dictionary(pa.int32(), pa.string())
+
+ESQUEMA = pa.schema([
+    ("Data", pa.date32()),
+    ("Parte", pa.int16()),
+    ("Órgão", _CATEGORIA),
+    ("Contratado(a)", _CATEGORIA),
+    ("Tipo", _CATEGORIA),
+    ("Valor Float", pa.float64()),
+    ("Objeto", pa.string()),
+    ("Link", pa.string()),
+    ("ID Órgão", _CATEGORIA),
+    ("CNPJ/CPF Órgão", _CATEGORIA),
+    ("ID Contratado(a)", _CATEGORIA),
+    ("CNPJ/CPF Contratado(a)", _CATEGORIA),
+])
+
+# Dimensões dos resumos mensais
+TOTAL = "Total"
+DIMENSOES = ("Órgão", "Contratado(a)")
+
+# Sobe quando o formato dos resumos muda: os antigos ficam de lado e são refeitos
+VERSAO_RESUMO = 2
+
+_ESQUEMA_RESUMO = pa.schema([
+    ("dimensao", pa.string()),
+    ("chave", pa.string()),
+    ("nome", pa.string()),
+    ("valor", pa.float64()),
+    ("quantidade", pa.int64()),
+])
+
+# Chave, nos metadados do Parquet do resumo, da lista de arquivos de que ele saiu
+_CHAVE_ENTRADAS = b"doe.entradas"
+
+_COLUNAS_RESUMO = ["Data", *DIMENSOES, *(COLUNAS_ID[d] for d in DIMENSOES), "Valor Float"]
+
+_PARTICAO = ds.partitioning(pa.schema([("mes", pa.int32())]), flavor="hive")
+
+
+def _mes(data):
+    return data.year * 100 + data.month
+
+
+def _primeiro_dia(mes):
+    return date(mes // 100, mes % 100, 1)
+
+
+def _ultimo_dia(mes):
+    proximo = _primeiro_dia(mes) + timedelta(days=31)
+    return proximo.replace(day=1) - timedelta(days=1)
+
+
+def _meses(data_inicio, data_fim):
+    mes, ultimo = _mes(data_inicio), _mes(data_fim)
+    while mes <= ultimo:
+        yield mes
+        mes = mes + 1 if mes % 100 < 12 else (mes // 100 + 1) * 100 + 1
+
+
+def _ids(df, dimensao):
+    """Identificador da entidade de cada linha; as gravadas antes dos identificadores usam o do nome."""
+    coluna = COLUNAS_ID[dimensao]
+    ids = df[coluna].astype(object) if coluna in df.columns else pd.Series(None, index=df.index, dtype=object)
+    faltando = ids.isna() | (ids == "")
+    if faltando.any():
+        ids = ids.where(~faltando, df[dimensao].astype(str).map(id_por_nome))
+    return ids
+
+
+def _resumir(df):
+    """
+    Linhas (dimensao, chave, nome, valor, quantidade): o total do período na chave
+    "AAAAMM" e as somas por órgão e por contratado, só dos aditivos com valor (como
+    no painel). Nas dimensões a chave é o identificador da entidade e o nome é a
+    grafia mais frequente dela no período.
+    """
+    partes = []
+    if not df.empty:
+        mensal = df.groupby(df["Data"].map(_mes))["Valor Float"].agg(["sum", "count"])
+        partes.append(pd.DataFrame({
+            "dimensao": TOTAL, "chave": mensal.index.astype(str), "nome": "",
+            "valor": mensal["sum"].values, "quantidade": mensal["count"].values,
+        }))
+        com_valor = df[df["Valor Float"] > 0]
+        for dimensao in DIMENSOES:
+            ids = _ids(com_valor, dimensao)
+            somas = com_valor.groupby(ids)["Valor Float"].agg(["sum", "count"])
+            grafias = com_valor.groupby([ids, com_valor[dimensao].astype(str)]).size()
+            nomes = grafias.groupby(level=0).idxmax().map(lambda chave_nome: chave_nome[1])
+            partes.append(pd.DataFrame({
+                "dimensao": dimensao, "chave": somas.index, "nome": nomes.reindex(somas.index).values,
+                "valor": somas["sum"].values, "quantidade": somas["count"].values,
+            }))
+    if not partes:
+        return _ESQUEMA_RESUMO.empty_table().to_pandas()
+    return pd.concat(partes, ignore_index=True)
+
+
+class ResultadosAditivos:
+    """Conjunto Parquet com os aditivos de todos os cadernos já lidos."""
+
+    def __init__(self, diretorio=None):
+        self.diretorio = diretorio or os.path.join(config.DIR_DADOS, "aditivos")
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.entidades = DicionarioEntidades(os.path.join(self.diretorio, "_entidades.db"))
+
+    def _arquivo(self, data, parte):
+        return os.path.join(self.diretorio, f"mes={_mes(data)}", f"{data.strftime('%Y%m%d')}p{parte:02d}.parquet")
+
+    def gravar_caderno(self, data, parte, aditivos):
+        """Troca os aditivos do caderno pelos informados (dicts de `extrair_dados_pagina`)."""
+        tabela = pa.Table.from_pydict({
+            "Data": [data] * len(aditivos),
+            "Parte": [parte] * len(aditivos),
+            "Órgão": [a["Órgão"] for a in aditivos],
+            "Contratado(a)": [a["Contratado(a)"] for a in aditivos],
+            "Tipo": [a["Tipo"] for a in aditivos],
+            "Valor Float": [a["Valor Float"] for a in aditivos],
+            "Objeto": [a["Objeto"] for a in aditivos],
+            "Link": [a["Link"] for a in aditivos],
+            **{coluna: [a.get(coluna, "") for a in aditivos] for coluna in (*COLUNAS_ID.values(), *COLUNAS_DOCUMENTO.values())},
+        }, schema=ESQUEMA)
+
+        arquivo = self._arquivo(data, parte)
+        self._gravar(tabela, arquivo)
+        self.entidades.registrar_caderno(data, parte, aditivos)
+
+    def _gravar(self, tabela, arquivo):
+        # Começa com ".": a leitura ignora o arquivo enquanto ele é gravado
+        pasta, nome = os.path.split(arquivo)
+        os.makedirs(pasta, exist_ok=True)
+        temporario = os.path.join(pasta, f".{nome}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            pq.write_table(tabela, temporario)
+            os.replace(temporario, arquivo)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def carregar(self, data_inicio, data_fim, colunas=None, entidade=None):
+        """
+        DataFrame com os aditivos publicados entre as datas, em ordem de data e caderno.
+        As colunas de texto repetitivo (Órgão, Contratado(a), Tipo) vêm como categorias.
+
+        Com `entidade` (identificador de doe.entidades, ex.: o de `entidades.procurar`),
+        só os aditivos em que ela é contratante ou contratada; o dicionário aponta os
+        cadernos e só eles são abertos.
+        """
+        colunas = colunas or ESQUEMA.names
+        filtro = (ds.field("Data") >= data_inicio) & (ds.field("Data") <= data_fim)
+        if entidade is None:
+            dataset = ds.dataset(
+                self.diretorio, schema=ESQUEMA.append(pa.field("mes", pa.int32())),
+                format="parquet", partitioning=_PARTICAO,
+                exclude_invalid_files=False, ignore_prefixes=[".", "_"]
+            )
+            filtro &= (ds.field("mes") >= _mes(data_inicio)) & (ds.field("mes") <= _mes(data_fim))
+        else:
+            arquivos = [self._arquivo(data, parte) for data, parte in self.entidades.cadernos(entidade, data_inicio, data_fim)]
+            dataset = ds.dataset([a for a in arquivos if os.path.exists(a)], schema=ESQUEMA, format="parquet")
+            ids = pa.array(sorted(self.entidades.equivalentes(entidade)))
+            filtro &= ds.field(COLUNAS_ID["Órgão"]).isin(ids) | ds.field(COLUNAS_ID["Contratado(a)"]).isin(ids)
+        df = dataset.to_table(columns=colunas, filter=filtro).to_pandas()
+
+        for coluna in df.columns:
+            if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+                # Ordem alfabética, para a ordenação da tabela continuar a mesma
+                df[coluna] = df[coluna].cat.reorder_categories(sorted(df[coluna].cat.categories))
+        if "Data" in df.columns:
+            ordem = [c for c in ("Data", "Parte") if c in df.columns]
+            df = df.sort_values(ordem, kind="stable", ignore_index=True)
+        return df
+
+
+    # --- RESUMOS MENSAIS ---
+
+    def _arquivo_resumo(self, mes):
+        return os.path.join(self.diretorio, "_resumos", f"{mes}.v{VERSAO_RESUMO}.parquet")
+
+    def _entradas_do_mes(self, mes):
+        """[nome, tamanho, mtime_ns, inode] de cada caderno gravado do mês, em ordem de nome."""
+        pasta = os.path.join(self.diretorio, f"mes={mes}")
+        entradas = []
+        for entrada in os.scandir(pasta):
+            if entrada.name.endswith(".parquet") and not entrada.name.startswith((".", "_")):
+                info = entrada.stat()
+                entradas.append([entrada.name, info.st_size, info.st_mtime_ns, info.st_ino])
+        return sorted(entradas)
+
+    def _refazer_resumo(self, mes, entradas):
+        # `entradas` é lida antes das linhas: um caderno gravado no meio deixa o resumo já desatualizado
+        primeiro = _primeiro_dia(mes)
+        df = self.carregar(primeiro, _ultimo_dia(mes), colunas=_COLUNAS_RESUMO)
+        esquema = _ESQUEMA_RESUMO.with_metadata({_CHAVE_ENTRADAS: json.dumps(entradas)})
+        tabela = pa.Table.from_pandas(_resumir(df), schema=esquema, preserve_index=False)
+        self._gravar(tabela, self._arquivo_resumo(mes))
+
+    def _resumo_do_mes(self, mes):
+        """Resumo gravado do mês, refeito antes se os cadernos do mês não forem os de quando ele foi feito."""
+        arquivo = self._arquivo_resumo(mes)
+        if not os.path.isdir(os.path.join(self.diretorio, f"mes={mes}")):
+            return None
+        entradas = self._entradas_do_mes(mes)
+        gravadas = None
+        if os.path.exists(arquivo):
+            metadados = pq.read_schema(arquivo).metadata or {}
+            gravadas = json.loads(metadados[_CHAVE_ENTRADAS]) if _CHAVE_ENTRADAS in metadados else None
+        if gravadas != entradas:
+            self._refazer_resumo(mes, entradas)
+        return pq.read_table(arquivo).to_pandas()
+
+    def resumo(self, data_inicio, data_fim):
+        """
+        Somas do período: (mensal, por_dimensao).
+
+        `mensal` tem uma linha por mês com aditivos (mes AAAAMM, valor, quantidade);
+        `por_dimensao` é {"Órgão": Series, "Contratado(a)": Series} com a soma dos
+        valores por entidade, indexada pelo nome mais usado dela (com o CNPJ/CPF,
+        quando houver). Meses inteiros vêm dos resumos gravados; só os meses
+        cortados pelo período são somados a partir das linhas.
+        """
+        pedacos = []
+        for mes in _meses(data_inicio, data_fim):
+            primeiro, ultimo = _primeiro_dia(mes), _ultimo_dia(mes)
+            if primeiro >= data_inicio and ultimo <= data_fim:
+                resumo_mes = self._resumo_do_mes(mes)
+            else:
+                df = self.carregar(max(primeiro, data_inicio), min(ultimo, data_fim), colunas=_COLUNAS_RESUMO)
+                resumo_mes = _resumir(df)
+            if resumo_mes is not None and not resumo_mes.empty:
+                pedacos.append(resumo_mes)
+
+        todos = pd.concat(pedacos, ignore_index=True) if pedacos else _ESQUEMA_RESUMO.empty_table().to_pandas()
+
+        mensal = todos[todos["dimensao"] == TOTAL]
+        mensal = pd.DataFrame({
+            "mes": mensal["chave"].astype(int).values,
+            "valor": mensal["valor"].values,
+            "quantidade": mensal["quantidade"].values,
+        }).sort_values("mes", ignore_index=True)
+
+        por_dimensao = {dimensao: self._somar_entidades(todos[todos["dimensao"] == dimensao], dimensao) for dimensao in DIMENSOES}
+        return mensal, por_dimensao
+
+    def _somar_entidades(self, linhas, dimensao):
+        """Soma por entidade (já resolvida no dicionário) e troca o identificador pelo rótulo dela."""
+        finais = self.entidades.resolver(linhas["chave"])
+        linhas = linhas.assign(chave=linhas["chave"].map(lambda chave: finais.get(chave, chave)))
+        somas = linhas.groupby("chave")["valor"].sum()
+        grafias = linhas.groupby(["chave", "nome"])["quantidade"].sum()
+        nomes = grafias.groupby(level=0).idxmax().map(lambda chave_nome: chave_nome[1]) if not grafias.empty else grafias
+        rotulos = [
+            f"{nomes.get(chave, '')} ({documento_do_id(chave)})" if documento_do_id(chave) else nomes.get(chave, "")
+            for chave in somas.index
+        ]
+        return pd.Series(somas.values, index=pd.Index(rotulos, name=dimensao), name="valor").groupby(level=0).sum()
+
+
+# --- INSTÂNCIA COMPARTILHADA ---
+
+_resultados_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_resultados():
+    global _resultados_padrao
+    with _lock_padrao:
+        if _resultados_padrao is None:
+            _resultados_padrao = ResultadosAditivos()
+        return _resultados_padrao
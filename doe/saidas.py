@@ -0,0 +1,144 @@
+"""
+Saídas da linha de comando em lote: CSV (;), JSONL ou Parquet, gravados dia a dia.
+
+Cada dia só conta como concluído depois que todas as suas linhas estão no disco,
+e é isso que permite continuar uma varredura interrompida (`continuar=True`):
+os dias concluídos são pulados e o que tiver sido gravado pela metade é descartado.
+"""
+import csv
+import json
+import os
+import sys
+from datetime import date
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+FORMATOS = ("csv", "jsonl", "parquet")
+
+
+def formato_do_arquivo(caminho):
+    """Formato pela extensão do arquivo (CSV quando não der para saber)."""
+    extensao = os.path.splitext(caminho or "")[1].lower().lstrip(".")
+    if extensao in ("json", "ndjson"):
+        return "jsonl"
+    return extensao if extensao in FORMATOS else "csv"
+
+
+class SaidaTexto:
+    """
+    CSV ou JSONL num arquivo só (ou na saída padrão, sem retomada). Ao lado do
+    arquivo, <arquivo>.progresso guarda uma linha por dia concluído com o tamanho
+    que o arquivo tinha naquele momento; ao continuar, o arquivo volta a esse tamanho.
+    """
+
+    def __init__(self, caminho, formato, colunas, continuar=False):
+        self.formato = formato
+        self.colunas = colunas
+        self.caminho = caminho
+        self.concluidos = set()
+
+        if caminho is None:
+            self._arquivo = sys.stdout
+            self._progresso = None
+            self._cabecalho = True
+        else:
+            arquivo_progresso = f"{caminho}.progresso"
+            tamanho = 0
+            if continuar and os.path.exists(caminho) and not os.path.exists(arquivo_progresso):
+                # Sem registro de progresso não há como saber o que do arquivo vale: ele fica como está
+                raise FileExistsError(f"{caminho} já existe, mas sem {arquivo_progresso}: não dá para continuar; apague o arquivo")
+            if continuar and os.path.exists(arquivo_progresso):
+                fim_registros = 0
+                with open(arquivo_progresso, "rb") as f:
+                    for linha in f:
+                        try:
+                            registro = json.loads(linha) if linha.endswith(b"\n") else None
+                        except ValueError:
+                            registro = None
+                        if registro is None:
+                            break  # Linha cortada no meio: o dia dela não terminou
+                        self.concluidos.add(date.fromisoformat(registro["data"]))
+                        tamanho = registro["bytes"]
+                        fim_registros += len(linha)
+                # O que vier depois da última linha inteira sai, para os próximos dias não colarem nele
+                with open(arquivo_progresso, "r+b") as f:
+                    f.truncate(fim_registros)
+            elif not continuar and (os.path.exists(arquivo_progresso) or os.path.exists(caminho)):
+                raise FileExistsError(f"{caminho} já existe: use --continuar para retomar ou apague o arquivo")
+
+            # Volta ao fim do último dia concluído; o que veio depois dele é refeito
+            modo = "r+b" if tamanho else "wb"
+            with open(caminho, modo) as f:
+                f.truncate(tamanho)
+            # O CSV novo começa com BOM, como o aditivos.csv do app, para o Excel reconhecer o UTF-8
+            bom = formato == "csv" and not tamanho
+            self._arquivo = open(caminho, "a", encoding="utf-8-sig" if bom else "utf-8", newline="")
+            self._progresso = open(arquivo_progresso, "w" if not tamanho else "a", encoding="utf-8")
+            self._cabecalho = not tamanho
+
+        if self.formato == "csv":
+            self._csv = csv.DictWriter(self._arquivo, fieldnames=colunas, delimiter=";",
+                                       lineterminator="\n", extrasaction="ignore")
+            if self._cabecalho:
+                self._csv.writeheader()
+
+    def gravar_dia(self, data, linhas):
+        for linha in linhas:
+            if self.formato == "csv":
+                self._csv.writerow(linha)
+            else:
+                self._arquivo.write(json.dumps({c: linha.get(c) for c in self.colunas}, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        if self._progresso is None:
+            return
+        os.fsync(self._arquivo.fileno())
+        self._progresso.write(json.dumps({"data": data.isoformat(), "bytes": os.path.getsize(self.caminho)}) + "\n")
+        self._progresso.flush()
+        self.concluidos.add(data)
+
+    def fechar(self):
+        if self._progresso is not None:
+            self._progresso.close()
+            self._arquivo.close()
+
+
+class SaidaParquet:
+    """
+    Pasta com um Parquet por dia (AAAAMMDD.parquet), legível de uma vez como
+    conjunto (pandas.read_parquet/pyarrow.dataset). Os dias sem resultado também
+    ganham um arquivo, vazio, para constarem como concluídos.
+    """
+
+    def __init__(self, caminho, colunas, tipos=None, continuar=False):
+        if caminho is None:
+            raise ValueError("a saída em Parquet precisa de --saida (uma pasta)")
+        self.caminho = caminho
+        self.colunas = colunas
+        self.esquema = pa.schema([(c, (tipos or {}).get(c, pa.string())) for c in colunas])
+
+        existentes = [nome for nome in os.listdir(caminho) if nome.endswith(".parquet")] if os.path.isdir(caminho) else []
+        if existentes and not continuar:
+            raise FileExistsError(f"{caminho} já tem resultados: use --continuar para retomar ou apague a pasta")
+        os.makedirs(caminho, exist_ok=True)
+        self.concluidos = {date(int(n[:4]), int(n[4:6]), int(n[6:8])) for n in existentes if n[:8].isdigit()}
+
+    def gravar_dia(self, data, linhas):
+        tabela = pa.Table.from_pylist([{c: linha.get(c) for c in self.colunas} for linha in linhas], schema=self.esquema)
+        arquivo = os.path.join(self.caminho, f"{data:%Y%m%d}.parquet")
+        # Começa com ".": quem lê a pasta ignora o arquivo enquanto ele é gravado
+        temporario = os.path.join(self.caminho, f".{data:%Y%m%d}.{os.getpid()}.tmp")
+        pq.write_table(tabela, temporario)
+        os.replace(temporario, arquivo)
+        self.concluidos.add(data)
+
+    def fechar(self):
+        pass
+
+
+def abrir_saida(caminho, formato, colunas, tipos=None, continuar=False):
+    """Saída do formato pedido (ou o da extensão de `caminho`); sem caminho, CSV/JSONL vão para a saída padrão."""
+    formato = formato or formato_do_arquivo(caminho)
+    if formato == "parquet":
+        return SaidaParquet(caminho, colunas, tipos, continuar)
+    return SaidaTexto(caminho, formato, colunas, continuar)
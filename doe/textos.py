@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import threading
+import zlib
+
+from doe import config
+
+
+def _chave_data(data):
+    return data.strftime("%Y%m%d")
+
+
+class ArmazemTextos:
+    """
+    Texto já extraído de cada página, para que um PDF seja lido uma única vez.
+
+    Fica num SQLite com o texto comprimido (zlib), por data/parte/página e pelo
+    extrator usado. Um caderno só conta como guardado depois que todas as suas
+    páginas chegaram, e só vale para a mesma versão do extrator.
+    """
+
+    def __init__(self, caminho=None):
+        caminho = caminho or os.path.join(config.DIR_DADOS, "textos.db")
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS paginas (
+                data TEXT, parte INTEGER, extrator TEXT, pagina INTEGER, texto BLOB,
+                PRIMARY KEY (data, parte, extrator, pagina)
+            );
+            CREATE TABLE IF NOT EXISTS cadernos (
+                data TEXT, parte INTEGER, extrator TEXT, versao TEXT, paginas INTEGER,
+                PRIMARY KEY (data, parte, extrator)
+            );
+        """)
+
+    def tem(self, data, parte, extrator, versao):
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT versao FROM cadernos WHERE data = ? AND parte = ? AND extrator = ?",
+                (_chave_data(data), parte, extrator)
+            ).fetchone()
+        return bool(linha) and linha[0] == versao
+
+    def obter(self, data, parte, extrator, versao):
+        """Devolve a lista de textos das páginas do caderno, ou None se ele não estiver guardado."""
+        if not self.tem(data, parte, extrator, versao):
+            return None
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT texto FROM paginas WHERE data = ? AND parte = ? AND extrator = ? ORDER BY pagina",
+                (_chave_data(data), parte, extrator)
+            ).fetchall()
+        return [zlib.decompress(texto).decode("utf-8") for (texto,) in linhas]
+
+    def guardar_paginas(self, data, parte, extrator, paginas):
+        """Guarda [(indice_pagina, texto), ...]; o caderno ainda não fica marcado como completo."""
+        registros = [
+            (_chave_data(data), parte, extrator, indice, zlib.compress(texto.encode("utf-8")))
+            for indice, texto in paginas
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO paginas (data, parte, extrator, pagina, texto) VALUES (?, ?, ?, ?, ?)",
+                registros
+            )
+
+    def concluir_caderno(self, data, parte, extrator, versao, total_paginas):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cadernos (data, parte, extrator, versao, paginas) VALUES (?, ?, ?, ?, ?)",
+                (_chave_data(data), parte, extrator, versao, total_paginas)
+            )
+
+
+# --- INSTÂNCIA COMPARTILHADA ---
+
+_armazem_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_armazem():
+    global _armazem_padrao
+    with _lock_padrao:
+        if _armazem_padrao is None:
+            _armazem_padrao = ArmazemTextos()
+        return _armazem_padrao
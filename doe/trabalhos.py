@@ -0,0 +1,263 @@
+"""
+Varreduras longas em segundo plano, fora da execução do script do Streamlit.
+
+Cada varredura vira um `Trabalho` com identificador próprio, contadores de
+progresso e resultados parciais, que a interface consulta de tempos em tempos.
+Os trabalhos pertencem ao processo do servidor: continuam rodando quando a
+página é recarregada ou fechada e ficam disponíveis para quem voltar depois.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from doe import config
+from doe.aditivos import leitor_do_caderno
+from doe.consultas import chave_consulta, consultar_periodo
+from doe.extracao import EXTRATOR_LAYOUT, EXTRATOR_PYPDF, versao_extrator
+from doe.indice import indexar_periodo, obter_indice
+from doe.leitura import ler_periodo
+from doe.multitermos import AutomatoTermos
+from doe.progresso import RelatorProgresso
+from doe.resultados import obter_resultados
+from doe.textos import obter_armazem
+
+NA_FILA = "na fila"
+RODANDO = "rodando"
+CONCLUIDO = "concluído"
+CANCELADO = "cancelado"
+FALHOU = "falhou"
+
+ESTADOS_FINAIS = (CONCLUIDO, CANCELADO, FALHOU)
+
+
+class Cancelado(Exception):
+    pass
+
+
+class Trabalho:
+    """
+    Uma varredura enviada à fila. A função que roda o trabalho informa o andamento
+    por `somar`/`definir` e entrega resultados aos poucos por `acrescentar` (nos
+    laços por página, através de `relator()`, que junta tudo e repassa no ritmo
+    da tela); quem acompanha lê tudo por `progresso()` e `parciais()`, que devolvem cópias.
+    """
+
+    def __init__(self, tipo, descricao, parametros):
+        self.id = uuid.uuid4().hex[:12]
+        self.tipo = tipo
+        self.descricao = descricao
+        self.parametros = parametros
+        self.estado = NA_FILA
+        self.erro = None
+        self.resultado = None
+        self.criado = time.time()
+        self.iniciado = None
+        self.terminado = None
+
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._parciais = []
+        self._cancelar = threading.Event()
+
+    # --- LADO DE QUEM RODA ---
+
+    def somar(self, **valores):
+        with self._lock:
+            for nome, valor in valores.items():
+                self._contadores[nome] = self._contadores.get(nome, 0) + valor
+
+    def definir(self, **valores):
+        with self._lock:
+            self._contadores.update(valores)
+
+    def acrescentar(self, itens):
+        with self._lock:
+            self._parciais.extend(itens)
+
+    def relator(self):
+        """RelatorProgresso que repassa ao trabalho, de uma vez só, o que juntou no intervalo."""
+        return RelatorProgresso(self._receber)
+
+    def _receber(self, somas, valores, itens):
+        with self._lock:
+            for nome, valor in somas.items():
+                self._contadores[nome] = self._contadores.get(nome, 0) + valor
+            self._contadores.update(valores)
+            self._parciais.extend(itens)
+
+    def verificar(self):
+        """Interrompe o trabalho (levantando Cancelado) se alguém pediu o cancelamento."""
+        if self._cancelar.is_set():
+            raise Cancelado()
+
+    # --- LADO DE QUEM ACOMPANHA ---
+
+    @property
+    def ativo(self):
+        return self.estado not in ESTADOS_FINAIS
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    def progresso(self):
+        with self._lock:
+            return dict(self._contadores)
+
+    def parciais(self, desde=0):
+        with self._lock:
+            return self._parciais[desde:]
+
+    def quantidade_parciais(self):
+        with self._lock:
+            return len(self._parciais)
+
+
+class FilaTrabalhos:
+    """Pool de threads que roda os trabalhos e guarda os mais recentes para consulta."""
+
+    def __init__(self, simultaneos=None, max_guardados=50):
+        self.max_guardados = max_guardados
+        self._executor = ThreadPoolExecutor(
+            max_workers=simultaneos or config.TRABALHOS_SIMULTANEOS, thread_name_prefix="doe-trabalho"
+        )
+        self._lock = threading.Lock()
+        self._trabalhos = {}
+
+    def enviar(self, tipo, descricao, funcao, **parametros):
+        """Agenda funcao(trabalho, **parametros) e devolve o Trabalho na hora."""
+        trabalho = Trabalho(tipo, descricao, parametros)
+        with self._lock:
+            self._trabalhos[trabalho.id] = trabalho
+            self._descartar_antigos()
+        self._executor.submit(self._rodar, trabalho, funcao)
+        return trabalho
+
+    def _rodar(self, trabalho, funcao):
+        trabalho.iniciado = time.time()
+        trabalho.estado = RODANDO
+        try:
+            trabalho.verificar()
+            trabalho.resultado = funcao(trabalho, **trabalho.parametros)
+            trabalho.estado = CONCLUIDO
+        except Cancelado:
+            trabalho.estado = CANCELADO
+        except Exception as e:
+            trabalho.erro = e
+            trabalho.estado = FALHOU
+        finally:
+            trabalho.terminado = time.time()
+
+    def obter(self, id_trabalho):
+        with self._lock:
+            return self._trabalhos.get(id_trabalho)
+
+    def listar(self, tipo=None):
+        """Trabalhos guardados, do mais recente para o mais antigo."""
+        with self._lock:
+            trabalhos = [t for t in self._trabalhos.values() if tipo is None or t.tipo == tipo]
+        return sorted(trabalhos, key=lambda t: t.criado, reverse=True)
+
+    def _descartar_antigos(self):
+        terminados = sorted((t for t in self._trabalhos.values() if not t.ativo), key=lambda t: t.criado)
+        for trabalho in terminados[:max(0, len(self._trabalhos) - self.max_guardados)]:
+            del self._trabalhos[trabalho.id]
+
+
+# --- VARREDURAS ---
+
+def varrer_aditivos(trabalho, data_inicio, data_fim):
+    """
+    Lê os cadernos do período com o extrator de aditivos e grava cada caderno lido
+    por inteiro no Parquet (doe.resultados). Os aditivos encontrados são os resultados parciais.
+    """
+    resultados = obter_resultados()
+    armazem = obter_armazem()
+    versao = versao_extrator(EXTRATOR_LAYOUT)
+    trabalho.definir(dias=0, dias_totais=(data_fim - data_inicio).days + 1, paginas=0, palavras=0, aditivos=0)
+
+    periodo = ler_periodo(data_inicio, data_fim, extrator=EXTRATOR_LAYOUT, processador=leitor_do_caderno, timeout=10)
+    with trabalho.relator() as progresso:
+        for data, partes, erro, paginas in periodo:
+            trabalho.verificar()
+            progresso.definir(atual=f"Pesquisando dia {data:%d/%m/%Y}...")
+            if not partes and erro is None:
+                progresso.definir(aviso=f"Dia {data:%d/%m/%Y}: Arquivo não encontrado.")
+            elif partes:
+                progresso.definir(aviso=None)
+
+            aditivos_por_parte = {parte: [] for parte in partes}
+            for _, parte, i, texto, novos in paginas:
+                trabalho.verificar()
+                progresso.definir(atual=f"Dia {data:%d/%m/%Y} ➡️ Lendo do{data:%Y%m%d}p{parte:02d}.pdf (Pág {i + 1})")
+                progresso.somar(paginas=1, palavras=len(texto.split()), aditivos=len(novos or []))
+                if novos:
+                    aditivos_por_parte[parte].extend(novos)
+                    progresso.acrescentar(novos)
+
+            # Cada caderno lido por inteiro vai para o Parquet, substituindo o que houver dele;
+            # um caderno com páginas faltando deixaria o arquivo anterior incompleto
+            for parte, aditivos in aditivos_por_parte.items():
+                if armazem.tem(data, parte, EXTRATOR_LAYOUT, versao):
+                    resultados.gravar_caderno(data, parte, aditivos)
+                else:
+                    progresso.definir(aviso=f"Dia {data:%d/%m/%Y}: caderno {parte:02d} não foi lido por inteiro e não foi gravado.")
+            progresso.somar(dias=1)
+
+    return {"inicio": data_inicio, "fim": data_fim}
+
+
+def varrer_blocos(trabalho, data_inicio, data_fim, termos, todos=True, exata=False,
+                  ignorar_acentos=True, monitorados=(), aproximada=False):
+    """
+    Indexa o período e procura os termos dia a dia, como no 08_busca_doe_múltipla.py;
+    os dias que já estão no cache de consultas (doe.consultas) não voltam ao índice.
+    Com `monitorados`, usa a lista de monitoramento no lugar dos termos; com
+    `aproximada`, aceita erros de digitação (`IndiceBlocos.buscar_aproximada`). Os
+    blocos encontrados (no formato de `IndiceBlocos.buscar_monitorados`) são os parciais.
+    """
+    indice = obter_indice()
+    automato = AutomatoTermos(monitorados, ignorar_acentos) if monitorados else None
+    chave = chave_consulta(termos, todos, exata, ignorar_acentos, monitorados, aproximada,
+                           versao_extrator(EXTRATOR_PYPDF))
+    trabalho.definir(dias=0, dias_totais=(data_fim - data_inicio).days + 1, blocos=0)
+
+    def indexar(inicio, fim):
+        return indexar_periodo(inicio, fim, indice=indice, timeout=10)
+
+    def consultar(data):
+        if automato is not None:
+            return indice.buscar_monitorados(automato, data_inicio=data, data_fim=data)
+        if aproximada:
+            return indice.buscar_aproximada(list(termos), todos=todos, data_inicio=data, data_fim=data)
+        return [
+            bloco + (termos,) for bloco in indice.buscar(
+                list(termos), todos=todos, exata=exata, ignorar_acentos=ignorar_acentos,
+                data_inicio=data, data_fim=data
+            )
+        ]
+
+    # Dias já procurados (nesta ou em outra sessão) saem do cache de consultas
+    with trabalho.relator() as progresso:
+        for data, encontrados in consultar_periodo(chave, data_inicio, data_fim, indexar, consultar):
+            trabalho.verificar()
+            progresso.definir(atual=f"Lendo dia {data:%d/%m/%Y}...")
+            progresso.acrescentar(encontrados)
+            progresso.somar(dias=1, blocos=len(encontrados))
+
+    return trabalho.quantidade_parciais()
+
+
+# --- INSTÂNCIA COMPARTILHADA ---
+
+_fila_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def obter_fila():
+    """Fila única do processo: todas as sessões do Streamlit veem os mesmos trabalhos."""
+    global _fila_padrao
+    with _lock_padrao:
+        if _fila_padrao is None:
+            _fila_padrao = FilaTrabalhos()
+        return _fila_padrao
@@ -0,0 +1,39 @@
+"""
+O leitor de aditivos sem retrocesso (doe.aditivos) tem de devolver exatamente o
+mesmo que a versão original com regex (bench/aditivos_regex.py). A conferência
+longa continua em `python -m bench.conferir_aditivos`; aqui vai uma amostra fixa.
+"""
+import random
+
+import pytest
+
+from bench.aditivos_regex import extrair_dados_pagina_regex, sem_colunas_novas
+from bench.conferir_aditivos import pagina_aleatoria
+from doe.aditivos import extrair_dados_pagina
+
+SEMENTE = 3
+CASOS = 3000
+
+PAGINAS = [
+    "",
+    "EXTRATO DE ADITIVO\nCONTRATANTE: SECRETARIA DA SAÚDE\nCONTRATADO: EMPRESA XYZ LTDA\n"
+    "OBJETO: PRORROGAÇÃO DO PRAZO DE VIGÊNCIA\nVALOR: R$ 1.234.567,89\n*** *** ***",
+    "extrato do aditivo\ncontratante - DETRAN\ncontratada. CONSTRUTORA ÁGUA BOA S.A.\n"
+    "objeto: ACRÉSCIMO DE 25%\nDOTAÇÃO: 123\nEXTRATO DE ADITIVO\nCONTRATANTE: SEDUC\nII - nada",
+]
+
+
+def _conferir(texto):
+    novo = sem_colunas_novas(extrair_dados_pagina(texto, "01/01/2025", "x.pdf", 1, "http://x"))
+    assert novo == extrair_dados_pagina_regex(texto, "01/01/2025", "x.pdf", 1, "http://x"), texto
+
+
+@pytest.mark.parametrize("texto", PAGINAS)
+def test_paginas_conhecidas(texto):
+    _conferir(texto)
+
+
+def test_paginas_aleatorias():
+    sorteio = random.Random(SEMENTE)
+    for _ in range(CASOS):
+        _conferir(pagina_aleatoria(sorteio))
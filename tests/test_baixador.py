@@ -0,0 +1,79 @@
+"""
+Download de um caderno (doe.baixador.baixar_caderno) contra o servidor local de
+bench/servidor_local.py: retomada com Range depois de uma conexão cortada e
+recusa de arquivos que não são um PDF inteiro.
+"""
+import os
+from datetime import date
+
+import pytest
+
+from bench.servidor_local import ServidorLocal
+from doe import config
+from doe.baixador import TAMANHO_PEDACO, PDFInvalido, baixar_caderno
+from doe.cache import CachePDF
+from doe.metricas import obter_metricas
+
+DATA = date(2025, 1, 3)
+# Maior que alguns pedaços (TAMANHO_PEDACO): o corte no meio deixa um parcial para continuar
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * (5 * TAMANHO_PEDACO // 256) + b"\n%%EOF\n"
+
+
+def _fixture(diretorio, parte, conteudo):
+    pasta = os.path.join(diretorio, DATA.strftime("%Y%m%d"))
+    os.makedirs(pasta, exist_ok=True)
+    with open(os.path.join(pasta, f"do{DATA:%Y%m%d}p{parte:02d}.pdf"), "wb") as f:
+        f.write(conteudo)
+
+
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    """Sobe o servidor local (cortando a primeira resposta de cada arquivo) e devolve o diretório dos PDFs."""
+    fixtures = str(tmp_path / "fixtures")
+    os.makedirs(fixtures)
+    local = ServidorLocal(fixtures, cortar=True)
+    monkeypatch.setattr(config, "URL_BASE", local.iniciar())
+    monkeypatch.setattr(config, "ESPERA_INICIAL", 0)
+    monkeypatch.setattr(config, "TENTATIVAS_DOWNLOAD", 3)
+    yield fixtures
+    local.parar()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CachePDF(str(tmp_path / "cache"))
+
+
+def _contador(nome):
+    return obter_metricas().retrato()["contadores"].get(nome, 0)
+
+
+def test_retoma_download_cortado(servidor, cache):
+    _fixture(servidor, 1, PDF)
+    parciais = _contador("download.status.206")
+
+    caminho = baixar_caderno(DATA, 1, timeout=5, cache=cache)
+
+    with open(caminho, "rb") as f:
+        assert f.read() == PDF
+    # A segunda tentativa pediu só o resto do arquivo
+    assert _contador("download.status.206") == parciais + 1
+    assert not os.path.exists(cache.caminho_parcial(DATA, 1))
+
+
+def test_caderno_inexistente(servidor, cache):
+    assert baixar_caderno(DATA, 1, timeout=5, cache=cache) is None
+    assert cache.esta_ausente(DATA, 1)
+
+
+@pytest.mark.parametrize("conteudo", [
+    b"<html>manutencao</html>" * 100,
+    b"%PDF-1.4\n" + bytes(range(256)) * 400,
+])
+def test_recusa_arquivo_que_nao_e_pdf_inteiro(servidor, cache, conteudo):
+    _fixture(servidor, 1, conteudo)
+
+    with pytest.raises(PDFInvalido):
+        baixar_caderno(DATA, 1, timeout=5, cache=cache)
+    assert cache.caminho(DATA, 1) is None
+    assert not os.path.exists(cache.caminho_parcial(DATA, 1))
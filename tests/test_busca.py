@@ -0,0 +1,50 @@
+"""
+Regra das buscas e realce dos termos nos blocos (doe.busca).
+"""
+import pytest
+
+from doe.busca import bloco_corresponde, compilar_padroes, processar_termos, realcar_bloco, realcar_termo
+from doe.normalizacao import dobrar_com_mapa
+
+
+@pytest.mark.parametrize("termos, todos, exata, esperado", [
+    (["pregão", "licitação"], True, False, True),
+    (["pregão", "contrato"], True, False, False),
+    (["pregão", "contrato"], False, False, True),
+    (["licita"], True, False, True),
+    (["licita"], True, True, False),
+])
+def test_bloco_corresponde(termos, todos, exata, esperado):
+    bloco = "aviso de licitação: pregão eletrônico"
+    processados = processar_termos(termos)
+    padroes = compilar_padroes(processados) if exata else None
+    assert bloco_corresponde(dobrar_com_mapa(bloco)[0], processados, todos, padroes) is esperado
+
+
+def test_trechos_sobrepostos_viram_um_so():
+    linhas = realcar_bloco("Pregão eletrônico\n  nº 12 do PREGÃO", ["pregao", "gao ele", "eletronico"])
+    assert linhas == [":orange[**Pregão eletrônico**]", "nº 12 do :orange[**PREGÃO**]"]
+    assert realcar_bloco("aaaa", ["aa"]) == [":orange[**aaaa**]"]
+
+
+def test_trecho_que_atravessa_linhas_e_marcado_em_cada_uma():
+    assert realcar_bloco("aviso de licita-\n   ção nº 12", ["licita-\n   ção"]) == [
+        "aviso de :orange[**licita-**]", ":orange[**ção**] nº 12"
+    ]
+
+
+def test_realce_nas_posicoes_do_original():
+    # "ﬁ" vira dois caracteres na forma dobrada; o realce continua no lugar certo
+    assert realcar_bloco("ﬁm da licitação", ["fim", "licitacao"]) == [":orange[**ﬁm**] da :orange[**licitação**]"]
+    dobra = dobrar_com_mapa("ﬁm da licitação")
+    assert realcar_bloco("ﬁm da licitação", ["licitacao"], True, dobra) == ["ﬁm da :orange[**licitação**]"]
+
+
+def test_sem_ignorar_acentos_so_vale_a_grafia_exata():
+    assert realcar_bloco("Pregão eletrônico", ["pregão"], False) == [":orange[**Pregão**] eletrônico"]
+    assert realcar_bloco("Pregao eletrônico", ["pregão"], False) == ["Pregao eletrônico"]
+
+
+def test_realcar_termo():
+    assert realcar_termo("a lei municipal e a Lei", "lei") == "a :orange[**lei**] municipal e a :orange[**Lei**]"
+    assert realcar_termo("sem nada", "") == "sem nada"
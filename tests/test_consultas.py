@@ -0,0 +1,100 @@
+"""
+Cache de consultas (doe.consultas): aproveitamento dos dias já consultados em
+períodos que se sobrepõem, validade das entradas e descarte LRU pelo tamanho.
+"""
+from datetime import date, timedelta
+
+from doe import consultas
+from doe.consultas import CacheConsultas, chave_consulta, consultar_periodo, tamanho_aproximado
+
+
+def _dias(inicio, fim):
+    return [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+
+
+class _Indice:
+    """Faz o papel de indexar_periodo/IndiceBlocos e anota as faixas pedidas."""
+
+    def __init__(self, com_erro=()):
+        self.faixas = []
+        self.com_erro = set(com_erro)
+
+    def indexar(self, inicio, fim):
+        self.faixas.append((inicio, fim))
+        for dia in _dias(inicio, fim):
+            yield dia, [1], "falhou" if dia in self.com_erro else None
+
+    def consultar(self, data):
+        return [f"bloco de {data:%d/%m}"]
+
+
+def _consultar(cache, indice, inicio, fim, chave=("termos",)):
+    return list(consultar_periodo(chave, inicio, fim, indice.indexar, indice.consultar, cache=cache))
+
+
+def test_chave_ignora_acentos_caixa_e_ordem():
+    assert chave_consulta(["Licitação", "Pregão"]) == chave_consulta(["pregao", "licitacao", "pregao"])
+    assert chave_consulta(["licitação"], ignorar_acentos=False) != chave_consulta(["licitacao"], ignorar_acentos=False)
+    # Com um termo só, E e OU são a mesma busca
+    assert chave_consulta(["licitacao"], todos=False) == chave_consulta(["licitacao"], todos=True)
+
+
+def test_periodo_sobreposto_so_consulta_os_dias_que_faltam():
+    cache = CacheConsultas(limite_bytes=10 ** 6, ttl=3600)
+    indice = _Indice()
+    _consultar(cache, indice, date(2024, 3, 15), date(2024, 4, 15))
+
+    indice.faixas.clear()
+    resultados = _consultar(cache, indice, date(2024, 3, 1), date(2024, 3, 31))
+
+    assert indice.faixas == [(date(2024, 3, 1), date(2024, 3, 14))]
+    assert [data for data, _ in resultados] == _dias(date(2024, 3, 1), date(2024, 3, 31))
+    assert all(r == [f"bloco de {data:%d/%m}"] for data, r in resultados)
+
+
+def test_dias_com_erro_nao_ficam_guardados():
+    cache = CacheConsultas(limite_bytes=10 ** 6, ttl=3600)
+    indice = _Indice(com_erro=[date(2024, 3, 3)])
+    _consultar(cache, indice, date(2024, 3, 1), date(2024, 3, 5))
+
+    indice.faixas.clear()
+    _consultar(cache, indice, date(2024, 3, 1), date(2024, 3, 5))
+    assert indice.faixas == [(date(2024, 3, 3), date(2024, 3, 3))]
+
+
+def test_entradas_vencem_pelo_tempo(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(consultas.time, "time", lambda: agora[0])
+    cache = CacheConsultas(limite_bytes=10 ** 6, ttl=60)
+    dia = date(2024, 3, 1)
+    cache.guardar("chave", dia, ["bloco"])
+
+    agora[0] += 59
+    assert cache.obter("chave", dia) == ["bloco"]
+    agora[0] += 2
+    assert cache.obter("chave", dia) is None
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_descarta_os_usados_ha_mais_tempo_pelo_tamanho():
+    def resultados():
+        return ["x" * 1000]
+
+    cache = CacheConsultas(limite_bytes=3 * tamanho_aproximado(resultados()), ttl=3600)
+    dias = _dias(date(2024, 3, 1), date(2024, 3, 3))
+    for dia in dias:
+        cache.guardar("chave", dia, resultados())
+
+    # O primeiro dia é usado de novo, então o segundo é o mais antigo
+    assert cache.obter("chave", dias[0]) is not None
+    cache.guardar("chave", date(2024, 3, 4), resultados())
+
+    assert cache.obter("chave", dias[1]) is None
+    assert cache.obter("chave", dias[0]) is not None
+    assert len(cache) == 3 and cache.bytes <= cache.limite_bytes
+
+
+def test_resultado_maior_que_o_limite_nao_entra():
+    cache = CacheConsultas(limite_bytes=100, ttl=3600)
+    cache.guardar("chave", date(2024, 3, 1), ["x" * 1000])
+    assert len(cache) == 0 and cache.bytes == 0
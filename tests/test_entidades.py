@@ -0,0 +1,97 @@
+"""
+Entidades dos aditivos (doe.entidades): validação de CNPJ/CPF, identificadores
+estáveis e o dicionário que junta as grafias de um nome ao seu documento.
+"""
+from datetime import date
+
+import pytest
+
+from doe.entidades import (
+    DicionarioEntidades, cnpj_valido, cpf_valido, documento_de, documento_do_id, id_entidade, id_por_nome,
+    marcar_entidades, normalizar_nome, primeiro_documento,
+)
+
+CNPJ = "11222333000181"
+CPF = "52998224725"
+
+
+@pytest.mark.parametrize("digitos, valido", [
+    (CNPJ, True),
+    ("00000000000191", True),
+    ("11222333000182", False),
+    ("11111111111111", False),
+    ("1122233300018", False),
+])
+def test_cnpj_valido(digitos, valido):
+    assert cnpj_valido(digitos) is valido
+
+
+@pytest.mark.parametrize("digitos, valido", [
+    (CPF, True),
+    ("52998224726", False),
+    ("00000000000", False),
+    ("5299822472", False),
+])
+def test_cpf_valido(digitos, valido):
+    assert cpf_valido(digitos) is valido
+
+
+def test_documento_no_texto():
+    assert documento_de("11.222.333/0001-81") == ("cnpj", CNPJ)
+    assert documento_de("529.982.247-25") == ("cpf", CPF)
+    assert documento_de("123") is None
+    # Dígito verificador errado é pulado; vale o próximo documento válido
+    texto = "EMPRESA X LTDA, CNPJ nº 11.222.333/0001-82, sócio CPF: 529 982 247 25"
+    assert primeiro_documento(texto) == ("cpf", CPF)
+
+
+def test_nome_normalizado():
+    assert normalizar_nome("Construtora Água Boa S/A") == normalizar_nome("CONSTRUTORA AGUA BOA S.A.")
+    assert normalizar_nome("Empresa da Silva LTDA - ME") == "empresa silva"
+    assert normalizar_nome("EMPRESA X LTDA, inscrita no CNPJ sob o nº 1") == "empresa x"
+
+
+def test_identificadores():
+    assert id_entidade(("cnpj", CNPJ), "Qualquer Nome") == f"cnpj:{CNPJ}"
+    assert id_entidade(None, "Empresa X Ltda") == id_por_nome("EMPRESA X") != ""
+    assert id_entidade(None, "") == ""
+    assert documento_do_id(f"cnpj:{CNPJ}") == "11.222.333/0001-81"
+    assert documento_do_id(f"cpf:{CPF}") == "529.982.247-25"
+    assert documento_do_id(id_por_nome("Empresa X")) == ""
+
+
+def _aditivo(orgao, contratado, documento=None, valor=100.0):
+    item = {"Órgão": orgao, "Contratado(a)": contratado, "Valor Float": valor}
+    return marcar_entidades(item, {"Contratado(a)": documento} if documento else {})
+
+
+def test_nome_visto_com_um_so_documento_vira_o_documento(tmp_path):
+    dicionario = DicionarioEntidades(str(tmp_path / "entidades.db"))
+    dicionario.registrar_caderno(date(2025, 1, 2), 1, [_aditivo("SEDUC", "Empresa X Ltda", ("cnpj", CNPJ))])
+    dicionario.registrar_caderno(date(2025, 1, 3), 1, [_aditivo("SEDUC", "EMPRESA X LTDA.")])
+
+    id_nome = id_por_nome("Empresa X")
+    assert dicionario.resolver([id_nome]) == {id_nome: f"cnpj:{CNPJ}"}
+    assert dicionario.procurar("empresa x") == f"cnpj:{CNPJ}"
+    assert dicionario.cadernos(f"cnpj:{CNPJ}", date(2025, 1, 1), date(2025, 1, 31)) == [
+        (date(2025, 1, 2), 1), (date(2025, 1, 3), 1)
+    ]
+
+
+def test_nome_com_dois_documentos_fica_separado(tmp_path):
+    dicionario = DicionarioEntidades(str(tmp_path / "entidades.db"))
+    dicionario.registrar_caderno(date(2025, 1, 2), 1, [
+        _aditivo("SEDUC", "Empresa X Ltda", ("cnpj", CNPJ)),
+        _aditivo("SEDUC", "Empresa X Ltda", ("cpf", CPF)),
+    ])
+
+    id_nome = id_por_nome("Empresa X")
+    assert dicionario.resolver([id_nome]) == {id_nome: id_nome}
+
+
+def test_registrar_de_novo_troca_as_aparicoes(tmp_path):
+    dicionario = DicionarioEntidades(str(tmp_path / "entidades.db"))
+    dicionario.registrar_caderno(date(2025, 1, 2), 1, [_aditivo("SEDUC", "Empresa X Ltda", ("cnpj", CNPJ))])
+    dicionario.registrar_caderno(date(2025, 1, 2), 1, [_aditivo("SEDUC", "Outra Empresa")])
+
+    assert dicionario.cadernos(f"cnpj:{CNPJ}", date(2025, 1, 1), date(2025, 1, 31)) == []
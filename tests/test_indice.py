@@ -0,0 +1,87 @@
+"""
+Busca aproximada no índice de blocos (doe.indice.buscar_aproximada e doe.aproximada):
+erros de digitação/OCR e palavras quebradas por hífen no fim da linha.
+"""
+from datetime import date
+
+import pytest
+
+from doe.aproximada import distancia_limitada, erros_permitidos, palavras_de
+from doe.busca import realcar_bloco
+from doe.indice import IndiceBlocos
+
+DATA = date(2025, 1, 2)
+PAGINA = (
+    "Aviso de LICITA-\n   ÇÃO nº 12\nPregão eletrônico para compra"
+    " *** *** *** Extrato do contrato com a empresa Constructora Ltda"
+    " *** *** *** nada aqui"
+)
+
+
+@pytest.fixture
+def indice(tmp_path):
+    indice = IndiceBlocos(str(tmp_path / "indice.db"))
+    indice.indexar_caderno(DATA, 1, [PAGINA], "v")
+    return indice
+
+
+def test_palavras_sem_acentos_e_sem_quebras():
+    assert palavras_de("Aviso de LICITA-\n   ÇÃO") == ["aviso", "de", "licitacao"]
+    # Hífen no meio da linha continua separando palavras
+    assert palavras_de("micro-empresa") == ["micro", "empresa"]
+
+
+@pytest.mark.parametrize("a, b, limite, esperado", [
+    ("construtora", "constructora", 2, 1),
+    ("licitacao", "licitacao", 1, 0),
+    ("contrato", "distrato", 1, 2),
+    ("ab", "abcdef", 2, 3),
+])
+def test_distancia_limitada(a, b, limite, esperado):
+    assert distancia_limitada(a, b, limite) == esperado
+
+
+def test_palavras_curtas_nao_aceitam_erros():
+    assert erros_permitidos("ltda") == 1
+    assert erros_permitidos("nº") == 0
+    assert erros_permitidos("construtora") == 2
+    assert erros_permitidos("construtora", maximo=1) == 1
+
+
+def test_palavra_quebrada_por_hifen(indice):
+    resultados = indice.buscar_aproximada(["licitação"])
+
+    assert [r[:4] for r in resultados] == [(DATA, 1, 0, 0)]
+    trechos = resultados[0][6]
+    assert trechos == ("LICITA-\n   ÇÃO",)
+    # O realce usa a forma dobrada guardada no índice e marca as duas metades
+    linhas = realcar_bloco(resultados[0][4], trechos, True, resultados[0][5])
+    assert linhas[:2] == ["Aviso de :orange[**LICITA-**]", ":orange[**ÇÃO**] nº 12"]
+
+
+def test_erro_de_digitacao(indice):
+    assert [r[6] for r in indice.buscar_aproximada(["construtora ltda"])] == [("Constructora Ltda",)]
+    assert indice.buscar_aproximada(["construtora"], max_erros=0) == []
+    # A busca exata não acha a grafia errada
+    assert indice.buscar(["construtora"]) == []
+
+
+def test_todos_ou_qualquer_um(indice):
+    termos = ["pregao eletronico", "construtora"]
+    assert [r[6] for r in indice.buscar_aproximada(termos, todos=False)] == [("Pregão eletrônico",), ("Constructora",)]
+    assert indice.buscar_aproximada(termos, todos=True) == []
+
+
+def test_palavras_fora_de_ordem_nao_contam(indice):
+    assert indice.buscar_aproximada(["eletronico pregao"]) == []
+
+
+def test_periodo(indice):
+    assert indice.buscar_aproximada(["licitacao"], data_inicio=date(2025, 1, 3)) == []
+    assert len(indice.buscar_aproximada(["licitacao"], data_fim=DATA)) == 1
+
+
+def test_reindexar_troca_os_blocos(indice):
+    indice.indexar_caderno(DATA, 1, ["outro texto, sem nada de interesse"], "v2")
+    assert indice.buscar_aproximada(["licitacao"]) == []
+    assert indice.indexado(DATA, 1, "v2")
@@ -0,0 +1,59 @@
+"""
+Lista de monitoramento (doe.multitermos.AutomatoTermos): limites de palavra iguais
+aos do \\b das expressões regulares, que é a regra da "Busca Exata".
+"""
+import random
+import re
+
+import pytest
+
+from doe.multitermos import AutomatoTermos
+from doe.normalizacao import dobrar
+
+SEMENTE = 5
+CASOS = 2000
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("contrato com ana silva", ["Ana"]),
+    ("contrato com mariana silva", ["Mariana"]),
+    ("banana", []),
+    ("ana_maria e ana-maria", ["Ana"]),
+    ("cnpj 07.954.480/0001-79.", ["07.954.480/0001-79"]),
+    ("cnpj 107.954.480/0001-79", []),
+])
+def test_limites_de_palavra(texto, esperado):
+    automato = AutomatoTermos(["Ana", "Mariana", "07.954.480/0001-79"])
+    assert automato.termos_encontrados(texto) == esperado
+
+
+def test_termos_como_digitados_e_sem_repeticao():
+    automato = AutomatoTermos(["Licitação", "licitacao", " ", "Pregão"])
+    assert len(automato) == 2
+    assert automato.termos_encontrados(dobrar("PREGÃO e licitação e pregao")) == ["Pregão", "Licitação"]
+
+
+def test_sem_ignorar_acentos():
+    automato = AutomatoTermos(["Licitação"], ignorar_acentos=False)
+    assert automato.termos_encontrados("licitação") == ["Licitação"]
+    assert automato.termos_encontrados("licitacao") == []
+
+
+def test_sem_palavra_inteira():
+    assert AutomatoTermos(["ana"], palavra_inteira=False).termos_encontrados("banana") == ["ana"]
+
+
+def test_igual_ao_regex_em_textos_aleatorios():
+    sorteio = random.Random(SEMENTE)
+    alfabeto = "ab _.-/1ç"
+    for _ in range(CASOS):
+        termos = ["".join(sorteio.choices(alfabeto, k=sorteio.randint(1, 4))) for _ in range(3)]
+        texto = "".join(sorteio.choices(alfabeto, k=sorteio.randint(0, 40)))
+        automato = AutomatoTermos(termos, ignorar_acentos=False)
+
+        esperado = set()
+        for termo in automato.originais:
+            padrao = re.compile(r"\b" + re.escape(termo) + r"\b")
+            # match(texto, inicio) ainda olha o caractere anterior para o \b
+            esperado |= {(i, i + len(termo), termo) for i in range(len(texto)) if padrao.match(texto, i)}
+        assert set(automato.ocorrencias(texto)) == esperado, (termos, texto)
@@ -0,0 +1,52 @@
+"""
+Forma dobrada dos textos (doe.normalizacao): minúsculas sem acentos e o mapa de
+volta às posições do original, usado no realce.
+"""
+import random
+
+import pytest
+
+from doe.normalizacao import dobrar, dobrar_com_mapa, posicao_original, remover_acentos
+
+SEMENTE = 7
+CASOS = 2000
+# Caracteres que viram um, nenhum (acento solto) ou dois ("ﬁ", "ﬂ") na forma dobrada
+ALFABETO = "abcAÇãÉéõ \n-ﬁﬂ²̧́ºª"
+
+
+def test_dobrar():
+    assert dobrar("LICITAÇÃO Pública") == "licitacao publica"
+    assert remover_acentos("Ação") == "Acao"
+    assert remover_acentos("") == ""
+
+
+def test_mapa_vazio_quando_as_posicoes_coincidem():
+    assert dobrar_com_mapa("Licitação") == ("licitacao", [])
+    assert dobrar_com_mapa("abc") == ("abc", [])
+
+
+@pytest.mark.parametrize("texto, dobrado", [
+    ("ﬁm da licitação", "fim da licitacao"),
+    ("acérvo", "acervo"),
+    ("ﬂ́x", "flx"),
+])
+def test_mapa_leva_cada_caractere_ao_original(texto, dobrado):
+    resultado, mapa = dobrar_com_mapa(texto)
+    assert resultado == dobrado
+    for posicao, caractere in enumerate(resultado):
+        assert caractere in dobrar(texto[posicao_original(mapa, posicao)])
+
+
+def test_mapa_em_textos_aleatorios():
+    sorteio = random.Random(SEMENTE)
+    for _ in range(CASOS):
+        texto = "".join(sorteio.choices(ALFABETO, k=sorteio.randint(0, 30)))
+        dobrado, mapa = dobrar_com_mapa(texto)
+        assert dobrado == dobrar(texto)
+        anterior = -1
+        for posicao, caractere in enumerate(dobrado):
+            original = posicao_original(mapa, posicao)
+            # Nunca anda para trás e sempre aponta para o caractere que gerou este
+            assert anterior <= original < len(texto), texto
+            assert caractere in dobrar(texto[original]), texto
+            anterior = original
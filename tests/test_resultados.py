@@ -0,0 +1,74 @@
+"""
+Resumos dos aditivos (doe.resultados.ResultadosAditivos.resumo): os meses inteiros
+vêm dos resumos gravados e precisam dar o mesmo que somar as linhas.
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from doe.entidades import marcar_entidades
+from doe.resultados import ResultadosAditivos
+
+SEMENTE = 11
+ORGAOS = ["SEDUC", "Secretaria da Saúde", "DETRAN"]
+CONTRATADOS = ["Empresa X Ltda", "EMPRESA X LTDA.", "Construtora Água Boa S/A", "Fulano de Tal"]
+
+
+def _aditivo(orgao, contratado, valor):
+    item = {"Órgão": orgao, "Contratado(a)": contratado, "Tipo": "Prazo", "Valor Float": valor,
+            "Objeto": "objeto", "Link": "http://x"}
+    return marcar_entidades(item, {})
+
+
+@pytest.fixture
+def resultados(tmp_path):
+    resultados = ResultadosAditivos(str(tmp_path / "aditivos"))
+    sorteio = random.Random(SEMENTE)
+    dia = date(2025, 1, 1)
+    while dia <= date(2025, 3, 31):
+        for parte in (1, 2):
+            aditivos = [
+                _aditivo(sorteio.choice(ORGAOS), sorteio.choice(CONTRATADOS), sorteio.choice([0.0, 10.0, 2.5, 1000.0]))
+                for _ in range(sorteio.randint(0, 4))
+            ]
+            resultados.gravar_caderno(dia, parte, aditivos)
+        dia += timedelta(days=1)
+    return resultados
+
+
+def _conferir(resultados, inicio, fim):
+    mensal, por_dimensao = resultados.resumo(inicio, fim)
+    df = resultados.carregar(inicio, fim)
+
+    meses = df["Data"].map(lambda d: d.year * 100 + d.month)
+    esperado = df.groupby(meses)["Valor Float"].agg(["sum", "count"])
+    assert mensal["mes"].tolist() == esperado.index.tolist()
+    assert mensal["valor"].tolist() == pytest.approx(esperado["sum"].tolist())
+    assert mensal["quantidade"].tolist() == esperado["count"].tolist()
+
+    # Por entidade, só os aditivos com valor; as grafias de um mesmo nome somam juntas
+    com_valor = df[df["Valor Float"] > 0]
+    for dimensao, somas in por_dimensao.items():
+        assert somas.sum() == pytest.approx(com_valor["Valor Float"].sum())
+        ids = com_valor[f"ID {dimensao}"].astype(str)
+        assert len(somas) == ids.nunique()
+
+
+def test_resumo_igual_as_linhas(resultados):
+    _conferir(resultados, date(2025, 1, 1), date(2025, 3, 31))
+    # Meses cortados pelo período são somados a partir das linhas
+    _conferir(resultados, date(2025, 1, 10), date(2025, 2, 20))
+
+
+def test_resumo_refeito_quando_um_caderno_muda(resultados):
+    inicio, fim = date(2025, 2, 1), date(2025, 2, 28)
+    _conferir(resultados, inicio, fim)
+
+    resultados.gravar_caderno(date(2025, 2, 10), 1, [_aditivo("SEDUC", "Nova Empresa", 123456.0)])
+    _conferir(resultados, inicio, fim)
+    _, por_dimensao = resultados.resumo(inicio, fim)
+    assert por_dimensao["Contratado(a)"]["Nova Empresa"] == 123456.0
+
+    resultados.gravar_caderno(date(2025, 2, 10), 1, [])
+    _conferir(resultados, inicio, fim)
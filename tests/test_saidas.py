@@ -0,0 +1,96 @@
+"""
+Saídas em lote (doe.saidas): retomada com `continuar=True`, descarte do que foi
+gravado depois do último dia concluído e recusa de sobrescrever resultados.
+"""
+import json
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from doe.saidas import SaidaParquet, SaidaTexto
+
+COLUNAS = ["Data", "Valor"]
+DIA_1 = date(2025, 1, 2)
+DIA_2 = date(2025, 1, 3)
+
+
+def _linhas(data, quantidade):
+    return [{"Data": data.isoformat(), "Valor": str(i)} for i in range(quantidade)]
+
+
+def _ler_jsonl(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f]
+
+
+@pytest.mark.parametrize("formato", ["csv", "jsonl"])
+def test_texto_continua_do_ultimo_dia_concluido(tmp_path, formato):
+    caminho = str(tmp_path / f"saida.{formato}")
+    saida = SaidaTexto(caminho, formato, COLUNAS)
+    saida.gravar_dia(DIA_1, _linhas(DIA_1, 3))
+    saida.fechar()
+    tamanho = os.path.getsize(caminho)
+
+    # Interrompido no meio do segundo dia: linhas gravadas, dia não registrado
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write("lixo do dia interrompido\n")
+
+    saida = SaidaTexto(caminho, formato, COLUNAS, continuar=True)
+    assert saida.concluidos == {DIA_1}
+    assert os.path.getsize(caminho) == tamanho
+    saida.gravar_dia(DIA_2, _linhas(DIA_2, 2))
+    saida.fechar()
+
+    if formato == "jsonl":
+        assert _ler_jsonl(caminho) == _linhas(DIA_1, 3) + _linhas(DIA_2, 2)
+    else:
+        df = pd.read_csv(caminho, sep=";", dtype=str, encoding="utf-8-sig")
+        assert df.to_dict("records") == _linhas(DIA_1, 3) + _linhas(DIA_2, 2)
+
+
+def test_texto_descarta_registro_de_progresso_cortado(tmp_path):
+    caminho = str(tmp_path / "saida.jsonl")
+    saida = SaidaTexto(caminho, "jsonl", COLUNAS)
+    saida.gravar_dia(DIA_1, _linhas(DIA_1, 1))
+    saida.fechar()
+    with open(f"{caminho}.progresso", "a", encoding="utf-8") as f:
+        f.write('{"data": "2025-01-03", "by')
+
+    saida = SaidaTexto(caminho, "jsonl", COLUNAS, continuar=True)
+    saida.gravar_dia(DIA_2, _linhas(DIA_2, 1))
+    saida.fechar()
+
+    assert [r["data"] for r in _ler_jsonl(f"{caminho}.progresso")] == ["2025-01-02", "2025-01-03"]
+    assert _ler_jsonl(caminho) == _linhas(DIA_1, 1) + _linhas(DIA_2, 1)
+
+
+def test_texto_nao_sobrescreve(tmp_path):
+    caminho = str(tmp_path / "saida.jsonl")
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("resultado de outra varredura\n")
+
+    with pytest.raises(FileExistsError):
+        SaidaTexto(caminho, "jsonl", COLUNAS)
+    # Sem o registro de progresso, continuar também não mexe no arquivo
+    with pytest.raises(FileExistsError):
+        SaidaTexto(caminho, "jsonl", COLUNAS, continuar=True)
+    with open(caminho, encoding="utf-8") as f:
+        assert f.read() == "resultado de outra varredura\n"
+
+
+def test_parquet_continua_pelos_dias_gravados(tmp_path):
+    caminho = str(tmp_path / "saida")
+    saida = SaidaParquet(caminho, COLUNAS)
+    saida.gravar_dia(DIA_1, _linhas(DIA_1, 2))
+    saida.gravar_dia(DIA_2, [])
+    # Temporário de um dia interrompido: não conta nem aparece na leitura
+    with open(os.path.join(caminho, ".20250106.123.tmp"), "wb") as f:
+        f.write(b"PAR1")
+
+    with pytest.raises(FileExistsError):
+        SaidaParquet(caminho, COLUNAS)
+    saida = SaidaParquet(caminho, COLUNAS, continuar=True)
+    assert saida.concluidos == {DIA_1, DIA_2}
+    assert pd.read_parquet(caminho).to_dict("records") == _linhas(DIA_1, 2)